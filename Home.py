@@ -6,7 +6,7 @@ from utils.header import render_global_search
 from utils.ui_components import render_movie_row, section_title
 from utils.i18n import t
 from utils.layout import common_page_setup
-from utils.movie_categories import categorize_movies, sample_rows
+from utils.movie_categories import get_categories, sample_rows
 
 
 def main():
@@ -22,7 +22,7 @@ def main():
     st.caption(t("home_intro"))
 
     # Random selections based on the categories defined in the project spec.
-    categorized, _, _ = categorize_movies(df, min_votes=5)
+    categories = get_categories(df, min_votes=5)
 
     if "wf_home_seed" not in st.session_state:
         st.session_state["wf_home_seed"] = random.randint(0, 2_147_483_647)
@@ -30,7 +30,7 @@ def main():
 
     # 1) Vedettes / Blockbusters
     section_title(t("featured_section"))
-    vedettes_pool = categorized[categorized["category"] == "Blockbuster"]
+    vedettes_pool = df.iloc[categories.positions("Blockbuster")]
     vedettes_df = sample_rows(vedettes_pool, n=5, seed=seed + 1)
     render_movie_row(vedettes_df, key="home_vedettes",
                      max_items=5, source_page="Home.py")
@@ -39,7 +39,7 @@ def main():
 
     # 2) Pépites
     section_title(t("gems_section"))
-    pepites_pool = categorized[categorized["category"] == "Pépite"]
+    pepites_pool = df.iloc[categories.positions("Pépite")]
     pepites_df = sample_rows(pepites_pool, n=5, seed=seed + 2)
     render_movie_row(pepites_df, key="home_pepites",
                      max_items=5, source_page="Home.py")
@@ -48,7 +48,7 @@ def main():
 
     # 3) Niche
     section_title(t("niche_section"))
-    niche_pool = categorized[categorized["category"] == "Niche"]
+    niche_pool = df.iloc[categories.positions("Niche")]
     niche_df = sample_rows(niche_pool, n=5, seed=seed + 3)
     render_movie_row(niche_df, key="home_niche",
                      max_items=5, source_page="Home.py")
@@ -57,7 +57,7 @@ def main():
 
     # 4) Navets
     section_title(t("flops_section"))
-    navets_pool = categorized[categorized["category"] == "Navet"]
+    navets_pool = df.iloc[categories.positions("Navet")]
     navets_df = sample_rows(navets_pool, n=5, seed=seed + 4)
     render_movie_row(navets_df, key="home_navets",
                      max_items=5, source_page="Home.py")
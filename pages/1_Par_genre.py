@@ -1,13 +1,13 @@
 import streamlit as st
 import pandas as pd
 
-from utils.data_loader import load_movies
+from utils.data_loader import load_catalog, load_movies
 from utils.header import render_global_search
 from utils.ui_components import render_movie_row, section_title
 from utils.i18n import t
 from utils.layout import common_page_setup
 from utils.text import slugify
-from utils.movie_categories import categorize_movies
+from utils.movie_categories import get_categories
 
 
 def _shuffle(df: pd.DataFrame, seed: int) -> pd.DataFrame:
@@ -52,13 +52,14 @@ def main():
 
     st.title(t("genre_title"))
 
-    genres = sorted(df["genre_main"].dropna().unique()
-                    ) if "genre_main" in df.columns else []
+    catalog = load_catalog()
+    genres = catalog.genres()
     if not genres:
         st.error("Aucun genre disponible dans le dataset.")
         return
 
-    categorized, rating_col, count_col = categorize_movies(df, min_votes=5)
+    categories = get_categories(df, min_votes=5)
+    rating_col, count_col = categories.rating_col, categories.count_col
 
     special_keys = ["__blockbusters__", "__pepites__", "__niche__", "__navets__"]
 
@@ -101,7 +102,7 @@ def main():
             "__navets__": "Navet",
         }
         target_category = category_map[str(selected)]
-        pool = categorized[categorized["category"] == target_category].copy()
+        pool = categories.take(df, categories.positions(target_category))
         pool = _shuffle(pool, seed=seed + 10)
         results = pool.head(target_n).reset_index(drop=True)
         selected_label = _format_option(str(selected))
@@ -109,7 +110,7 @@ def main():
         selected_genre = str(selected)
         selected_label = selected_genre
 
-        filtered = categorized[categorized["genre_main"] == selected_genre].copy()
+        filtered = categories.take(df, catalog.genre_positions(selected_genre))
 
         strict = filtered[filtered["category"].isin(["Blockbuster", "Pépite"])].copy()
         if "imdb_key" in strict.columns:
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from utils.data_loader import load_movies
+from utils.data_loader import load_catalog, load_movies
 from utils.header import render_global_search
 from utils.ui_components import render_movie_row, section_title
 from utils.i18n import t
@@ -25,8 +25,7 @@ def main():
     if not favorites:
         st.info(t("no_favorites"))
     else:
-        fav_df = df[df["imdb_key"].astype(str).isin(
-            set(map(str, favorites)))].copy()
+        fav_df = load_catalog().take(df, favorites)
         sort_cols = [c for c in ["score_global", "popularity",
                                  "num_voted_users"] if c in fav_df.columns]
         if sort_cols:
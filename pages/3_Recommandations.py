@@ -5,8 +5,11 @@ from utils.header import render_global_search
 from utils.ui_components import render_movie_row, section_title
 from utils.i18n import t
 from utils.layout import common_page_setup
+from utils.settings import get_reco_aggregation
+from utils.user_repo import get_favorite_dates
 from services.recommendation_service import (
-    get_recommendations_from_favorites,
+    FavoriteNeighbors,
+    get_cached_recommendations,
 )
 
 
@@ -32,8 +35,23 @@ def main():
         max_recos = 120
         if st.session_state.get("wf_recos_cache_key") != fav_key:
             st.session_state["wf_recos_cache_key"] = fav_key
-            st.session_state["wf_recos_all"] = get_recommendations_from_favorites(
-                df, favorites, n=max_recos
+            # Neighbour lists of the favorites survive toggles: only the
+            # movies added since the last ranking are queried.
+            neighbors_state = st.session_state.setdefault("wf_reco_neighbors", FavoriteNeighbors())
+            favorite_dates = None
+            if get_reco_aggregation() == "recency" and st.session_state.get("user_email"):
+                try:
+                    favorite_dates = get_favorite_dates(
+                        str(st.session_state["user_email"]), user_id=st.session_state.get("user_id")
+                    )
+                except Exception:
+                    favorite_dates = None
+            st.session_state["wf_recos_all"] = get_cached_recommendations(
+                df,
+                favorites,
+                n=max_recos,
+                neighbors_state=neighbors_state,
+                favorite_dates=favorite_dates,
             )
             st.session_state["wf_recos_show"] = 60
 
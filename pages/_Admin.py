@@ -12,9 +12,15 @@ from utils.data_loader import load_movies
 from utils.header import render_global_search
 from utils.i18n import t
 from utils.layout import common_page_setup
-from utils.settings import get_recommender_model, set_recommender_model
+from utils.mysql_store import mysql_pool_stats
+from utils.settings import (
+    get_reco_aggregation,
+    get_recommender_model,
+    set_reco_aggregation,
+    set_recommender_model,
+)
 from utils.ui_components import render_movie_row, section_title
-from services.recommendation_service import get_recommender_info
+from services.recommendation_service import get_ann_index_meta, get_recommender_info
 
 
 def _render_admin_filters() -> dict:
@@ -198,32 +204,82 @@ def main():
         section_title(t("admin_settings_tab"))
 
         current_model = get_recommender_model()
-        options = ["cosine", "euclidean", "manhattan"]
+        options = ["cosine", "euclidean", "manhattan", "ann"]
+        model_labels = {
+            "cosine": "KNN cosine",
+            "euclidean": "KNN euclidean",
+            "manhattan": "KNN manhattan",
+            "ann": "ANN cosine (IVF, approché)",
+        }
         selected = st.selectbox(
             t("admin_reco_model_label"),
             options=options,
             index=(options.index(current_model) if current_model in options else 0),
-            format_func=lambda v: (
-                "KNN cosine" if v == "cosine" else "KNN euclidean" if v == "euclidean" else "KNN manhattan"
-            ),
+            format_func=lambda v: model_labels.get(v, v),
             help=t("admin_reco_model_help"),
             key="wf_admin_reco_model",
         )
+        if selected == "ann":
+            ann_meta = get_ann_index_meta()
+            if ann_meta.get("recall") is not None:
+                st.caption(
+                    t(
+                        "admin_reco_ann_quality",
+                        int(ann_meta.get("k", 0)),
+                        float(ann_meta["recall"]) * 100.0,
+                        float(ann_meta.get("latency_ms", 0.0)),
+                    )
+                )
+
+        current_aggregation = get_reco_aggregation()
+        aggregation_options = ["max", "sum", "mean", "rrf", "recency"]
+        aggregation_labels = {
+            "max": "Max (similarité la plus forte)",
+            "sum": "Somme",
+            "mean": "Moyenne",
+            "rrf": "Reciprocal rank fusion",
+            "recency": "Somme pondérée par la date d'ajout",
+        }
+        selected_aggregation = st.selectbox(
+            t("admin_reco_aggregation_label"),
+            options=aggregation_options,
+            index=(
+                aggregation_options.index(current_aggregation)
+                if current_aggregation in aggregation_options
+                else 0
+            ),
+            format_func=lambda v: aggregation_labels.get(v, v),
+            help=t("admin_reco_aggregation_help"),
+            key="wf_admin_reco_aggregation",
+        )
 
         c1, c2 = st.columns([1, 3], vertical_alignment="center")
         with c1:
             if st.button(t("save_button"), type="primary", key="wf_admin_reco_save"):
                 set_recommender_model(selected)
+                set_reco_aggregation(selected_aggregation)
                 st.success(t("admin_settings_saved"))
                 st.rerun()
         with c2:
-            backend, reason = get_recommender_info()
+            backend, reason = get_recommender_info(movies_df)
             mode = "ML" if backend == "knn_cosine" else "Fallback"
             details = (reason or "").strip()
             if details:
                 st.caption(t("admin_reco_backend_status", mode, details))
             else:
                 st.caption(f"Moteur : {mode}")
+            pool = mysql_pool_stats()
+            if pool:
+                st.caption(
+                    t(
+                        "admin_mysql_pool_status",
+                        pool["in_use"],
+                        pool["idle"],
+                        pool["max_size"],
+                        pool["creates"],
+                        pool["waits"],
+                    )
+                )
 
 
 if __name__ == "__main__":
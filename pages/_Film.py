@@ -4,12 +4,12 @@ import random
 
 from services.recommendation_service import get_similar_movies
 from utils.auth import toggle_favorite
-from utils.data_loader import load_movies
+from utils.data_loader import load_catalog, load_movies
 from utils.header import render_global_search
 from utils.ui_components import render_movie_row
 from utils.i18n import t
 from utils.layout import common_page_setup
-from utils.movie_categories import categorize_movies
+from utils.movie_categories import get_categories
 
 
 def _get_selected_imdb_key() -> str | None:
@@ -156,14 +156,15 @@ def main():
             st.switch_page("Home.py")
         return
 
-    movie = df[df["imdb_key"].astype(str) == imdb_key]
-    if movie.empty:
+    catalog = load_catalog()
+    movie_pos = catalog.position(imdb_key)
+    if movie_pos is None:
         st.error(t("search_no_result"))
         if st.button("Retour"):
             st.switch_page("Home.py")
         return
 
-    row = movie.iloc[0]
+    row = df.iloc[movie_pos]
     title = str(row.get("movie_title", "Film"))
 
     # Breadcrumb Layout
@@ -304,9 +305,10 @@ def main():
         st.markdown("---")
         st.subheader(t("more_in_genre"))
 
-        categorized, rating_col, count_col = categorize_movies(df, min_votes=5)
-        similar = categorized[(categorized["genre_main"] == genre) & (
-            categorized["imdb_key"].astype(str) != imdb_key)].copy()
+        categories = get_categories(df, min_votes=5)
+        rating_col, count_col = categories.rating_col, categories.count_col
+        genre_positions = catalog.genre_positions(row.get("genre_main", genre))
+        similar = categories.take(df, genre_positions[genre_positions != movie_pos])
 
         seed_key = f"wf_more_in_genre_seed_{imdb_key}"
         if seed_key not in st.session_state:
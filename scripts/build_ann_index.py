@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.ann_index import (  # noqa: E402
+    ANN_DEFAULT_DIM,
+    ANN_DEFAULT_NPROBE,
+    build_ann_index,
+    evaluate_ann_index,
+    save_ann_index,
+)
+from services.model_manifest import legacy_build_refusal  # noqa: E402
+
+
+def build(models_dir: Path, dim: int, n_lists: int | None, nprobe: int, k: int, queries: int) -> int:
+    import joblib  # type: ignore
+
+    model_path = models_dir / "KNN_cosine.pkl"
+    if not model_path.exists():
+        print(f"[ann] modèle introuvable: {model_path.name}")
+        return 1
+
+    model = joblib.load(model_path)
+    started = time.perf_counter()
+    index = build_ann_index(model._fit_X, dim=dim, n_lists=n_lists, nprobe=nprobe)
+    elapsed = time.perf_counter() - started
+
+    report = evaluate_ann_index(index, model, k=k, n_queries=queries)
+    save_ann_index(index, models_dir, meta=report)
+    print(
+        f"[ann] {index.n_rows} lignes, dim={dim}, {len(index.centroids)} listes, nprobe={index.nprobe} ({elapsed:.1f}s)"
+    )
+    print(
+        f"[ann] rappel@{report['k']} = {report['recall']:.3f} vs KNN cosine exact, "
+        f"{report['latency_ms']:.2f} ms par requête ({report['queries']} requêtes)"
+    )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Construit l'index ANN (projection aléatoire + IVF) à partir de ml/KNN_cosine.pkl."
+    )
+    parser.add_argument("--models-dir", default=str(ROOT / "ml"))
+    parser.add_argument("--dim", type=int, default=ANN_DEFAULT_DIM, help="Dimension de la projection.")
+    parser.add_argument("--lists", type=int, default=None, help="Nombre de listes IVF (défaut : ~racine du nombre de films).")
+    parser.add_argument("--nprobe", type=int, default=ANN_DEFAULT_NPROBE, help="Listes parcourues par requête.")
+    parser.add_argument("-k", type=int, default=50, help="K utilisé pour mesurer le rappel.")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes d'évaluation.")
+    args = parser.parse_args()
+
+    refusal = legacy_build_refusal(Path(args.models_dir))
+    if refusal:
+        print(refusal)
+        raise SystemExit(1)
+
+    raise SystemExit(
+        build(Path(args.models_dir), int(args.dim), args.lists, int(args.nprobe), int(args.k), int(args.queries))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.feature_matrix import load_feature_matrix, save_feature_matrix  # noqa: E402
+from services.model_manifest import legacy_build_refusal  # noqa: E402
+from utils.settings import KNN_RECO_MODELS  # noqa: E402
+
+
+def build(models_dir: Path) -> int:
+    import joblib  # type: ignore
+
+    features = None
+    for metric in sorted(KNN_RECO_MODELS):
+        model_path = models_dir / f"KNN_{metric}.pkl"
+        if not model_path.exists():
+            print(f"[{metric}] modèle introuvable: {model_path.name}")
+            continue
+        fit_x = joblib.load(model_path)._fit_X
+        if features is None:
+            features = fit_x
+        elif fit_x.shape != features.shape or (fit_x != features).nnz:
+            print(f"[{metric}] matrice différente de celle des autres modèles, abandon.")
+            return 1
+
+    if features is None:
+        return 1
+
+    started = time.perf_counter()
+    save_feature_matrix(features, models_dir)
+    load_feature_matrix.cache_clear()
+    matrix = load_feature_matrix(str(models_dir))
+    elapsed = time.perf_counter() - started
+    size_mb = matrix.data.nbytes / 1e6 + matrix.indices.nbytes / 1e6 + matrix.indptr.nbytes / 1e6
+    print(
+        f"[features] {matrix.n_rows} lignes x {matrix.n_features} colonnes, "
+        f"{len(matrix.data)} valeurs float32 ({size_mb:.1f} Mo, {elapsed:.1f}s)"
+    )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Exporte la matrice de features des modèles ml/KNN_*.pkl en .npy float32 (mmap partagé)."
+    )
+    parser.add_argument("--models-dir", default=str(ROOT / "ml"))
+    args = parser.parse_args()
+
+    refusal = legacy_build_refusal(Path(args.models_dir))
+    if refusal:
+        print(refusal)
+        raise SystemExit(1)
+
+    raise SystemExit(build(Path(args.models_dir)))
+
+
+if __name__ == "__main__":
+    main()
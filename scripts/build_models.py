@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.ann_index import (  # noqa: E402
+    ANN_DEFAULT_DIM,
+    ANN_DEFAULT_NPROBE,
+    ann_index_paths,
+    build_ann_index,
+    evaluate_ann_index,
+    save_ann_index,
+)
+from services.feature_matrix import FeatureMatrix, feature_matrix_paths, save_feature_arrays  # noqa: E402
+from services.model_features import build_catalog_features  # noqa: E402
+from services.model_manifest import MANIFEST_NAME, file_sha256, write_manifest  # noqa: E402
+from services.neighbor_table import (  # noqa: E402
+    NEIGHBOR_TABLE_K,
+    NeighborTable,
+    neighbor_table_paths,
+    save_neighbor_table,
+)
+from utils.settings import KNN_RECO_MODELS  # noqa: E402
+
+
+def _default_csv() -> Path:
+    # Same choice as `utils.data_loader`: the translated CSV when present.
+    fr_path = ROOT / "df_pret_bis_fr.csv"
+    return fr_path if fr_path.exists() else ROOT / "df_pret_bis.csv"
+
+
+def _neighbor_table(matrix: FeatureMatrix, metric: str, k: int) -> NeighborTable:
+    k = max(1, min(int(k), matrix.n_rows))
+    indices = np.empty((matrix.n_rows, k), dtype=np.int32)
+    distances = np.empty((matrix.n_rows, k), dtype=np.float32)
+    for start in range(0, matrix.n_rows, 256):
+        rows = np.arange(start, min(start + 256, matrix.n_rows))
+        idx, dist = matrix.kneighbors(rows, k, metric)
+        indices[rows] = idx
+        distances[rows] = dist
+    return NeighborTable(indices=indices, distances=distances)
+
+
+def _fit_pickles(features_csr, staging: Path) -> list[Path]:
+    import joblib  # type: ignore
+    from sklearn.neighbors import NearestNeighbors  # type: ignore
+
+    paths = []
+    for metric in sorted(KNN_RECO_MODELS):
+        model = NearestNeighbors(algorithm="brute", metric=metric).fit(features_csr)
+        path = staging / f"KNN_{metric}.pkl"
+        joblib.dump(model, path)
+        paths.append(path)
+    return paths
+
+
+def build(csv_path: Path, models_dir: Path, k: int, with_ann: bool, with_pickles: bool) -> int:
+    if not csv_path.exists():
+        print(f"[build] catalogue introuvable: {csv_path}")
+        return 1
+
+    started = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    keys = ["" if pd.isna(key) else str(key).strip() for key in df.get("imdb_key", pd.Series(dtype=object))]
+    if len(keys) != len(df):
+        print("[build] colonne imdb_key absente du catalogue.")
+        return 1
+
+    features = build_catalog_features(df)
+    n_rows, n_features = features.shape
+    print(f"[features] {n_rows} lignes x {n_features} colonnes, {len(features.data)} valeurs")
+
+    # Everything is written to a staging directory, then moved next to the
+    # current artifacts; the manifest goes last so a crashed build is ignored.
+    staging = models_dir / f".build-{os.getpid()}"
+    staging.mkdir(parents=True, exist_ok=True)
+    try:
+        save_feature_arrays(features.data, features.indices, features.indptr, features.shape, staging)
+        vocabulary_path = staging / "features_vocabulary.json"
+        vocabulary_path.write_text(pd.Series(features.vocabulary).to_json(orient="values"), encoding="utf-8")
+        artifacts = [*feature_matrix_paths(staging), vocabulary_path]
+
+        matrix = FeatureMatrix(
+            data=features.data, indices=features.indices, indptr=features.indptr, n_features=n_features
+        )
+        for metric in sorted(KNN_RECO_MODELS):
+            table = _neighbor_table(matrix, metric, k)
+            save_neighbor_table(table, staging, metric)
+            artifacts.extend(neighbor_table_paths(staging, metric))
+            print(f"[{metric}] table de voisins K={table.k}")
+
+        meta = {
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "catalog": {"file": csv_path.name, "sha256": file_sha256(csv_path)},
+            "features": {"n_features": n_features, "nnz": int(len(features.data))},
+            "neighbor_k": int(k),
+            "metrics": sorted(KNN_RECO_MODELS),
+        }
+
+        if with_ann or with_pickles:
+            from scipy import sparse
+
+            csr = sparse.csr_matrix(
+                (features.data, features.indices, features.indptr), shape=features.shape
+            )
+            if with_ann:
+                index = build_ann_index(csr, dim=ANN_DEFAULT_DIM, nprobe=ANN_DEFAULT_NPROBE)
+                report = evaluate_ann_index(index, matrix)
+                save_ann_index(index, staging, meta=report)
+                artifacts.extend(ann_index_paths(staging))
+                meta["ann"] = report
+                print(f"[ann] rappel@{report['k']} = {report['recall']:.3f}, {report['latency_ms']:.2f} ms par requête")
+            if with_pickles:
+                artifacts.extend(_fit_pickles(csr, staging))
+                print(f"[pickles] {', '.join(f'KNN_{m}.pkl' for m in sorted(KNN_RECO_MODELS))}")
+
+        write_manifest(staging, keys, artifacts, meta)
+        moved = [path.name for path in artifacts] + ["row_keys.json"]
+        for name in moved:
+            os.replace(staging / name, models_dir / name)
+        os.replace(staging / MANIFEST_NAME, models_dir / MANIFEST_NAME)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"[build] {len(moved) + 1} fichiers écrits dans {models_dir} ({elapsed:.1f}s)")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Reconstruit les artefacts de recommandation (features, tables de voisins, "
+            "index ANN, manifeste) à partir du CSV du catalogue."
+        )
+    )
+    parser.add_argument("--csv", default=None, help="CSV du catalogue (défaut : celui chargé par l'app).")
+    parser.add_argument("--models-dir", default=str(ROOT / "ml"))
+    parser.add_argument("-k", type=int, default=NEIGHBOR_TABLE_K, help="Nombre de voisins par film.")
+    parser.add_argument("--no-ann", action="store_true", help="Ne pas construire l'index ANN.")
+    parser.add_argument(
+        "--pickles", action="store_true", help="Écrire aussi ml/KNN_*.pkl (nécessite scikit-learn)."
+    )
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv) if args.csv else _default_csv()
+    raise SystemExit(
+        build(csv_path, Path(args.models_dir), int(args.k), not args.no_ann, bool(args.pickles))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.model_manifest import legacy_build_refusal  # noqa: E402
+from services.neighbor_table import (  # noqa: E402
+    NEIGHBOR_TABLE_K,
+    build_neighbor_table,
+    save_neighbor_table,
+)
+from utils.settings import KNN_RECO_MODELS  # noqa: E402
+
+
+def build(models_dir: Path, metrics: list[str], k: int) -> int:
+    import joblib  # type: ignore
+
+    built = 0
+    for metric in metrics:
+        model_path = models_dir / f"KNN_{metric}.pkl"
+        if not model_path.exists():
+            print(f"[{metric}] modèle introuvable: {model_path.name}")
+            continue
+
+        started = time.perf_counter()
+        model = joblib.load(model_path)
+        table = build_neighbor_table(model, k=k)
+        save_neighbor_table(table, models_dir, metric)
+        elapsed = time.perf_counter() - started
+        print(f"[{metric}] {table.n_rows} lignes x K={table.k} ({elapsed:.1f}s)")
+        built += 1
+    return built
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Précalcule les tables de voisins (top-K) à partir des modèles ml/KNN_*.pkl."
+    )
+    parser.add_argument("--models-dir", default=str(ROOT / "ml"))
+    parser.add_argument("--metric", action="append", choices=sorted(KNN_RECO_MODELS))
+    parser.add_argument("-k", type=int, default=NEIGHBOR_TABLE_K, help="Nombre de voisins par film.")
+    args = parser.parse_args()
+
+    refusal = legacy_build_refusal(Path(args.models_dir))
+    if refusal:
+        print(refusal)
+        raise SystemExit(1)
+
+    metrics = args.metric or sorted(KNN_RECO_MODELS)
+    built = build(Path(args.models_dir), metrics, int(args.k))
+    raise SystemExit(0 if built == len(metrics) else 1)
+
+
+if __name__ == "__main__":
+    main()
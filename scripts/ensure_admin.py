@@ -45,12 +45,9 @@ def ensure_admin(email: str, password: str, pseudo: str) -> tuple[bool, str]:
         return True, "Admin mis à jour (mot de passe + rôle)."
 
     try:
-        from utils.user_store import load_users, save_users
+        from utils.user_store import update_user
 
-        users = load_users()
-        if email in users:
-            users[email]["role"] = "admin"
-            save_users(users)
+        update_user(email, {"role": "admin"})
     except Exception:
         pass
 
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.user_store import DB_PATH, USERS_PATH, import_users_json  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Importe un data/users.json (ancien stockage local) dans data/users.sqlite."
+    )
+    parser.add_argument("--path", type=Path, default=USERS_PATH, help="Fichier JSON à importer.")
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Écrase les comptes déjà présents (sinon ils sont conservés).",
+    )
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        print(f"Fichier introuvable: {args.path}")
+        raise SystemExit(1)
+
+    n_users, n_favs = import_users_json(args.path, replace=bool(args.replace))
+    print(f"OK: {n_users} users, {n_favs} favoris importés dans {DB_PATH}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -135,7 +135,7 @@ def migrate(*, dry_run: bool = False) -> tuple[int, int]:
 
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Migre data/users.json (stockage local) vers MySQL (Railway)."
+        description="Migre le stockage local (data/users.sqlite) vers MySQL (Railway)."
     )
     parser.add_argument("--dry-run", action="store_true", help="Teste sans écrire dans MySQL.")
     args = parser.parse_args()
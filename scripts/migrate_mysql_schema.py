@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.mysql_migrations import LATEST_SCHEMA_VERSION, MIGRATIONS, migrate, pending_migrations  # noqa: E402
+from utils.mysql_store import is_mysql_ready, mysql_conn  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Applique les migrations du schéma MySQL (table schema_version)."
+    )
+    parser.add_argument("--status", action="store_true", help="Affiche la version sans rien appliquer.")
+    args = parser.parse_args()
+
+    if not is_mysql_ready():
+        print("MySQL non configuré (secrets [mysql] ou variables MYSQL_*) ou pymysql absent.")
+        raise SystemExit(1)
+
+    with mysql_conn() as conn:
+        pending = pending_migrations(conn)
+        if args.status:
+            for migration in pending:
+                print(f"[{migration.version}] en attente : {migration.description}")
+            print(f"{len(MIGRATIONS) - len(pending)}/{len(MIGRATIONS)} migrations appliquées.")
+            raise SystemExit(0 if not pending else 2)
+
+        applied = migrate(conn)
+        remaining = pending_migrations(conn)
+
+    descriptions = {m.version: m.description for m in MIGRATIONS}
+    for version in applied:
+        print(f"[{version}] {descriptions[version]}")
+    if not applied and not remaining:
+        print(f"Schéma à jour (version {LATEST_SCHEMA_VERSION}).")
+    for migration in remaining:
+        print(f"[{migration.version}] non appliquée : {migration.description} (droits ALTER ?)")
+    raise SystemExit(0 if not remaining else 2)
+
+
+if __name__ == "__main__":
+    main()
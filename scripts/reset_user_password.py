@@ -29,14 +29,9 @@ def _set_role_mysql(email: str, role: str) -> None:
 
 
 def _set_role_local(email: str, role: str) -> None:
-    from utils.user_store import load_users, save_users
+    from utils.user_store import update_user
 
-    email = str(email).strip().lower()
-    users = load_users()
-    if email not in users:
-        return
-    users[email]["role"] = str(role)
-    save_users(users)
+    update_user(email, {"role": str(role)})
 
 
 def reset_password(email: str, password: str | None, pseudo: str | None, role: str | None) -> tuple[bool, str, str | None]:
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+ANN_MODEL_NAME = "ann"
+ANN_DEFAULT_DIM = 256
+ANN_DEFAULT_NPROBE = 16
+
+
+@dataclass(frozen=True)
+class AnnIndex:
+    """
+    Approximate cosine neighbours: random projection + inverted file (IVF).
+
+    `vectors` are the unit-normalized projections of every model row (float32,
+    `(n_rows, dim)`); rows are bucketed by their closest k-means `centroids`,
+    `list_rows[list_indptr[c]:list_indptr[c + 1]]` being the rows of list `c`.
+    A query scans its `nprobe` closest lists (more if they hold fewer than K
+    rows) and re-ranks those candidates with the exact cosine computed on the
+    unit-normalized CSR feature rows (`indptr` / `indices` / `data`).
+    """
+
+    vectors: np.ndarray
+    centroids: np.ndarray
+    list_indptr: np.ndarray
+    list_rows: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    n_features: int
+    nprobe: int = ANN_DEFAULT_NPROBE
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def _candidates(self, query: np.ndarray, k: int, nprobe: int) -> np.ndarray:
+        order = np.argsort(-(self.centroids @ query))
+        sizes = np.diff(self.list_indptr)[order]
+        # Enough lists to hold K rows, and at least `nprobe` of them.
+        needed = int(np.searchsorted(np.cumsum(sizes), k)) + 1
+        probed = order[: max(nprobe, needed)]
+        return np.concatenate(
+            [self.list_rows[self.list_indptr[c]: self.list_indptr[c + 1]] for c in probed.tolist()]
+        )
+
+    def _cosine(self, dense_query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(int(lengths.sum()))
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        weights = self.data[entries] * dense_query[self.indices[entries]]
+        return np.bincount(owner, weights=weights, minlength=len(rows)).astype(np.float32)
+
+    def search(
+        self, rows: list[int] | np.ndarray, k: int, nprobe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """`(indices, distances)` of the `k` approximate neighbours of model rows (cosine distance)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        k = max(1, min(int(k), self.n_rows))
+        nprobe = int(nprobe or self.nprobe)
+
+        indices = np.empty((len(rows), k), dtype=np.int64)
+        distances = np.empty((len(rows), k), dtype=np.float32)
+        dense = np.zeros(self.n_features, dtype=np.float32)
+        for i, row in enumerate(rows.tolist()):
+            candidates = self._candidates(self.vectors[row], k, nprobe)
+            start, stop = self.indptr[row], self.indptr[row + 1]
+            dense[self.indices[start:stop]] = self.data[start:stop]
+            sims = self._cosine(dense, candidates)
+            dense[self.indices[start:stop]] = 0.0
+            if candidates.size > k:
+                top = np.argpartition(-sims, k - 1)[:k]
+                candidates, sims = candidates[top], sims[top]
+            order = np.lexsort((candidates, -sims))
+            indices[i] = candidates[order]
+            distances[i] = 1.0 - sims[order]
+        return indices, distances
+
+
+def ann_index_paths(models_dir: Path) -> tuple[Path, Path]:
+    return models_dir / "ann_index.npz", models_dir / "ann_index.json"
+
+
+def _kmeans(vectors: np.ndarray, n_lists: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means (cosine) on unit vectors."""
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    for _ in range(int(iterations)):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        sums[~empty] /= norms[~empty]
+        # Empty lists restart from a random row.
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums.astype(np.float32)
+    return centroids
+
+
+def build_ann_index(
+    features: Any,
+    dim: int = ANN_DEFAULT_DIM,
+    n_lists: int | None = None,
+    nprobe: int = ANN_DEFAULT_NPROBE,
+    iterations: int = 10,
+    seed: int = 0,
+) -> AnnIndex:
+    """
+    Builds the index from a `(n_rows, n_features)` matrix (dense or scipy sparse).
+
+    The Gaussian projection keeps cosine similarities (Johnson-Lindenstrauss);
+    `n_lists` defaults to ~sqrt(n_rows).
+    """
+    from scipy import sparse  # offline build only
+
+    rng = np.random.default_rng(seed)
+    csr = sparse.csr_matrix(features, dtype=np.float32, copy=True)
+    csr.sort_indices()
+    row_norms = np.sqrt(np.asarray(csr.multiply(csr).sum(axis=1)).ravel())
+    csr = sparse.diags(np.divide(1.0, row_norms, out=np.zeros_like(row_norms), where=row_norms > 0)) @ csr
+    csr = sparse.csr_matrix(csr, dtype=np.float32)
+
+    n_rows, n_features = csr.shape
+    projection = rng.standard_normal((n_features, int(dim))).astype(np.float32) / np.sqrt(dim)
+    vectors = np.asarray(csr @ projection, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    n_lists = int(n_lists or max(1, round(np.sqrt(n_rows))))
+    n_lists = max(1, min(n_lists, n_rows))
+    centroids = _kmeans(vectors, n_lists, iterations, rng)
+
+    assign = np.argmax(vectors @ centroids.T, axis=1)
+    list_rows = np.argsort(assign, kind="stable").astype(np.int32)
+    list_indptr = np.searchsorted(assign[list_rows], np.arange(n_lists + 1)).astype(np.int64)
+    return AnnIndex(
+        vectors=vectors,
+        centroids=centroids,
+        list_indptr=list_indptr,
+        list_rows=list_rows,
+        indptr=csr.indptr.astype(np.int64),
+        indices=csr.indices.astype(np.int32),
+        data=csr.data.astype(np.float32),
+        n_features=int(n_features),
+        nprobe=int(nprobe),
+    )
+
+
+def evaluate_ann_index(
+    index: AnnIndex, exact_model: Any, k: int = 50, n_queries: int = 200, seed: int = 0
+) -> dict[str, float]:
+    """
+    Recall@k against the exact cosine neighbours and mean query latency (ms).
+
+    `exact_model` is a fitted sklearn model or a `FeatureMatrix` (cosine metric).
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(index.n_rows, size=min(int(n_queries), index.n_rows), replace=False)
+
+    started = time.perf_counter()
+    approx, _ = index.search(rows, k)
+    latency_ms = (time.perf_counter() - started) * 1000.0 / len(rows)
+
+    if hasattr(exact_model, "_fit_X"):
+        _, exact = exact_model.kneighbors(exact_model._fit_X[rows], n_neighbors=min(int(k), index.n_rows))
+    else:
+        exact, _ = exact_model.kneighbors(rows, k, "cosine")
+    hits = sum(len(set(a.tolist()) & set(e.tolist())) for a, e in zip(approx, exact))
+    return {
+        "k": int(k),
+        "queries": int(len(rows)),
+        "recall": hits / float(exact.size),
+        "latency_ms": latency_ms,
+    }
+
+
+def save_ann_index(index: AnnIndex, models_dir: Path, meta: dict[str, Any] | None = None) -> None:
+    npz_path, meta_path = ann_index_paths(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        npz_path,
+        vectors=index.vectors,
+        centroids=index.centroids,
+        list_indptr=index.list_indptr,
+        list_rows=index.list_rows,
+        indptr=index.indptr,
+        indices=index.indices,
+        data=index.data,
+        n_features=np.asarray(index.n_features),
+        nprobe=np.asarray(index.nprobe),
+    )
+    info = dict(meta or {})
+    info.update({"n_rows": index.n_rows, "dim": int(index.vectors.shape[1]),
+                 "n_lists": int(len(index.centroids)), "nprobe": index.nprobe})
+    meta_path.write_text(json.dumps(info, indent=2), encoding="utf-8")
+
+
+@lru_cache(maxsize=1)
+def load_ann_index(models_dir: str) -> AnnIndex | None:
+    npz_path, _ = ann_index_paths(Path(models_dir))
+    if not npz_path.exists():
+        return None
+    try:
+        with np.load(npz_path) as data:
+            return AnnIndex(
+                vectors=data["vectors"],
+                centroids=data["centroids"],
+                list_indptr=data["list_indptr"],
+                list_rows=data["list_rows"],
+                indptr=data["indptr"],
+                indices=data["indices"],
+                data=data["data"],
+                n_features=int(data["n_features"]),
+                nprobe=int(data["nprobe"]),
+            )
+    except Exception:
+        return None
+
+
+def load_ann_meta(models_dir: str) -> dict[str, Any]:
+    _, meta_path = ann_index_paths(Path(models_dir))
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+FEATURE_METRICS = ("cosine", "euclidean", "manhattan")
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """
+    The KNN models' feature matrix as float32 CSR arrays (`data` / `indices` / `indptr`).
+
+    Loaded with `mmap_mode="r"`, the arrays live in the OS page cache and are
+    shared by every worker process; only per-row arrays (norms, row starts,
+    a few floats per row) are computed per process, nothing of the matrix size.
+    Distances match sklearn's brute-force metrics.
+    """
+
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    n_features: int
+    _starts: np.ndarray = field(init=False, repr=False, compare=False)
+    _empty: np.ndarray = field(init=False, repr=False, compare=False)
+    _l2_sq: np.ndarray = field(init=False, repr=False, compare=False)
+    _l1: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        indptr = np.asarray(self.indptr, dtype=np.int64)
+        # `np.add.reduceat` segments run to the next start: only non-empty rows
+        # (strictly increasing, in-range starts) are reduced.
+        empty = indptr[:-1] == indptr[1:]
+        object.__setattr__(self, "_empty", empty)
+        object.__setattr__(self, "_starts", indptr[:-1][~empty])
+        values = np.asarray(self.data, dtype=np.float64)
+        object.__setattr__(self, "_l2_sq", self._row_sums(values * values))
+        object.__setattr__(self, "_l1", self._row_sums(np.abs(values)))
+
+    @property
+    def n_rows(self) -> int:
+        return int(len(self.indptr) - 1)
+
+    def _row_sums(self, values: np.ndarray) -> np.ndarray:
+        """Sum of `values` (one per stored entry) over each row's entries."""
+        sums = np.zeros(self.n_rows, dtype=np.float64)
+        if self._starts.size:
+            sums[~self._empty] = np.add.reduceat(values, self._starts)
+        return sums
+
+    def distances(self, row: int, metric: str) -> np.ndarray:
+        """Distances (float64) from model row `row` to every row."""
+        data = np.asarray(self.data)
+        indices = np.asarray(self.indices)
+        span = slice(int(self.indptr[row]), int(self.indptr[row + 1]))
+        dense = np.zeros(self.n_features, dtype=np.float64)
+        dense[indices[span]] = data[span]
+        gathered = np.take(dense, indices)
+
+        if metric == "manhattan":
+            # |x - q| over the row's entries replaces |x| + |q| where both are set.
+            overlap = np.abs(data - gathered) - np.abs(data) - np.abs(gathered)
+            corrections = self._row_sums(overlap)
+            return np.maximum(self._l1 + self._l1[row] + corrections, 0.0)
+
+        dots = self._row_sums(np.multiply(data, gathered, dtype=np.float64))
+        if metric == "euclidean":
+            return np.sqrt(np.maximum(self._l2_sq + self._l2_sq[row] - 2.0 * dots, 0.0))
+        norms = np.sqrt(self._l2_sq)
+        denom = norms * norms[row]
+        sims = np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+        return 1.0 - sims
+
+    def kneighbors(
+        self, rows: list[int] | np.ndarray, k: int, metric: str = "cosine"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """`(indices, distances)` of the `k` nearest rows of each model row (closest first)."""
+        if metric not in FEATURE_METRICS:
+            raise ValueError(f"Métrique inconnue: {metric}")
+        rows = np.asarray(rows, dtype=np.int64)
+        k = max(1, min(int(k), self.n_rows))
+
+        indices = np.empty((len(rows), k), dtype=np.int64)
+        distances = np.empty((len(rows), k), dtype=np.float64)
+        for i, row in enumerate(rows.tolist()):
+            dist = self.distances(row, metric)
+            top = np.argpartition(dist, k - 1)[:k] if k < self.n_rows else np.arange(self.n_rows)
+            order = top[np.lexsort((top, dist[top]))]
+            indices[i] = order
+            distances[i] = dist[order]
+        return indices, distances
+
+
+def feature_matrix_paths(models_dir: Path) -> tuple[Path, Path, Path, Path]:
+    return (
+        models_dir / "features_data.npy",
+        models_dir / "features_indices.npy",
+        models_dir / "features_indptr.npy",
+        models_dir / "features_shape.npy",
+    )
+
+
+@lru_cache(maxsize=1)
+def load_feature_matrix(models_dir: str) -> FeatureMatrix | None:
+    paths = feature_matrix_paths(Path(models_dir))
+    if not all(path.exists() for path in paths):
+        return None
+    try:
+        data, indices, indptr = (np.load(path, mmap_mode="r") for path in paths[:3])
+        n_rows, n_features = (int(v) for v in np.load(paths[3]))
+    except Exception:
+        return None
+    if indptr.ndim != 1 or len(indptr) != n_rows + 1 or data.shape != indices.shape:
+        return None
+    return FeatureMatrix(data=data, indices=indices, indptr=indptr, n_features=n_features)
+
+
+def save_feature_arrays(
+    data: np.ndarray, indices: np.ndarray, indptr: np.ndarray, shape: tuple[int, int], models_dir: Path
+) -> None:
+    """Writes CSR arrays (sorted column indices, no duplicates) as the shared `.npy` files."""
+    data_path, indices_path, indptr_path, shape_path = feature_matrix_paths(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+    np.save(data_path, np.ascontiguousarray(data, dtype=np.float32))
+    np.save(indices_path, np.ascontiguousarray(indices, dtype=np.int32))
+    np.save(indptr_path, np.ascontiguousarray(indptr, dtype=np.int64))
+    np.save(shape_path, np.asarray(shape, dtype=np.int64))
+
+
+def save_feature_matrix(features: Any, models_dir: Path) -> None:
+    """Writes a (scipy sparse or dense) matrix as float32 CSR `.npy` files (offline: needs scipy)."""
+    from scipy import sparse
+
+    csr = sparse.csr_matrix(features, dtype=np.float32, copy=True)
+    csr.sum_duplicates()
+    csr.sort_indices()
+    save_feature_arrays(csr.data, csr.indices, csr.indptr, csr.shape, models_dir)
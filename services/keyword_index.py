@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils.catalog import catalog_for
+from utils.text import normalize_text
+
+
+@dataclass(frozen=True)
+class KeywordMatrix:
+    """
+    CSR movie-by-token matrix (keywords, `genre_*`, `lang_*` tokens).
+
+    Kept in plain NumPy so the keyword fallback works without scipy.
+      - `indices[indptr[i]:indptr[i + 1]]`: distinct token ids of row `i`
+      - `counts`: occurrences of each token in the row (user profile weights)
+      - `row_ids`: row of each stored entry (for `np.bincount` mat-vecs)
+      - `row_norms`: sqrt(number of distinct tokens) of each row
+    """
+
+    vocabulary: dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    counts: np.ndarray
+    row_ids: np.ndarray
+    row_norms: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return int(len(self.indptr) - 1)
+
+    def user_profile(self, positions: np.ndarray) -> np.ndarray:
+        """Summed token counts of the rows at `positions` (dense, vocabulary-sized)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if positions.size == 0:
+            return np.zeros(len(self.vocabulary), dtype=float)
+        starts = self.indptr[positions]
+        ends = self.indptr[positions + 1]
+        lengths = ends - starts
+        entries = np.repeat(ends - lengths.cumsum(), lengths) + np.arange(int(lengths.sum()))
+        return np.bincount(
+            self.indices[entries],
+            weights=self.counts[entries],
+            minlength=len(self.vocabulary),
+        )
+
+    def cosine_scores(self, profile: np.ndarray) -> np.ndarray:
+        """Cosine between a user profile and every (binary) row."""
+        profile_norm = float(np.sqrt(np.dot(profile, profile)))
+        if profile_norm <= 0:
+            return np.zeros(self.n_rows, dtype=float)
+        dots = np.bincount(self.row_ids, weights=profile[self.indices], minlength=self.n_rows)
+        denom = profile_norm * self.row_norms
+        return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+
+def _token(value: object, cache: dict[str, str]) -> str:
+    raw = str(value)
+    tok = cache.get(raw)
+    if tok is None:
+        tok = normalize_text(raw).replace(" ", "_")
+        cache[raw] = tok
+    return tok
+
+
+def _row_tokens(kw: object, genre_main: object, language: object, cache: dict[str, str]) -> list[str]:
+    tokens: list[str] = []
+    if pd.notna(kw) and str(kw).strip():
+        for part in str(kw).split("|"):
+            tok = _token(part, cache)
+            if tok:
+                tokens.append(tok)
+    if pd.notna(genre_main) and str(genre_main).strip():
+        tok = _token(genre_main, cache)
+        if tok:
+            tokens.append(f"genre_{tok}")
+    if pd.notna(language) and str(language).strip():
+        tok = _token(language, cache)
+        if tok:
+            tokens.append(f"lang_{tok}")
+    return tokens
+
+
+def build_keyword_matrix(df: pd.DataFrame) -> KeywordMatrix:
+    n_rows = int(len(df))
+    missing = pd.Series([np.nan] * n_rows, index=df.index)
+    keywords = (df["plot_keywords_final"] if "plot_keywords_final" in df.columns else missing).tolist()
+    genres = (df["genre_main"] if "genre_main" in df.columns else missing).tolist()
+    languages = (df["language"] if "language" in df.columns else missing).tolist()
+
+    vocabulary: dict[str, int] = {}
+    cache: dict[str, str] = {}
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    indices: list[int] = []
+    counts: list[int] = []
+
+    for i, (kw, genre_main, language) in enumerate(zip(keywords, genres, languages)):
+        row_counts: dict[int, int] = {}
+        for tok in _row_tokens(kw, genre_main, language, cache):
+            tok_id = vocabulary.setdefault(tok, len(vocabulary))
+            row_counts[tok_id] = row_counts.get(tok_id, 0) + 1
+        indices.extend(row_counts.keys())
+        counts.extend(row_counts.values())
+        indptr[i + 1] = len(indices)
+
+    lengths = np.diff(indptr)
+    return KeywordMatrix(
+        vocabulary=vocabulary,
+        indptr=indptr,
+        indices=np.asarray(indices, dtype=np.int32),
+        counts=np.asarray(counts, dtype=float),
+        row_ids=np.repeat(np.arange(n_rows, dtype=np.int32), lengths),
+        row_norms=np.sqrt(lengths.astype(float)),
+    )
+
+
+def get_keyword_matrix(df: pd.DataFrame) -> KeywordMatrix:
+    """`build_keyword_matrix` memoized per catalog version."""
+    return catalog_for(df).derived("keyword_matrix", lambda: build_keyword_matrix(df))
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils.text import normalize_text_series
+
+
+# (column, token prefix, separator): people share one prefix so a director who
+# also wrote the film counts twice, like in the original models.
+FEATURE_TOKEN_COLUMNS = (
+    ("genres", "genre", "|"),
+    ("director_name", "person", None),
+    ("actor_1_name", "person", None),
+    ("actor_2_name", "person", None),
+    ("actor_3_name", "person", None),
+    ("Writer", "person", ","),
+    ("plot_keywords_final", "kw", "|"),
+    ("language", "lang", None),
+    ("country_main", "country", None),
+    ("content_rating", "rating", None),
+)
+
+# Numeric columns scaled to [0, 1]; `log` ones go through log1p first (heavy tails).
+FEATURE_NUMERIC_COLUMNS = (
+    ("duration", False),
+    ("title_year", False),
+    ("imdb_score", False),
+    ("vote_average", False),
+    ("score_global", False),
+    ("num_voted_users", True),
+    ("num_critic_for_reviews", True),
+    ("num_user_for_reviews", True),
+    ("vote_count", True),
+    ("popularity", True),
+    ("gross", True),
+    ("budget", True),
+)
+
+
+@dataclass(frozen=True)
+class CatalogFeatures:
+    """
+    Movie-by-feature CSR arrays derived from the catalog CSV (row `i` = CSV row `i`).
+
+    Token columns come first (`vocabulary[j]` is the name of column `j`), then
+    one column per `FEATURE_NUMERIC_COLUMNS` entry. Missing numeric values are
+    left out (0), like the min of the column.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    vocabulary: list[str]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return int(len(self.indptr) - 1), len(self.vocabulary)
+
+
+def _token_codes(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """(row, token name) pairs of every token column, as (rows, names) arrays."""
+    rows: list[np.ndarray] = []
+    names: list[pd.Series] = []
+    for column, prefix, separator in FEATURE_TOKEN_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column].dropna().astype(str)
+        if separator is not None:
+            values = values.str.split(separator).explode()
+        values = values.str.strip()
+        values = values[values != ""]
+        normalized = normalize_text_series(values).str.replace(" ", "_", regex=False)
+        normalized = normalized[normalized != ""]
+        rows.append(normalized.index.to_numpy(dtype=np.int64))
+        names.append(prefix + "=" + normalized)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+    return np.concatenate(rows), pd.concat(names).to_numpy(dtype=object)
+
+
+def _scaled(series: pd.Series, log: bool) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    if log:
+        values = np.log1p(np.clip(values, 0.0, None))
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros(len(values))
+    low, high = values[finite].min(), values[finite].max()
+    if high == low:
+        return np.zeros(len(values))
+    return np.where(finite, (values - low) / (high - low), 0.0)
+
+
+def build_catalog_features(df: pd.DataFrame) -> CatalogFeatures:
+    """Token counts + scaled numeric columns of every catalog row (deterministic)."""
+    df = df.reset_index(drop=True)
+    n_rows = len(df)
+
+    token_rows, token_names = _token_codes(df)
+    codes, vocabulary = pd.factorize(pd.Series(token_names, dtype=object), sort=True)
+    vocabulary = [str(v) for v in vocabulary]
+    n_tokens = len(vocabulary)
+
+    # Counts per (row, token): a token repeated in a row gets value 2, 3, ...
+    stride = max(n_tokens, 1)
+    pairs, counts = np.unique(token_rows * stride + codes, return_counts=True)
+    all_rows = [pairs // stride]
+    all_cols = [pairs % stride]
+    all_vals = [counts.astype(np.float64)]
+    for offset, (column, log) in enumerate(FEATURE_NUMERIC_COLUMNS):
+        vocabulary.append(f"num={column}")
+        if column not in df.columns:
+            continue
+        scaled = _scaled(df[column], log)
+        present = np.flatnonzero(scaled != 0.0)
+        all_rows.append(present)
+        all_cols.append(np.full(len(present), n_tokens + offset, dtype=np.int64))
+        all_vals.append(scaled[present])
+
+    rows = np.concatenate(all_rows)
+    cols = np.concatenate(all_cols)
+    vals = np.concatenate(all_vals)
+    order = np.lexsort((cols, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+
+    indptr = np.searchsorted(rows, np.arange(n_rows + 1)).astype(np.int64)
+    return CatalogFeatures(
+        indptr=indptr,
+        indices=cols.astype(np.int32),
+        data=vals.astype(np.float32),
+        vocabulary=vocabulary,
+    )
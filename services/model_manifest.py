@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+
+MANIFEST_NAME = "manifest.json"
+ROW_KEYS_NAME = "row_keys.json"
+# Bump when the layout of the artifacts written by `scripts/build_models.py` changes.
+MANIFEST_FORMAT = 1
+
+
+def keys_fingerprint(keys: Iterable[Any]) -> str:
+    """sha1 of the ordered imdb_keys: identifies the row order of a model."""
+    digest = hashlib.sha1()
+    for key in keys:
+        digest.update(("" if key is None else str(key).strip()).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(path: Path) -> list[int]:
+    """(size, mtime_ns): cheap check that a stamped file was not rewritten since."""
+    stat = path.stat()
+    return [int(stat.st_size), int(stat.st_mtime_ns)]
+
+
+@dataclass(frozen=True)
+class ArtifactStatus:
+    """
+    Whether the artifacts of `ml/` may be used with a catalog.
+
+    Without a manifest (hand-copied or legacy pickles) only the row count can be
+    checked, so every file is allowed but `verified` is False (`reason` says
+    so); with one, the rows must be the catalog's rows in the same order and
+    only the files it stamped, still identical to what was built, are used
+    (`altered` lists the ones rewritten since).
+    """
+
+    ok: bool
+    reason: str | None = None
+    files: frozenset[str] | None = None
+    altered: tuple[str, ...] = ()
+    verified: bool = True
+
+    def allows(self, *paths: Path) -> bool:
+        return self.ok and (self.files is None or all(path.name in self.files for path in paths))
+
+
+def load_manifest(models_dir: Path) -> dict[str, Any] | None:
+    path = models_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def check_artifacts(models_dir: Path, keys: Iterable[Any] | None = None) -> ArtifactStatus:
+    """Status of `models_dir` for a catalog whose rows have `keys` (row order unchecked if None)."""
+    manifest = load_manifest(models_dir)
+    if manifest is None:
+        return ArtifactStatus(
+            ok=True,
+            reason=f"Modèles non vérifiés (pas de {MANIFEST_NAME}, seul le nombre de lignes est contrôlé)",
+            verified=False,
+        )
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return ArtifactStatus(ok=False, reason=f"Manifeste des modèles illisible ou obsolète: {MANIFEST_NAME}")
+
+    rows = manifest.get("rows") or {}
+    keys = None if keys is None else list(keys)
+    if keys is not None and (
+        int(rows.get("count", -1)) != len(keys) or rows.get("keys_sha1") != keys_fingerprint(keys)
+    ):
+        return ArtifactStatus(
+            ok=False,
+            reason="Modèles construits pour un autre catalogue (lignes non alignées)",
+        )
+
+    # A file whose size/mtime moved is hashed; only a changed sha256 rejects it
+    # (a copy or checkout keeps the content but not the mtime).
+    stamps = manifest.get("stamps") or {}
+    verified: set[str] = set()
+    altered: list[str] = []
+    for name, sha256 in (manifest.get("artifacts") or {}).items():
+        path = models_dir / name
+        if not path.exists():
+            continue
+        if stamps.get(name) == file_stamp(path) or file_sha256(path) == sha256:
+            verified.add(name)
+        else:
+            altered.append(name)
+    return ArtifactStatus(ok=True, files=frozenset(verified), altered=tuple(sorted(altered)))
+
+
+def legacy_build_refusal(models_dir: Path) -> str | None:
+    """
+    Why a pickle-based builder must not write into `models_dir` (None if it may).
+
+    Those builders follow the row order of `ml/KNN_*.pkl`, not the catalog's:
+    once `scripts/build_models.py` stamped the directory, only it rebuilds.
+    """
+    if not (models_dir / MANIFEST_NAME).exists():
+        return None
+    return (
+        f"{models_dir / MANIFEST_NAME} existe : ce dossier est géré par "
+        "`python scripts/build_models.py` (ordre des lignes du catalogue). "
+        "Relancez-le plutôt que ce script, ou utilisez un autre --models-dir."
+    )
+
+
+def write_manifest(models_dir: Path, keys: list[str], artifacts: list[Path], meta: dict[str, Any]) -> Path:
+    """Writes `row_keys.json` then the manifest (last, atomically) stamping `artifacts`."""
+    keys_path = models_dir / ROW_KEYS_NAME
+    keys_path.write_text(json.dumps(keys), encoding="utf-8")
+
+    stamped = [*artifacts, keys_path]
+    manifest = dict(meta)
+    manifest.update(
+        {
+            "format": MANIFEST_FORMAT,
+            "rows": {"count": len(keys), "keys_sha1": keys_fingerprint(keys), "keys_file": ROW_KEYS_NAME},
+            "artifacts": {path.name: file_sha256(path) for path in stamped},
+            "stamps": {path.name: file_stamp(path) for path in stamped},
+        }
+    )
+    path = models_dir / MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
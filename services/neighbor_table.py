@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+NEIGHBOR_TABLE_K = 256
+
+
+@dataclass(frozen=True)
+class NeighborTable:
+    """
+    Precomputed top-K neighbours of every model row (row itself included).
+
+    `indices` (int32) and `distances` (float32) are `(n_rows, K)` arrays, usually
+    memory-mapped from `ml/neighbors_<metric>_{idx,dist}.npy`.
+    """
+
+    indices: np.ndarray
+    distances: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.indices.shape[0])
+
+    @property
+    def k(self) -> int:
+        return int(self.indices.shape[1])
+
+    def gather(self, rows: list[int] | np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """First `k` neighbours of `rows`; a table only answers `k <= K` (no silent truncation)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        k = max(1, int(k))
+        if k > self.k:
+            raise ValueError(f"Table de voisins limitee a K={self.k} (k={k} demande).")
+        return self.indices[rows, :k], self.distances[rows, :k]
+
+
+def neighbor_table_paths(models_dir: Path, metric: str) -> tuple[Path, Path]:
+    return (
+        models_dir / f"neighbors_{metric}_idx.npy",
+        models_dir / f"neighbors_{metric}_dist.npy",
+    )
+
+
+@lru_cache(maxsize=3)
+def load_neighbor_table(models_dir: str, metric: str) -> NeighborTable | None:
+    idx_path, dist_path = neighbor_table_paths(Path(models_dir), metric)
+    if not idx_path.exists() or not dist_path.exists():
+        return None
+    try:
+        indices = np.load(idx_path, mmap_mode="r")
+        distances = np.load(dist_path, mmap_mode="r")
+    except Exception:
+        return None
+    if indices.ndim != 2 or indices.shape != distances.shape:
+        return None
+    return NeighborTable(indices=indices, distances=distances)
+
+
+def build_neighbor_table(model: Any, k: int = NEIGHBOR_TABLE_K, batch_size: int = 512) -> NeighborTable:
+    """Runs `model.kneighbors` over every fitted row (offline: needs sklearn)."""
+    fit_x = model._fit_X
+    # Same as `recommendation_service._load_knn_model`: sklearn's sparse manhattan
+    # kernel needs sorted column indices, which the shipped pickles lack.
+    if hasattr(fit_x, "sort_indices"):
+        fit_x.sort_indices()
+    n_rows = int(fit_x.shape[0])
+    k = max(1, min(int(k), n_rows))
+
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    distances = np.empty((n_rows, k), dtype=np.float32)
+    for start in range(0, n_rows, int(batch_size)):
+        stop = min(start + int(batch_size), n_rows)
+        dist, idx = model.kneighbors(fit_x[start:stop], n_neighbors=k)
+        indices[start:stop] = idx
+        distances[start:stop] = dist
+    return NeighborTable(indices=indices, distances=distances)
+
+
+def save_neighbor_table(table: NeighborTable, models_dir: Path, metric: str) -> None:
+    idx_path, dist_path = neighbor_table_paths(models_dir, metric)
+    models_dir.mkdir(parents=True, exist_ok=True)
+    np.save(idx_path, np.ascontiguousarray(table.indices, dtype=np.int32))
+    np.save(dist_path, np.ascontiguousarray(table.distances, dtype=np.float32))
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from utils.settings import get_reco_cache_backend
+
+
+RECO_CACHE_MAX_ENTRIES = 2000
+_SQLITE_PATH = Path(__file__).resolve().parent.parent / "data" / "cache" / "reco_cache.sqlite"
+
+# Ranked recommendations: (imdb_keys, scores), best first.
+RankedRecos = tuple[list[str], list[float]]
+
+
+def reco_cache_key(
+    favorites: Iterable[str], model: str, catalog_version: str, n: int, context: str = ""
+) -> str:
+    """
+    Stable key of a ranking: hash of the favorites + model + catalog version + size.
+
+    `context` holds anything else the ranking depends on (the model artifacts
+    actually served, the favorite dates of the recency aggregation, ...).
+    """
+    digest = hashlib.sha1()
+    for key in sorted({str(k).strip() for k in favorites if k is not None}):
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(f"|{model}|{catalog_version}|{int(n)}|{context}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _dump(entry: RankedRecos) -> str:
+    keys, scores = entry
+    return json.dumps([list(keys), [float(s) for s in scores]], separators=(",", ":"))
+
+
+def _load(payload: str) -> RankedRecos | None:
+    try:
+        keys, scores = json.loads(payload)
+        return [str(k) for k in keys], [float(s) for s in scores]
+    except Exception:
+        return None
+
+
+class MemoryRecoCache:
+    """In-process LRU (per worker)."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = RECO_CACHE_MAX_ENTRIES):
+        self.max_entries = int(max_entries)
+        self._entries: OrderedDict[str, RankedRecos] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> RankedRecos | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: RankedRecos) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteRecoCache:
+    """Local SQLite file shared by every worker / session of the machine."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = _SQLITE_PATH, max_entries: int = RECO_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            # Persistent setting of the database file: set once, not per connection.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reco_cache (
+                  cache_key TEXT PRIMARY KEY,
+                  payload TEXT NOT NULL,
+                  last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_reco_cache_last_used ON reco_cache(last_used)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction on a fresh connection, closed afterwards."""
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> RankedRecos | None:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM reco_cache WHERE cache_key=?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE reco_cache SET last_used=? WHERE cache_key=?", (time.time(), key)
+            )
+        return _load(row[0])
+
+    def put(self, key: str, entry: RankedRecos) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reco_cache (cache_key, payload, last_used) VALUES (?,?,?)",
+                (key, _dump(entry), time.time()),
+            )
+            conn.execute(
+                """
+                DELETE FROM reco_cache WHERE cache_key IN (
+                  SELECT cache_key FROM reco_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM reco_cache")
+
+
+class MysqlRecoCache:
+    """`reco_cache` table of the app database (shared by every server)."""
+
+    name = "mysql"
+
+    def __init__(self, max_entries: int = RECO_CACHE_MAX_ENTRIES):
+        from utils.mysql_store import ensure_schema, mysql_conn
+
+        # The table comes with the schema migrations (utils/mysql_migrations.py).
+        ensure_schema()
+        self._conn = mysql_conn
+        self.max_entries = int(max_entries)
+
+    def get(self, key: str) -> RankedRecos | None:
+        with self._conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT payload FROM reco_cache WHERE cache_key=%s", (key,))
+                row = cur.fetchone()
+                if row is not None:
+                    cur.execute(
+                        "UPDATE reco_cache SET last_used=CURRENT_TIMESTAMP(3) WHERE cache_key=%s",
+                        (key,),
+                    )
+            conn.commit()
+        return None if row is None else _load(row["payload"])
+
+    def put(self, key: str, entry: RankedRecos) -> None:
+        with self._conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO reco_cache (cache_key, payload) VALUES (%s,%s)
+                    ON DUPLICATE KEY UPDATE payload=VALUES(payload), last_used=CURRENT_TIMESTAMP(3)
+                    """,
+                    (key, _dump(entry)),
+                )
+                cur.execute(
+                    """
+                    DELETE reco_cache FROM reco_cache
+                    JOIN (
+                      SELECT cache_key FROM reco_cache ORDER BY last_used DESC LIMIT 18446744073709551615 OFFSET %s
+                    ) AS old USING (cache_key)
+                    """,
+                    (self.max_entries,),
+                )
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM reco_cache")
+            conn.commit()
+
+
+@lru_cache(maxsize=3)
+def _open_backend(name: str):
+    if name == "sqlite":
+        return SqliteRecoCache()
+    if name == "mysql":
+        from utils.mysql_store import is_mysql_ready
+
+        if is_mysql_ready():
+            return MysqlRecoCache()
+    return MemoryRecoCache()
+
+
+def get_reco_cache():
+    """Backend selected in the settings (`reco_cache_backend`); memory if unavailable."""
+    name = get_reco_cache_backend()
+    try:
+        return _open_backend(name)
+    except Exception:
+        return _open_backend("memory")
+
+
+def clear_reco_cache() -> None:
+    get_reco_cache().clear()
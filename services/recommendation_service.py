@@ -1,21 +1,37 @@
 from __future__ import annotations
 
-import math
+import hashlib
 import re
-from collections import Counter
+from collections import Counter, OrderedDict
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Mapping
 
+import numpy as np
 import pandas as pd
 
-from utils.settings import get_recommender_model
-from utils.text import normalize_text
+from services.ann_index import ANN_MODEL_NAME, ann_index_paths, load_ann_index, load_ann_meta
+from services.feature_matrix import feature_matrix_paths, load_feature_matrix
+from services.keyword_index import get_keyword_matrix
+from services.model_manifest import MANIFEST_NAME, ArtifactStatus, check_artifacts, file_sha256
+from services.neighbor_table import NEIGHBOR_TABLE_K, load_neighbor_table, neighbor_table_paths
+from services.reco_cache import get_reco_cache, reco_cache_key
+from utils.catalog import MovieCatalog, catalog_for
+from utils.settings import get_reco_aggregation, get_recommender_model
+from utils.text import normalize_text_series
 
 
 _KNN_MODELS_DIR = Path(__file__).resolve().parent.parent / "ml"
 _MAX_PER_FRANCHISE_DEFAULT = 2
 
+RECO_AGGREGATIONS = ("max", "sum", "mean", "rrf", "recency")
+_RRF_K = 60
+# Bumped when the neighbour scores or counts change: cached rankings are keyed on it.
+_SCORE_VERSION = 3
+_RECENCY_HALF_LIFE_DAYS = 180.0
+# Favorites whose neighbour lists a session keeps (see `FavoriteNeighbors`).
+FAVORITE_NEIGHBORS_MAX_ROWS = 128
+
 _TITLE_STOPWORDS = {
     # Articles / determiners
     "the",
@@ -100,8 +116,6 @@ _SEQUEL_PREFIX_RE = re.compile(
 )
 _ORDINAL_RE = re.compile(r"^[0-9]+(?:st|nd|rd|th)$")
 
-_FIRST_CORE_TOKEN_COUNTS: dict[str, int] | None = None
-_FIRST_CORE_TOKEN_COUNTS_N: int | None = None
 _SAFE_SINGLE_TOKEN_MAX_FREQ = 12
 
 
@@ -135,9 +149,9 @@ def _title_norm_series(df: pd.DataFrame) -> pd.Series:
     if "title_search" in df.columns:
         return df["title_search"].fillna("").astype(str)
     if "movie_title_clean" in df.columns:
-        return df["movie_title_clean"].fillna("").astype(str).map(normalize_text)
+        return normalize_text_series(df["movie_title_clean"].fillna(""))
     if "movie_title" in df.columns:
-        return df["movie_title"].fillna("").astype(str).map(normalize_text)
+        return normalize_text_series(df["movie_title"].fillna(""))
     return pd.Series([""] * len(df), index=df.index)
 
 
@@ -147,46 +161,29 @@ def _core_title_tokens(tokens: list[str]) -> list[str]:
     return core or cleaned
 
 
-def _first_core_token_counts(df: pd.DataFrame) -> dict[str, int]:
-    global _FIRST_CORE_TOKEN_COUNTS, _FIRST_CORE_TOKEN_COUNTS_N
-
-    n = int(len(df))
-    if _FIRST_CORE_TOKEN_COUNTS is not None and _FIRST_CORE_TOKEN_COUNTS_N == n:
-        return _FIRST_CORE_TOKEN_COUNTS
-
-    title_norm = _title_norm_series(df)
-    first_tokens: list[str] = []
-    for raw in title_norm.tolist():
-        tokens = str(raw).split()
-        core = _core_title_tokens(tokens)
-        first_tokens.append(core[0] if core else "")
-
-    counts = Counter(t for t in first_tokens if t)
-    _FIRST_CORE_TOKEN_COUNTS = dict(counts)
-    _FIRST_CORE_TOKEN_COUNTS_N = n
-    return _FIRST_CORE_TOKEN_COUNTS
-
-
-def _is_safe_single_token_franchise_key(token: str, full_df: pd.DataFrame | None) -> bool:
+def _is_safe_single_token_franchise_key(token: str, first_core_counts: Counter) -> bool:
     tok = (token or "").strip().lower()
     if len(tok) < 4:
         return False
     if tok.isdigit():
         return False
-    if full_df is None or full_df.empty:
-        return True
-    return _first_core_token_counts(full_df).get(tok, 0) <= _SAFE_SINGLE_TOKEN_MAX_FREQ
+    return first_core_counts.get(tok, 0) <= _SAFE_SINGLE_TOKEN_MAX_FREQ
 
 
-def _compute_franchise_keys(candidates: pd.DataFrame, full_df: pd.DataFrame | None = None) -> pd.Series:
-    title_norm = _title_norm_series(candidates)
+def _compute_franchise_keys(df: pd.DataFrame) -> pd.Series:
+    """Franchise key of every title, with key frequencies counted over `df` itself."""
+    title_norm = _title_norm_series(df)
 
     base_keys: list[str] = []
     key2_list: list[str] = []
     key1_list: list[str] = []
+    first_core_tokens: list[str] = []
     for raw in title_norm.tolist():
-        tokens = str(raw).split()
-        tokens = _strip_sequel_suffix(tokens)
+        raw_tokens = str(raw).split()
+        unstripped_core = _core_title_tokens(raw_tokens)
+        first_core_tokens.append(unstripped_core[0] if unstripped_core else "")
+
+        tokens = _strip_sequel_suffix(raw_tokens)
         core = _core_title_tokens(tokens)
         base = " ".join(core).strip()
         key2 = " ".join(core[:2]).strip() if len(core) >= 2 else ""
@@ -197,6 +194,7 @@ def _compute_franchise_keys(candidates: pd.DataFrame, full_df: pd.DataFrame | No
 
     key2_counts = Counter(k for k in key2_list if k)
     key1_counts = Counter(k for k in key1_list if k)
+    first_core_counts = Counter(t for t in first_core_tokens if t)
 
     final_keys: list[str] = []
     for base, key2, key1 in zip(base_keys, key2_list, key1_list):
@@ -206,13 +204,57 @@ def _compute_franchise_keys(candidates: pd.DataFrame, full_df: pd.DataFrame | No
         if (
             key1
             and key1_counts.get(key1, 0) >= 2
-            and _is_safe_single_token_franchise_key(key1, full_df)
+            and _is_safe_single_token_franchise_key(key1, first_core_counts)
         ):
             final_keys.append(key1)
             continue
         final_keys.append(base or key2 or key1 or "")
 
-    return pd.Series(final_keys, index=candidates.index)
+    return pd.Series(final_keys, index=df.index)
+
+
+def _build_franchise_ids(df: pd.DataFrame) -> np.ndarray:
+    """int32 franchise id per row; titles without a key get their own id."""
+    keys = _compute_franchise_keys(df)
+    codes, uniques = pd.factorize(keys.replace("", np.nan), use_na_sentinel=True)
+    ids = codes.astype(np.int32)
+    missing = np.flatnonzero(ids < 0)
+    ids[missing] = len(uniques) + np.arange(missing.size, dtype=np.int32)
+    return ids
+
+
+def get_franchise_ids(df: pd.DataFrame) -> np.ndarray:
+    """Franchise ids computed once over the whole catalog (aligned on row positions)."""
+    return catalog_for(df).derived("franchise_ids", lambda: _build_franchise_ids(df))
+
+
+def _franchise_cap_mask(franchise_ids: np.ndarray, max_per_franchise: int) -> np.ndarray:
+    """True for the first `max_per_franchise` occurrences (in order) of each franchise."""
+    n_items = int(franchise_ids.size)
+    if n_items == 0:
+        return np.zeros(0, dtype=bool)
+    order = np.argsort(franchise_ids, kind="stable")
+    sorted_ids = franchise_ids[order]
+    starts = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(n_items), 0))
+    occurrence = np.empty(n_items, dtype=np.int64)
+    occurrence[order] = np.arange(n_items) - group_start
+    return occurrence < int(max_per_franchise)
+
+
+def _catalog_positions(candidates: pd.DataFrame, full_df: pd.DataFrame) -> np.ndarray | None:
+    """Row positions of `candidates` in `full_df` (None when they cannot all be located)."""
+    if full_df.index.is_unique:
+        positions = full_df.index.get_indexer(candidates.index)
+        return positions if (positions >= 0).all() else None
+    # `get_indexer` refuses duplicated labels: locate the rows by imdb_key instead.
+    if "imdb_key" not in candidates.columns:
+        return None
+    catalog = catalog_for(full_df)
+    found = [catalog.position(key) for key in candidates["imdb_key"].tolist()]
+    if any(pos is None for pos in found):
+        return None
+    return np.asarray(found, dtype=np.int64)
 
 
 def _limit_by_franchise(
@@ -228,22 +270,122 @@ def _limit_by_franchise(
     if n_int <= 0:
         return candidates.head(0)
 
-    keys = _compute_franchise_keys(candidates, full_df=full_df).tolist()
-    counts: dict[str, int] = {}
-    selected: list[int] = []
+    franchise_ids = None
+    if full_df is not None and not full_df.empty:
+        positions = _catalog_positions(candidates, full_df)
+        if positions is not None:
+            franchise_ids = get_franchise_ids(full_df)[positions]
+    if franchise_ids is None:
+        franchise_ids = _build_franchise_ids(candidates)
 
-    for idx, key in zip(candidates.index.tolist(), keys):
-        bucket = key or f"__{idx}"
-        if counts.get(bucket, 0) >= int(max_per_franchise):
-            continue
-        counts[bucket] = counts.get(bucket, 0) + 1
-        selected.append(int(idx))
-        if len(selected) >= n_int:
-            break
-
-    if not selected:
+    keep = np.flatnonzero(_franchise_cap_mask(franchise_ids, max_per_franchise))[:n_int]
+    if keep.size == 0:
         return candidates.head(0)
-    return candidates.loc[selected].copy()
+    return candidates.iloc[keep].copy()
+
+
+def _artifact_status(catalog: MovieCatalog) -> ArtifactStatus:
+    """Which `ml/` artifacts match the catalog's rows (see `scripts/build_models.py`)."""
+    return catalog.derived(
+        "model_artifacts", lambda: check_artifacts(_KNN_MODELS_DIR, catalog.keys.tolist())
+    )
+
+
+def _knn_neighbors(catalog: MovieCatalog, fav_indices: list[int], k: int) -> tuple[Any, Any] | None:
+    """
+    Returns (indices, distances) of the `k` nearest neighbours of each favorite row.
+
+    Precomputed neighbour tables (see `scripts/build_neighbor_tables.py`) are a
+    plain row gather when they hold `k` neighbours per row (K=256); for larger
+    `k` (or without them) the distances are computed on the shared
+    memory-mapped feature matrix (`scripts/build_feature_matrix.py`), and the
+    pickled sklearn model is only loaded without either.
+    The "ann" model queries the approximate index of `scripts/build_ann_index.py`.
+    Artifacts stamped for another catalog (manifest) are never used.
+    """
+    status = _artifact_status(catalog)
+    if not status.ok:
+        return None
+    n_rows = catalog.n_rows
+    model_name = get_recommender_model()
+    if model_name == ANN_MODEL_NAME:
+        index = load_ann_index(str(_KNN_MODELS_DIR))
+        if index is None or index.n_rows != n_rows or not status.allows(*ann_index_paths(_KNN_MODELS_DIR)):
+            return None
+        return index.search(fav_indices, k)
+
+    table = load_neighbor_table(str(_KNN_MODELS_DIR), model_name)
+    if (
+        table is not None
+        and table.n_rows == n_rows
+        and table.k >= k
+        and status.allows(*neighbor_table_paths(_KNN_MODELS_DIR, model_name))
+    ):
+        return table.gather(fav_indices, k)
+
+    matrix = load_feature_matrix(str(_KNN_MODELS_DIR))
+    if matrix is not None and matrix.n_rows == n_rows and status.allows(*feature_matrix_paths(_KNN_MODELS_DIR)):
+        return matrix.kneighbors(fav_indices, k, model_name)
+
+    if not status.allows(_get_knn_model_path()):
+        return None
+    model = _load_knn_model(str(_get_knn_model_path()))
+    if model is None or not hasattr(model, "kneighbors") or _model_rows(model) != n_rows:
+        return None
+    try:
+        query = model._fit_X[fav_indices]
+        distances, indices = model.kneighbors(query, n_neighbors=k)
+    except Exception:
+        return None
+    return indices, distances
+
+
+class FavoriteNeighbors:
+    """
+    Neighbour lists of favorite rows, kept between two rankings of a session.
+
+    Adding a favorite only queries that movie's neighbours; removing one drops
+    its list. Everything is reset when the model, the catalog or K changes.
+    Lists hold the ranking's K neighbours (the table width for pages up to
+    128 titles: ~2 KB per favorite) and only the `max_rows` most recently
+    queried favorites are kept: larger favorite lists re-query the older ones.
+    """
+
+    def __init__(self, max_rows: int = FAVORITE_NEIGHBORS_MAX_ROWS) -> None:
+        self.max_rows = int(max_rows)
+        self._signature: tuple | None = None
+        self._rows: OrderedDict[int, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def gather(
+        self, catalog: MovieCatalog, fav_indices: list[int], k: int
+    ) -> tuple[list[np.ndarray], list[np.ndarray]] | None:
+        signature = (get_recommender_model(), catalog.version, catalog.n_rows, int(k))
+        if signature != self._signature:
+            self._signature = signature
+            self._rows.clear()
+
+        wanted = set(fav_indices)
+        for row in [r for r in self._rows if r not in wanted]:
+            del self._rows[row]
+
+        missing = [row for row in fav_indices if row not in self._rows]
+        fetched: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        if missing:
+            neighbors = _knn_neighbors(catalog, missing, k)
+            if neighbors is None:
+                return None
+            for row, idx, dist in zip(missing, neighbors[0], neighbors[1]):
+                fetched[row] = (np.asarray(idx, dtype=np.int32), np.asarray(dist))
+
+        lists = [self._rows[row] if row in self._rows else fetched[row] for row in fav_indices]
+        for row, item in fetched.items():
+            self._rows[row] = item
+        while len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return [idx for idx, _ in lists], [dist for _, dist in lists]
 
 
 def _get_knn_model_path() -> Path:
@@ -251,6 +393,12 @@ def _get_knn_model_path() -> Path:
     return _KNN_MODELS_DIR / f"KNN_{model}.pkl"
 
 
+def _model_rows(model: Any) -> int | None:
+    """Rows the pickled model was fitted on (its neighbours are positions in them)."""
+    fit_x = getattr(model, "_fit_X", None)
+    return None if fit_x is None else int(fit_x.shape[0])
+
+
 @lru_cache(maxsize=3)
 def _load_knn_model(path: str) -> Any | None:
     model_path = Path(path)
@@ -263,49 +411,25 @@ def _load_knn_model(path: str) -> Any | None:
         return None
 
     try:
-        return joblib.load(model_path)
+        model = joblib.load(model_path)
     except Exception:
         return None
+    # sklearn's sparse manhattan kernel assumes sorted column indices; the
+    # shipped pickles are not sorted, which skews their manhattan distances.
+    if hasattr(getattr(model, "_fit_X", None), "sort_indices"):
+        model._fit_X.sort_indices()
+    return model
 
 
-def _build_key_to_index(df: pd.DataFrame) -> dict[str, int]:
-    if "imdb_key" not in df.columns:
-        return {}
-
-    mapping: dict[str, int] = {}
-    for idx, raw in zip(df.index.tolist(), df["imdb_key"].tolist()):
-        if pd.isna(raw):
-            continue
-        key = str(raw).strip()
-        if not key or key in mapping:
-            continue
-        mapping[key] = int(idx)
-    return mapping
-
-
-def _tokenize_movie_row(row: pd.Series) -> list[str]:
-    tokens: list[str] = []
-
-    kw = row.get("plot_keywords_final")
-    if pd.notna(kw) and str(kw).strip():
-        for part in str(kw).split("|"):
-            tok = normalize_text(part).replace(" ", "_")
-            if tok:
-                tokens.append(tok)
-
-    genre_main = row.get("genre_main")
-    if pd.notna(genre_main) and str(genre_main).strip():
-        tok = normalize_text(str(genre_main)).replace(" ", "_")
-        if tok:
-            tokens.append(f"genre_{tok}")
-
-    language = row.get("language")
-    if pd.notna(language) and str(language).strip():
-        tok = normalize_text(str(language)).replace(" ", "_")
-        if tok:
-            tokens.append(f"lang_{tok}")
-
-    return tokens
+def _rank_positions(df: pd.DataFrame, positions: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Sorts positions by score, then score_global/popularity/num_voted_users (all descending)."""
+    keys: list[np.ndarray] = []
+    for col in ("num_voted_users", "popularity", "score_global"):
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            keys.append(-values[positions])
+    keys.append(-scores)
+    return positions[np.lexsort(keys)]
 
 
 def _recommend_with_cosine_keywords(
@@ -314,116 +438,396 @@ def _recommend_with_cosine_keywords(
     if not favorites or "imdb_key" not in df.columns:
         return df.head(0)
 
-    fav_mask = df["imdb_key"].astype(str).isin(set(map(str, favorites)))
-    fav_df = df[fav_mask].copy()
-    if fav_df.empty:
+    fav_positions = catalog_for(df).positions(favorites)
+    if fav_positions.size == 0:
         return df.head(0)
 
-    user_vec = Counter()
-    for _, row in fav_df.iterrows():
-        user_vec.update(_tokenize_movie_row(row))
-
-    if not user_vec:
+    matrix = get_keyword_matrix(df)
+    profile = matrix.user_profile(fav_positions)
+    if not profile.any():
         return df.head(0)
 
-    user_norm = math.sqrt(sum(v * v for v in user_vec.values()))
-    if user_norm <= 0:
+    scores = matrix.cosine_scores(profile)
+    candidate_mask = np.ones(len(df), dtype=bool)
+    candidate_mask[fav_positions] = False
+    candidates = np.flatnonzero(candidate_mask)
+    if candidates.size == 0:
         return df.head(0)
 
-    candidates = df[~fav_mask].copy()
-    if candidates.empty:
+    n_int = int(n)
+    if n_int <= 0:
         return df.head(0)
 
-    scores: list[float] = []
-    for _, row in candidates.iterrows():
-        toks = _tokenize_movie_row(row)
-        if not toks:
-            scores.append(0.0)
+    # Partial sort: only the rows whose score reaches the n-th best (ties kept)
+    # go through the full multi-column ordering.
+    keys = catalog_for(df).keys
+    shortlist = candidates
+    if n_int < candidates.size:
+        cand_scores = scores[candidates]
+        kth = np.partition(cand_scores, candidates.size - n_int)[candidates.size - n_int]
+        shortlist = candidates[cand_scores >= kth]
+
+    ranked = _rank_positions(df, shortlist, scores[shortlist])
+    _, first = np.unique(keys[ranked], return_index=True)
+    if first.size < n_int and shortlist.size < candidates.size:
+        # Duplicate keys ate into the shortlist: rank every candidate instead.
+        ranked = _rank_positions(df, candidates, scores[candidates])
+        _, first = np.unique(keys[ranked], return_index=True)
+    ranked = ranked[np.sort(first)][:n_int]
+
+    out = df.iloc[ranked].copy()
+    out["wf_reco_score"] = scores[ranked]
+    return out
+
+
+def _favorite_weights(
+    df: pd.DataFrame,
+    fav_indices: list[int],
+    favorite_dates: Mapping[str, Any] | None,
+) -> np.ndarray:
+    """Recency weight of each favorite row: halves every `_RECENCY_HALF_LIFE_DAYS`."""
+    weights = np.ones(len(fav_indices), dtype=float)
+    if not favorite_dates:
+        return weights
+    keys = catalog_for(df).keys
+    now = pd.Timestamp.now(tz="UTC")
+    for i, row in enumerate(fav_indices):
+        added = favorite_dates.get(keys[row])
+        if added is None:
             continue
-        dot = sum(user_vec.get(t, 0) for t in set(toks))
-        denom = user_norm * math.sqrt(len(set(toks)))
-        scores.append((dot / denom) if denom else 0.0)
-
-    candidates["wf_reco_score"] = scores
+        try:
+            stamp = pd.Timestamp(added)
+        except (TypeError, ValueError):
+            continue
+        if pd.isna(stamp):
+            continue
+        if stamp.tzinfo is None:
+            stamp = stamp.tz_localize("UTC")
+        age_days = max(0.0, (now - stamp).total_seconds() / 86400.0)
+        weights[i] = 0.5 ** (age_days / _RECENCY_HALF_LIFE_DAYS)
+    return weights
+
+
+def _aggregate_neighbor_scores(
+    indices: Any,
+    distances: Any,
+    fav_indices: list[int],
+    aggregation: str = "max",
+    fav_weights: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregates the `(favorites x K)` neighbour matrix into one score per candidate.
+
+    Returns `(rows, scores)` with the candidates (favorites excluded) in order
+    of first appearance in the matrix. Similarity is `1 / (1 + distance)`: positive
+    and decreasing for every metric (euclidean / manhattan distances exceed 1):
+      - max / sum / mean: of the similarities over the favorites listing the row
+      - rrf: reciprocal-rank fusion, sum of 1 / (_RRF_K + rank)
+      - recency: similarities summed with the `fav_weights` of each favorite
+    """
+    idx = np.asarray(indices, dtype=np.int64)
+    if idx.ndim != 2 or idx.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+    sims = 1.0 / (1.0 + np.maximum(np.asarray(distances, dtype=float), 0.0))
+
+    if aggregation == "rrf":
+        values = np.broadcast_to(1.0 / (_RRF_K + 1.0 + np.arange(idx.shape[1])), idx.shape)
+    elif aggregation == "recency":
+        weights = np.ones(idx.shape[0]) if fav_weights is None else np.asarray(fav_weights, dtype=float)
+        values = sims * weights[:, None]
+    else:
+        values = sims
+
+    flat_rows = idx.ravel()
+    flat_values = values.ravel()
+    size = int(flat_rows.max()) + 1
+    is_favorite = np.zeros(size, dtype=bool)
+    fav = np.asarray(fav_indices, dtype=np.int64)
+    is_favorite[fav[fav < size]] = True
+    keep = ~is_favorite[flat_rows]
+    flat_rows, flat_values = flat_rows[keep], flat_values[keep]
+    if flat_rows.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+
+    # Dense per-row accumulators (rows are catalog positions).
+    first = np.full(size, flat_rows.size, dtype=np.int64)
+    np.minimum.at(first, flat_rows, np.arange(flat_rows.size))
+    if aggregation == "max":
+        scores = np.full(size, -np.inf)
+        np.maximum.at(scores, flat_rows, flat_values)
+    else:
+        scores = np.bincount(flat_rows, weights=flat_values, minlength=size)
+        if aggregation == "mean":
+            scores = scores / np.maximum(np.bincount(flat_rows, minlength=size), 1)
+
+    rows = np.flatnonzero(first < flat_rows.size)
+    rows = rows[np.argsort(first[rows], kind="stable")]
+    return rows, scores[rows]
+
+
+def _rank_knn_scores(
+    df: pd.DataFrame,
+    favorites: set[str],
+    rows: np.ndarray,
+    scores: np.ndarray,
+    n: int,
+    pool: int,
+) -> pd.DataFrame:
+    ranked = np.argsort(-scores, kind="stable")[:pool]
+    out = df.iloc[rows[ranked]].copy()
+    out["wf_reco_score"] = scores[ranked]
 
     sort_cols = ["wf_reco_score"]
     for col in ("score_global", "popularity", "num_voted_users"):
-        if col in candidates.columns:
+        if col in out.columns:
             sort_cols.append(col)
 
-    candidates = candidates.sort_values(sort_cols, ascending=[False] * len(sort_cols))
-    if "imdb_key" in candidates.columns:
-        candidates = candidates.drop_duplicates(subset=["imdb_key"], keep="first")
-    return candidates.head(int(n))
+    out = out.sort_values(sort_cols, ascending=[False] * len(sort_cols))
+    out = out[~out["imdb_key"].astype(str).isin(set(map(str, favorites)))].copy()
+    if "imdb_key" in out.columns:
+        out = out.drop_duplicates(subset=["imdb_key"], keep="first")
+    return _limit_by_franchise(
+        out,
+        n=n,
+        max_per_franchise=_MAX_PER_FRANCHISE_DEFAULT,
+        full_df=df,
+    )
 
 
-def get_recommendations_from_favorites(df: pd.DataFrame, favorites: set[str], n: int = 10) -> pd.DataFrame:
+def _recommend_fallback(df: pd.DataFrame, favorites: set[str], n: int, pool: int) -> pd.DataFrame:
+    fallback = _recommend_with_cosine_keywords(df, favorites, n=int(pool))
+    return _limit_by_franchise(
+        fallback,
+        n=n,
+        max_per_franchise=_MAX_PER_FRANCHISE_DEFAULT,
+        full_df=df,
+    )
+
+
+def _reco_sizes(n_rows: int, n: int) -> tuple[int, int]:
+    """
+    (pool, k): candidates kept before the franchise cap, neighbours per favorite.
+
+    `k` stops at the neighbour table width (NEIGHBOR_TABLE_K) so rankings are a
+    table gather: the neighbours past the 256th barely score and a single
+    favorite still yields 2x the rows of a 128-title page. Only larger pages
+    (k = 2n) go to the feature matrix.
+    """
+    n_int = int(n)
+    pool = min(n_rows, max(n_int * 60, 300))
+    k = min(n_rows, max(n_int * 2, NEIGHBOR_TABLE_K))
+    return pool, k
+
+
+def get_recommendations_from_favorites(
+    df: pd.DataFrame,
+    favorites: set[str],
+    n: int = 10,
+    *,
+    neighbors_state: FavoriteNeighbors | None = None,
+    aggregation: str | None = None,
+    favorite_dates: Mapping[str, Any] | None = None,
+) -> pd.DataFrame:
     """
     Generates recommendations based on user favorites.
-    Preferred logic: use ML KNN cosine model (ml/KNN_cosine.pkl) when dependencies are available.
+    Preferred logic: nearest neighbours of the favorites for the selected KNN metric,
+    read from the precomputed neighbour table (ml/neighbors_<metric>_*.npy) or,
+    without it, queried on the pickled model (ml/KNN_<metric>.pkl).
     Fallback logic: cosine similarity on keyword/genre/language tokens.
+
+    With `neighbors_state` (kept in the session), only the favorites added since
+    the previous call are queried. `aggregation` (default: setting
+    `reco_aggregation`) is one of `RECO_AGGREGATIONS`; "recency" weights each
+    favorite by its `favorite_dates` entry (imdb_key -> date added).
     """
     if not favorites or "imdb_key" not in df.columns or df.empty:
         return df.head(0)
 
     n_int = int(n)
-    pool = min(len(df), max(n_int * 60, 300))
+    pool, k = _reco_sizes(len(df), n_int)
+
+    catalog = catalog_for(df)
+    fav_indices = catalog.positions(favorites).tolist()
+    if fav_indices:
+        if neighbors_state is not None:
+            neighbors = neighbors_state.gather(catalog, fav_indices, k)
+        else:
+            neighbors = _knn_neighbors(catalog, fav_indices, k)
+        if neighbors is not None:
+            aggregation = aggregation or get_reco_aggregation()
+            weights = (
+                _favorite_weights(df, fav_indices, favorite_dates)
+                if aggregation == "recency"
+                else None
+            )
+            rows, scores = _aggregate_neighbor_scores(
+                neighbors[0], neighbors[1], fav_indices, aggregation, weights
+            )
+            if rows.size:
+                return _rank_knn_scores(df, favorites, rows, scores, n_int, pool)
+
+    return _recommend_fallback(df, favorites, n_int, pool)
+
+
+def _artifact_stamp(df: pd.DataFrame) -> str:
+    """
+    Identifies what rankings of the current model are computed from in this process.
 
-    model = _load_knn_model(str(_get_knn_model_path()))
-    if model is not None and hasattr(model, "kneighbors") and hasattr(model, "_fit_X"):
-        key_to_index = _build_key_to_index(df)
-        fav_indices = [key_to_index.get(str(k)) for k in set(map(str, favorites))]
-        fav_indices = [i for i in fav_indices if i is not None]
-        if fav_indices:
-            scores: dict[int, float] = {}
-            k = min(len(df), max(n_int * 25, 120))
-            try:
-                query = model._fit_X[fav_indices]
-                distances, indices = model.kneighbors(query, n_neighbors=k)
-            except Exception:
-                distances = None
-                indices = None
-
-            if distances is not None and indices is not None:
-                fav_set = set(map(int, fav_indices))
-                for row_idxs, row_dists in zip(indices, distances):
-                    for j, dist in zip(list(row_idxs), list(row_dists)):
-                        if int(j) in fav_set:
-                            continue
-                        sim = 1.0 - float(dist)
-                        prev = scores.get(int(j))
-                        if prev is None or sim > prev:
-                            scores[int(j)] = sim
-
-            if scores:
-                ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
-                top_idx = [idx for idx, _ in ranked[:pool]]
-                out = df.loc[top_idx].copy()
-                out["wf_reco_score"] = [scores.get(int(i), 0.0) for i in out.index.tolist()]
-
-                sort_cols = ["wf_reco_score"]
-                for col in ("score_global", "popularity", "num_voted_users"):
-                    if col in out.columns:
-                        sort_cols.append(col)
-
-                out = out.sort_values(sort_cols, ascending=[False] * len(sort_cols))
-                out = out[~out["imdb_key"].astype(str).isin(set(map(str, favorites)))].copy()
-                if "imdb_key" in out.columns:
-                    out = out.drop_duplicates(subset=["imdb_key"], keep="first")
-                return _limit_by_franchise(
-                    out,
-                    n=n_int,
-                    max_per_franchise=_MAX_PER_FRANCHISE_DEFAULT,
-                    full_df=df,
-                )
+    "fallback" while the keyword fallback serves them; otherwise the manifest
+    hash (it hashes every artifact) or, without one, the size/mtime of the
+    `ml/` files. Rebuilding or adding artifacts therefore changes the cache keys.
+    """
+    model_name = get_recommender_model()
+
+    def build() -> str:
+        backend, _ = get_recommender_info(df)
+        if backend == "fallback":
+            return "fallback"
+        manifest_path = _KNN_MODELS_DIR / MANIFEST_NAME
+        if manifest_path.exists():
+            return f"manifest:{file_sha256(manifest_path)}"
+        digest = hashlib.sha1()
+        for path in sorted(_KNN_MODELS_DIR.glob("*")):
+            if path.is_file():
+                stat = path.stat()
+                digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+        return f"files:{digest.hexdigest()}"
+
+    return catalog_for(df).derived(f"reco_artifact_stamp/{model_name}", build)
+
+
+def _recency_context(favorites: set[str], favorite_dates: Mapping[str, Any] | None) -> str:
+    """Favorite dates + current UTC day: recency weights depend on both."""
+    digest = hashlib.sha1(pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%d").encode("utf-8"))
+    for key in sorted({str(k).strip() for k in favorites}):
+        added = (favorite_dates or {}).get(key)
+        digest.update(f"{key}={'' if added is None else added}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_cached_recommendations(
+    df: pd.DataFrame,
+    favorites: set[str],
+    n: int = 10,
+    *,
+    neighbors_state: FavoriteNeighbors | None = None,
+    favorite_dates: Mapping[str, Any] | None = None,
+) -> pd.DataFrame:
+    """
+    `get_recommendations_from_favorites` through the shared recommendation cache.
 
-    fallback = _recommend_with_cosine_keywords(df, favorites, n=int(pool))
-    return _limit_by_franchise(
-        fallback,
-        n=n_int,
-        max_per_franchise=_MAX_PER_FRANCHISE_DEFAULT,
-        full_df=df,
+    Rankings are stored as (imdb_key, score) lists keyed on the favorites, the
+    recommender model, the catalog version and the artifacts serving the model
+    (see `services/reco_cache.py`), so they are only recomputed when one of
+    those changes. With the "recency" aggregation the favorite dates (and the
+    day) are part of the key too.
+    """
+    if not favorites or "imdb_key" not in df.columns or df.empty:
+        return df.head(0)
+
+    catalog = catalog_for(df)
+    aggregation = get_reco_aggregation()
+    context = _artifact_stamp(df)
+    if aggregation == "recency":
+        context += "|" + _recency_context(favorites, favorite_dates)
+    key = reco_cache_key(
+        favorites,
+        f"{get_recommender_model()}/{aggregation}/s{_SCORE_VERSION}",
+        catalog.version,
+        int(n),
+        context,
+    )
+    try:
+        cache = get_reco_cache()
+        entry = cache.get(key)
+    except Exception:
+        cache, entry = None, None
+
+    if entry is not None:
+        keys, scores = entry
+        positions = [catalog.position(k) for k in keys]
+        if all(pos is not None for pos in positions):
+            out = df.iloc[positions].copy()
+            out["wf_reco_score"] = scores
+            return out
+
+    out = get_recommendations_from_favorites(
+        df,
+        favorites,
+        n=int(n),
+        neighbors_state=neighbors_state,
+        aggregation=aggregation,
+        favorite_dates=favorite_dates,
     )
+    if cache is not None:
+        try:
+            cache.put(
+                key,
+                (
+                    out["imdb_key"].astype(str).tolist(),
+                    out["wf_reco_score"].astype(float).tolist() if "wf_reco_score" in out else [],
+                ),
+            )
+        except Exception:
+            pass
+    return out
+
+
+def get_recommendations_for_users(
+    df: pd.DataFrame,
+    favorites_by_user: Mapping[Any, set[str]],
+    n: int = 10,
+    *,
+    favorite_dates_by_user: Mapping[Any, Mapping[str, Any]] | None = None,
+) -> dict[Any, pd.DataFrame]:
+    """
+    Batch version of `get_recommendations_from_favorites` (admin analytics, digests).
+
+    The neighbours of the union of every user's favorites are fetched in a single
+    query, then each user's ranking is built from its own rows. With the
+    "recency" aggregation each user's favorites are weighted by their
+    `favorite_dates_by_user[user]` entry (equal weights for a user without dates).
+    """
+    empty = df.head(0)
+    if "imdb_key" not in df.columns or df.empty:
+        return {user: empty for user in favorites_by_user}
+
+    n_int = int(n)
+    pool, k = _reco_sizes(len(df), n_int)
+    catalog = catalog_for(df)
+    aggregation = get_reco_aggregation()
+
+    user_rows = {user: catalog.positions(favs or ()) for user, favs in favorites_by_user.items()}
+    all_rows = [rows for rows in user_rows.values() if rows.size]
+    union = np.unique(np.concatenate(all_rows)) if all_rows else np.empty(0, dtype=np.int64)
+    neighbors = _knn_neighbors(catalog, union.tolist(), k) if union.size else None
+    if neighbors is not None:
+        neighbors = (np.asarray(neighbors[0]), np.asarray(neighbors[1]))
+
+    results: dict[Any, pd.DataFrame] = {}
+    for user, favs in favorites_by_user.items():
+        favorites = set(favs or ())
+        rows = user_rows[user]
+        if not favorites:
+            results[user] = empty
+            continue
+
+        if neighbors is not None and rows.size:
+            sel = np.searchsorted(union, rows)
+            weights = (
+                _favorite_weights(df, rows.tolist(), (favorite_dates_by_user or {}).get(user))
+                if aggregation == "recency"
+                else None
+            )
+            cand_rows, scores = _aggregate_neighbor_scores(
+                neighbors[0][sel], neighbors[1][sel], rows.tolist(), aggregation, weights
+            )
+            if cand_rows.size:
+                results[user] = _rank_knn_scores(df, favorites, cand_rows, scores, n_int, pool)
+                continue
+
+        results[user] = _recommend_fallback(df, favorites, n_int, pool)
+    return results
 
 
 def get_similar_movies(df: pd.DataFrame, imdb_key: str, n: int = 10) -> pd.DataFrame:
@@ -433,21 +837,70 @@ def get_similar_movies(df: pd.DataFrame, imdb_key: str, n: int = 10) -> pd.DataF
     return get_recommendations_from_favorites(df, {imdb_key}, n=int(n))
 
 
-def get_recommender_info() -> tuple[str, str | None]:
+def get_ann_index_meta() -> dict[str, Any]:
+    """Build report of the ANN index (recall@k vs the exact cosine model, latency), if built."""
+    return load_ann_meta(str(_KNN_MODELS_DIR))
+
+
+def get_recommender_info(df: pd.DataFrame | None = None) -> tuple[str, str | None]:
     """
     Returns (backend, reason).
 
     backend:
       - "knn_cosine": the ML model is loaded and used.
       - "fallback": keyword-based cosine fallback is used.
+
+    With `df`, artifacts stamped for another catalog or sized for another row
+    count are reported as unusable. Without a manifest the ML backend comes
+    with an "unverified" reason: only the row counts could be checked.
     """
+    n_rows = None
+    if df is not None and "imdb_key" in df.columns:
+        catalog = catalog_for(df)
+        status = _artifact_status(catalog)
+        n_rows = catalog.n_rows
+    else:
+        status = check_artifacts(_KNN_MODELS_DIR)
+    if not status.ok:
+        return "fallback", f"{status.reason} — python scripts/build_models.py"
+    ml = ("knn_cosine", None if status.verified else f"{status.reason} — python scripts/build_models.py")
+
+    def fits(artifact: Any, rows: int | None) -> bool:
+        return artifact is not None and (n_rows is None or rows == n_rows)
+
+    if get_recommender_model() == ANN_MODEL_NAME:
+        npz_path, meta_path = ann_index_paths(_KNN_MODELS_DIR)
+        index = load_ann_index(str(_KNN_MODELS_DIR))
+        if not fits(index, getattr(index, "n_rows", None)) or not status.allows(npz_path, meta_path):
+            return "fallback", f"Index ANN introuvable: {npz_path.name}"
+        return ml
+
+    table_paths = neighbor_table_paths(_KNN_MODELS_DIR, get_recommender_model())
+    table = load_neighbor_table(str(_KNN_MODELS_DIR), get_recommender_model())
+    if fits(table, getattr(table, "n_rows", None)) and status.allows(*table_paths):
+        return ml
+    matrix = load_feature_matrix(str(_KNN_MODELS_DIR))
+    if fits(matrix, getattr(matrix, "n_rows", None)) and status.allows(*feature_matrix_paths(_KNN_MODELS_DIR)):
+        return ml
+
     model_path = _get_knn_model_path()
-    if not model_path.exists():
+    if status.altered and not status.allows(model_path):
+        return (
+            "fallback",
+            f"Fichiers modifiés depuis le manifeste ({', '.join(status.altered)}) — python scripts/build_models.py",
+        )
+    if not model_path.exists() or not status.allows(model_path):
         return "fallback", f"Modèle introuvable: {model_path.name}"
 
     model = _load_knn_model(str(model_path))
     if model is not None:
-        return "knn_cosine", None
+        if n_rows is not None and _model_rows(model) != n_rows:
+            return (
+                "fallback",
+                f"Modèle non aligné sur le catalogue: {model_path.name} a {_model_rows(model)} lignes "
+                f"pour {n_rows} films — python scripts/build_models.py",
+            )
+        return ml
 
     try:
         import joblib  # noqa: F401
@@ -1,6 +1,8 @@
 -- Wildflix - schema MySQL (utf8mb4)
 -- 1) Creez une base : CREATE DATABASE wildflix CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 -- 2) Puis exécutez ce script dans cette base.
+-- L'app applique elle-même ces tables au démarrage (utils/mysql_migrations.py,
+-- ou `python scripts/migrate_mysql_schema.py`) ; garder les deux synchronisés.
 
 CREATE TABLE IF NOT EXISTS users (
   id INT AUTO_INCREMENT PRIMARY KEY,
@@ -23,3 +25,23 @@ CREATE TABLE IF NOT EXISTS favorites (
   PRIMARY KEY (user_id, imdb_key),
   CONSTRAINT fk_fav_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Cache partagé des recommandations (services/reco_cache.py, backend "mysql").
+CREATE TABLE IF NOT EXISTS reco_cache (
+  cache_key CHAR(40) NOT NULL PRIMARY KEY,
+  payload MEDIUMTEXT NOT NULL,
+  last_used TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  KEY idx_reco_cache_last_used (last_used)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Migrations appliquées (utils/mysql_migrations.py).
+CREATE TABLE IF NOT EXISTS schema_version (
+  version INT NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO schema_version (version, description) VALUES
+  (1, 'users + favorites'),
+  (2, 'colonnes de profil optionnelles'),
+  (3, 'cache des recommandations');
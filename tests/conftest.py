@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import services.recommendation_service as reco  # noqa: E402
+from services.ann_index import load_ann_index  # noqa: E402
+from services.feature_matrix import FeatureMatrix, load_feature_matrix, save_feature_arrays  # noqa: E402
+from services.neighbor_table import NeighborTable, load_neighbor_table, save_neighbor_table  # noqa: E402
+from utils.catalog import MovieCatalog, catalog_for, clear_catalogs  # noqa: E402
+
+
+SYNTHETIC_ROWS = 60
+SYNTHETIC_FEATURES = 12
+SYNTHETIC_TABLE_K = 8
+
+
+@dataclass
+class SyntheticModels:
+    df: pd.DataFrame
+    catalog: MovieCatalog
+    matrix: FeatureMatrix
+
+
+def feature_matrix_from_dense(dense: np.ndarray) -> FeatureMatrix:
+    rows, cols = np.nonzero(dense)
+    return FeatureMatrix(
+        data=dense[rows, cols].astype(np.float32),
+        indices=cols.astype(np.int32),
+        indptr=np.searchsorted(rows, np.arange(dense.shape[0] + 1)).astype(np.int64),
+        n_features=dense.shape[1],
+    )
+
+
+def clear_recommender_memos() -> None:
+    """Forgets the process-wide catalogs (and their derived data) and loaded artifacts."""
+    clear_catalogs()
+    for loader in (reco._load_knn_model, load_neighbor_table, load_feature_matrix, load_ann_index):
+        loader.cache_clear()
+
+
+@pytest.fixture
+def fresh_memos():
+    clear_recommender_memos()
+    yield
+    clear_recommender_memos()
+
+
+@pytest.fixture
+def synthetic_models(tmp_path, monkeypatch, fresh_memos) -> SyntheticModels:
+    """A random catalog served by a feature matrix + cosine table (K=8) in `tmp_path`."""
+    rng = np.random.default_rng(0)
+    shape = (SYNTHETIC_ROWS, SYNTHETIC_FEATURES)
+    dense = rng.random(shape) * (rng.random(shape) < 0.4)
+    dense[:, 0] += 0.01  # no empty row
+    matrix = feature_matrix_from_dense(dense)
+    save_feature_arrays(matrix.data, matrix.indices, matrix.indptr, (SYNTHETIC_ROWS, SYNTHETIC_FEATURES), tmp_path)
+    indices, distances = matrix.kneighbors(np.arange(SYNTHETIC_ROWS), SYNTHETIC_TABLE_K, "cosine")
+    save_neighbor_table(NeighborTable(indices=indices, distances=distances), tmp_path, "cosine")
+
+    monkeypatch.setattr(reco, "_KNN_MODELS_DIR", tmp_path)
+    monkeypatch.setattr(reco, "get_recommender_model", lambda: "cosine")
+    df = pd.DataFrame(
+        {
+            "imdb_key": [f"tt{i}" for i in range(SYNTHETIC_ROWS)],
+            "movie_title": [f"Film {i}" for i in range(SYNTHETIC_ROWS)],
+        }
+    )
+    return SyntheticModels(df=df, catalog=catalog_for(df), matrix=matrix)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from conftest import feature_matrix_from_dense
+from services.feature_matrix import FEATURE_METRICS
+
+
+@pytest.mark.parametrize("metric", FEATURE_METRICS)
+def test_distances_match_sklearn_with_empty_rows(metric):
+    pairwise = pytest.importorskip("sklearn.metrics").pairwise_distances
+    rng = np.random.default_rng(3)
+    dense = (rng.random((30, 9)) * (rng.random((30, 9)) < 0.3)).astype(np.float32)
+    dense[[0, 7, 8, 29]] = 0.0  # leading, consecutive and trailing empty rows
+    dense[1, 0] = dense[9, 4] = 1.0
+
+    matrix = feature_matrix_from_dense(dense)
+    for row in (1, 9, 12):
+        expected = pairwise(dense[row : row + 1], dense, metric=metric)[0]
+        if metric == "cosine":  # sklearn: an empty row is at distance 1
+            expected[~dense.any(axis=1)] = 1.0
+        np.testing.assert_allclose(matrix.distances(row, metric), expected, atol=1e-6)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import textwrap
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+APP = textwrap.dedent(
+    f"""
+    import sys
+    sys.path.insert(0, {str(ROOT)!r})
+
+    import pandas as pd
+    import streamlit as st
+
+    from utils.header import render_global_search
+
+    df = pd.DataFrame({{
+        "imdb_key": ["tt1", "tt2", "tt3"],
+        "movie_title": ["The Dark Knight", "Dark City", "Amelie"],
+        "director_name": ["Christopher Nolan", "Alex Proyas", "Jean-Pierre Jeunet"],
+        "num_voted_users": [900, 100, 300],
+    }})
+    st.session_state["page_runs"] = st.session_state.get("page_runs", 0) + 1
+    render_global_search(df, source_page="app.py", target_page=None)
+    """
+)
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / "app.py").write_text(APP, encoding="utf-8")
+    (tmp_path / "pages").mkdir()
+    # Like the real results page, the stub renders the header too.
+    (tmp_path / "pages" / "_Recherche.py").write_text(APP, encoding="utf-8")
+    at = AppTest.from_file(str(tmp_path / "app.py"), default_timeout=30)
+    return at.run()
+
+
+def _box(at: AppTest):
+    return at.selectbox(key="wf_global_search_pick")
+
+
+def _enter(at: AppTest, text: str) -> AppTest:
+    # Enter on free text: the browser sends the typed string as the value.
+    box = _box(at)
+    box.options.append(text)
+    box.set_value(text)
+    return at.run()
+
+
+def test_enter_opens_the_results_page(app):
+    _enter(app, "dark")
+    assert not app.exception
+    assert app.session_state["wf_search_query"] == "dark"
+    assert app.session_state["wf_search_source_page"] == "app.py"
+    assert _box(app).value is None  # emptied for the next search
+
+
+def test_suggestions_are_options_of_the_search_box(app):
+    options = _box(app).options
+    assert options[0] == "🎬 The Dark Knight"  # most popular first
+    assert "👤 Christopher Nolan" in options
+
+
+def test_picking_a_title_opens_it_without_searching(app):
+    _box(app).select_index(_box(app).options.index("🎬 Dark City")).run()
+    assert not app.exception
+    assert app.session_state["selected_imdb_key"] == "tt2"
+    assert "wf_search_query" not in app.session_state
+
+
+def test_picking_a_person_searches_their_name(app):
+    _box(app).select_index(_box(app).options.index("👤 Alex Proyas")).run()
+    assert app.session_state["wf_search_query"] == "Alex Proyas"
+
+
+def test_completions_of_the_last_query_come_first(app):
+    _enter(app, "ame")
+    app.switch_page("pages/_Recherche.py")
+    app.run()
+    assert _box(app).options[0] == "🎬 Amelie"
+
+
+def test_rerun_without_a_pick_does_not_navigate(app):
+    app.run()
+    assert "wf_search_query" not in app.session_state
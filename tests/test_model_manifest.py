@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from services.model_manifest import (
+    MANIFEST_NAME,
+    check_artifacts,
+    legacy_build_refusal,
+    write_manifest,
+)
+
+
+KEYS = ["tt1", "tt2", "tt3"]
+
+
+def _build(models_dir):
+    paths = []
+    for name in ("neighbors_cosine_idx.npy", "neighbors_cosine_dist.npy"):
+        path = models_dir / name
+        np.save(path, np.arange(6).reshape(3, 2))
+        paths.append(path)
+    write_manifest(models_dir, KEYS, paths, {"built_at": "test"})
+    return paths
+
+
+def test_stamped_files_are_allowed(tmp_path):
+    idx_path, dist_path = _build(tmp_path)
+    status = check_artifacts(tmp_path, KEYS)
+    assert status.ok and status.altered == ()
+    assert status.allows(idx_path, dist_path)
+    assert not status.allows(tmp_path / "KNN_cosine.pkl")
+
+
+def test_other_catalog_is_refused(tmp_path):
+    _build(tmp_path)
+    status = check_artifacts(tmp_path, ["tt2", "tt1", "tt3"])
+    assert not status.ok
+    assert not status.allows(tmp_path / "neighbors_cosine_idx.npy")
+
+
+def test_rewritten_file_is_refused(tmp_path):
+    idx_path, dist_path = _build(tmp_path)
+    np.save(dist_path, np.zeros((3, 2)))
+    status = check_artifacts(tmp_path, KEYS)
+    assert status.ok
+    assert status.altered == ("neighbors_cosine_dist.npy",)
+    assert status.allows(idx_path)
+    assert not status.allows(idx_path, dist_path)
+
+
+def test_touched_file_with_same_content_is_allowed(tmp_path):
+    idx_path, dist_path = _build(tmp_path)
+    stat = idx_path.stat()
+    os.utime(idx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    status = check_artifacts(tmp_path, KEYS)
+    assert status.altered == ()
+    assert status.allows(idx_path, dist_path)
+
+
+def test_legacy_builders_refuse_a_stamped_directory(tmp_path):
+    assert legacy_build_refusal(tmp_path) is None
+    _build(tmp_path)
+    assert (tmp_path / MANIFEST_NAME).exists()
+    assert "build_models.py" in legacy_build_refusal(tmp_path)
+
+
+def test_missing_manifest_is_unverified(tmp_path):
+    status = check_artifacts(tmp_path, KEYS)
+    assert status.ok and not status.verified
+    assert "non vérifiés" in status.reason
+    assert status.allows(tmp_path / "KNN_cosine.pkl")
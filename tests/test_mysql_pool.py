@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pymysql
+import pytest
+
+import utils.mysql_store as store
+from utils.mysql_pool import ConnectionPool
+
+
+class FakeConn:
+    def __init__(self, number: int, *, ping_ok: bool = True, rollback_ok: bool = True):
+        self.number = number
+        self.ping_ok = ping_ok
+        self.rollback_ok = rollback_ok
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect: bool = False):
+        if not self.ping_ok:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        if not self.rollback_ok:
+            raise pymysql.err.InterfaceError(0, "")
+
+    def close(self):
+        self.closed = True
+
+
+class Factory:
+    def __init__(self):
+        self.conns: list[FakeConn] = []
+        self.fail_next = False
+
+    def __call__(self) -> FakeConn:
+        if self.fail_next:
+            self.fail_next = False
+            raise pymysql.err.OperationalError(2003, "Can't connect")
+        conn = FakeConn(len(self.conns))
+        self.conns.append(conn)
+        return conn
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _pool(factory, clock, **kwargs) -> ConnectionPool:
+    options = dict(idle_timeout=300, max_lifetime=3600, health_check_after=30, clock=clock)
+    options.update(kwargs)
+    return ConnectionPool(factory, **options)
+
+
+def test_connections_are_reused(factory, clock):
+    pool = _pool(factory, clock)
+    for _ in range(5):
+        with pool.connection() as conn:
+            assert conn is factory.conns[0]
+    stats = pool.stats()
+    assert (stats["creates"], stats["acquires"], stats["idle"], stats["in_use"]) == (1, 5, 1, 0)
+
+
+def test_waits_for_a_released_connection():
+    pool = ConnectionPool(Factory(), max_size=1, acquire_timeout=5)
+    item = pool.acquire()
+    releaser = threading.Timer(0.05, pool.release, args=(item,))
+    releaser.start()
+    again = pool.acquire()
+    releaser.join()
+    assert again.conn is item.conn
+    assert pool.stats()["waits"] == 1
+
+
+def test_times_out_when_saturated():
+    pool = ConnectionPool(Factory(), max_size=1, acquire_timeout=0.05)
+    pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="sature"):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_idle_connection_expires(factory, clock):
+    pool = _pool(factory, clock, idle_timeout=60, health_check_after=1000)
+    pool.release(pool.acquire())
+    clock.now += 61
+    item = pool.acquire()
+    assert item.conn is factory.conns[1]
+    assert factory.conns[0].closed
+
+
+def test_prune_closes_expired_idle_connections(factory, clock):
+    pool = _pool(factory, clock, idle_timeout=60)
+    pool.release(pool.acquire())
+    clock.now += 61
+    assert pool.prune() == 1
+    assert factory.conns[0].closed
+    assert pool.stats()["size"] == 0
+
+
+def test_lifetime_expiry(factory, clock):
+    pool = _pool(factory, clock, max_lifetime=100, idle_timeout=1000, health_check_after=1000)
+    item = pool.acquire()
+    clock.now += 101
+    pool.release(item)  # too old: closed instead of kept idle
+    assert factory.conns[0].closed
+    assert pool.stats()["idle"] == 0
+
+    pool.release(pool.acquire())
+    clock.now += 60
+    pool.release(pool.acquire())  # still young: reused
+    clock.now += 50
+    assert pool.acquire().conn is factory.conns[2]  # 110 s old when taken again
+    assert factory.conns[1].closed
+
+
+def test_failed_ping_is_replaced(factory, clock):
+    pool = _pool(factory, clock, health_check_after=30)
+    pool.release(pool.acquire())
+    factory.conns[0].ping_ok = False
+
+    clock.now += 10  # recently used: not pinged
+    item = pool.acquire()
+    assert item.conn is factory.conns[0]
+    pool.release(item)
+
+    clock.now += 31
+    item = pool.acquire()
+    assert item.conn is factory.conns[1]
+    assert factory.conns[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_exception_rolls_back_and_keeps_the_connection(factory, clock):
+    pool = _pool(factory, clock)
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("boom")
+    conn = factory.conns[0]
+    assert conn.rollbacks == 1 and not conn.closed
+    assert pool.stats()["idle"] == 1
+
+
+def test_failed_rollback_drops_the_connection(factory, clock):
+    pool = _pool(factory, clock)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            conn.rollback_ok = False
+            raise ValueError("boom")
+    assert factory.conns[0].closed
+    assert pool.stats()["size"] == 0
+    with pool.connection() as conn:
+        assert conn is factory.conns[1]
+
+
+def test_failed_connect_frees_its_slot(factory, clock):
+    pool = _pool(factory, clock, max_size=1, acquire_timeout=0.05)
+    factory.fail_next = True
+    with pytest.raises(pymysql.err.OperationalError):
+        pool.acquire()
+    assert pool.stats()["size"] == 0
+    assert pool.acquire().conn is factory.conns[0]
+
+
+def test_close(factory, clock):
+    pool = _pool(factory, clock)
+    busy = pool.acquire()
+    pool.release(pool.acquire())
+    pool.close()
+    assert factory.conns[1].closed and not factory.conns[0].closed
+    with pytest.raises(RuntimeError, match="ferme"):
+        pool.acquire()
+    pool.release(busy)  # returned after close: closed, not kept
+    assert factory.conns[0].closed
+    assert pool.stats()["size"] == 0
+
+
+# -- mysql_store over an injected pool ----------------------------------------
+
+
+class FakeCursor:
+    def __init__(self, conn: "StoreConn"):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(" ".join(query.split()))
+        if self.conn.dead:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+
+    def fetchall(self):
+        return [{"imdb_key": "tt1"}, {"imdb_key": "tt2"}]
+
+
+class StoreConn(FakeConn):
+    def __init__(self, number: int, dead: bool):
+        super().__init__(number)
+        self.dead = dead
+        self.statements: list[str] = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if self.dead:
+            raise pymysql.err.InterfaceError(0, "")
+
+
+@pytest.fixture
+def store_pool(monkeypatch):
+    conns: list[StoreConn] = []
+
+    def connect():
+        conn = StoreConn(len(conns), dead=not conns)  # the first one died while idle
+        conns.append(conn)
+        return conn
+
+    store.set_mysql_pool(ConnectionPool(connect))
+    monkeypatch.setattr(store, "_SCHEMA_READY", True)
+    yield conns
+    store.set_mysql_pool(None)
+
+
+def test_reads_are_retried_once_on_a_lost_connection(store_pool):
+    assert store.get_favorites(7) == {"tt1", "tt2"}
+    assert len(store_pool) == 2 and store_pool[0].closed
+
+
+def test_writes_are_not_retried(store_pool):
+    with pytest.raises(pymysql.err.OperationalError):
+        store.add_favorite(7, "tt3")
+    assert len(store_pool) == 1
+    assert len(store_pool[0].statements) == 1
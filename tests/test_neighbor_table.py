@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import services.recommendation_service as reco
+from conftest import SYNTHETIC_TABLE_K as TABLE_K
+from services.neighbor_table import NEIGHBOR_TABLE_K, NeighborTable, build_neighbor_table
+
+
+def test_gather_refuses_k_above_table_k():
+    table = NeighborTable(indices=np.zeros((3, 2), dtype=np.int32), distances=np.zeros((3, 2), dtype=np.float32))
+    assert table.gather([0, 1], 2)[0].shape == (2, 2)
+    with pytest.raises(ValueError):
+        table.gather([0], 3)
+
+
+def test_small_k_reads_the_table(synthetic_models):
+    catalog, matrix = synthetic_models.catalog, synthetic_models.matrix
+    indices, distances = reco._knn_neighbors(catalog, [0, 5], 5)
+    expected_idx, expected_dist = matrix.kneighbors([0, 5], 5, "cosine")
+    assert indices.dtype == np.int32  # table rows (the matrix path returns int64)
+    np.testing.assert_array_equal(indices, expected_idx)
+    np.testing.assert_allclose(distances, expected_dist, rtol=1e-5)
+
+
+def test_k_above_table_k_is_not_truncated(synthetic_models):
+    catalog, matrix = synthetic_models.catalog, synthetic_models.matrix
+    k = TABLE_K * 4
+    indices, distances = reco._knn_neighbors(catalog, [0, 5], k)
+    expected_idx, expected_dist = matrix.kneighbors([0, 5], k, "cosine")
+    assert indices.shape == (2, k)
+    assert indices.dtype == np.int64  # answered by the feature matrix
+    np.testing.assert_array_equal(indices, expected_idx)
+    np.testing.assert_allclose(distances, expected_dist)
+
+
+def test_session_neighbors_follow_k(synthetic_models):
+    catalog = synthetic_models.catalog
+    state = reco.FavoriteNeighbors()
+    small = state.gather(catalog, [1, 2], TABLE_K)
+    large = state.gather(catalog, [1, 2], TABLE_K * 3)
+    assert [len(idx) for idx in small[0]] == [TABLE_K, TABLE_K]
+    assert [len(idx) for idx in large[0]] == [TABLE_K * 3, TABLE_K * 3]
+
+
+def test_manhattan_table_ignores_unsorted_csr_indices():
+    scipy_sparse = pytest.importorskip("scipy.sparse")
+    neighbors = pytest.importorskip("sklearn.neighbors")
+
+    rng = np.random.default_rng(0)
+    dense = (rng.random((40, 30)) < 0.2) * rng.random((40, 30))
+    csr = scipy_sparse.csr_matrix(dense)
+    for row in range(csr.shape[0]):  # the shipped pickles store unsorted column indices
+        lo, hi = csr.indptr[row], csr.indptr[row + 1]
+        csr.indices[lo:hi] = csr.indices[lo:hi][::-1].copy()
+        csr.data[lo:hi] = csr.data[lo:hi][::-1].copy()
+    csr.has_sorted_indices = False
+
+    model = neighbors.NearestNeighbors(algorithm="brute", metric="manhattan").fit(csr)
+    table = build_neighbor_table(model, k=5)
+    exact = neighbors.NearestNeighbors(algorithm="brute", metric="manhattan").fit(dense)
+    expected_dist, _ = exact.kneighbors(dense, n_neighbors=5)
+    np.testing.assert_allclose(table.distances, expected_dist, rtol=1e-5)
+
+
+@pytest.mark.parametrize("n", [10, 60, 120, 128])
+def test_page_sizes_are_served_by_the_table(n):
+    _, k = reco._reco_sizes(5000, n)
+    assert n < k <= NEIGHBOR_TABLE_K
+
+
+def test_larger_pages_get_more_neighbors_than_the_table():
+    _, k = reco._reco_sizes(5000, 300)
+    assert k == 600
+
+
+def test_session_neighbors_keep_the_latest_rows(synthetic_models, monkeypatch):
+    catalog = synthetic_models.catalog
+    queried: list[list[int]] = []
+    knn = reco._knn_neighbors
+
+    def counting(catalog, rows, k):
+        queried.append(list(rows))
+        return knn(catalog, rows, k)
+
+    monkeypatch.setattr(reco, "_knn_neighbors", counting)
+    state = reco.FavoriteNeighbors(max_rows=2)
+    indices, _ = state.gather(catalog, [1, 2, 3], TABLE_K)
+    expected, _ = knn(catalog, [1, 2, 3], TABLE_K)
+    np.testing.assert_array_equal(np.vstack(indices), expected)
+    assert len(state) == 2
+
+    state.gather(catalog, [1, 2, 3], TABLE_K)  # row 1 was evicted: queried again, evicts 2
+    state.gather(catalog, [1, 3], TABLE_K)
+    assert queried == [[1, 2, 3], [1]]
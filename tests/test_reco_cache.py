@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import services.recommendation_service as reco
+from services.reco_cache import MemoryRecoCache, SqliteRecoCache, reco_cache_key
+from utils.catalog import catalog_for
+
+
+def test_key_depends_on_every_part():
+    base = reco_cache_key({"tt1", "tt2"}, "cosine/sum", "v1", 10, "manifest:a")
+    assert base == reco_cache_key(["tt2", "tt1", "tt1"], "cosine/sum", "v1", 10, "manifest:a")
+    assert base != reco_cache_key({"tt1", "tt2"}, "cosine/sum", "v1", 10, "manifest:b")
+    assert base != reco_cache_key({"tt1", "tt2"}, "cosine/sum", "v1", 10, "fallback")
+    assert base != reco_cache_key({"tt1", "tt2"}, "cosine/max", "v1", 10, "manifest:a")
+
+
+def test_sqlite_cache_closes_its_connections(tmp_path, monkeypatch):
+    opened: list[sqlite3.Connection] = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    cache = SqliteRecoCache(tmp_path / "reco.sqlite", max_entries=2)
+    monkeypatch.setattr(sqlite3, "connect", tracking_connect)
+    cache.put("a", (["tt1"], [1.0]))
+    cache.put("b", (["tt2"], [0.5]))
+    assert cache.get("a") == (["tt1"], [1.0])
+    cache.put("c", (["tt3"], [0.2]))
+    assert cache.get("b") is None  # least recently used
+    assert cache.get("missing") is None
+
+    assert opened
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    monkeypatch.undo()
+    with connect(tmp_path / "reco.sqlite") as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+@pytest.fixture
+def ranking(monkeypatch, fresh_memos):
+    df = pd.DataFrame({"imdb_key": [f"tt{i}" for i in range(20)], "title": [f"m{i}" for i in range(20)]})
+    calls: list[dict] = []
+
+    def compute(frame, favorites, n=10, *, neighbors_state=None, aggregation=None, favorite_dates=None):
+        calls.append({"aggregation": aggregation, "favorite_dates": favorite_dates})
+        out = frame.head(int(n)).copy()
+        out["wf_reco_score"] = 1.0
+        return out
+
+    backend = {"name": "fallback"}
+    aggregation = {"name": "sum"}
+    monkeypatch.setattr(reco, "get_recommendations_from_favorites", compute)
+    monkeypatch.setattr(reco, "get_reco_cache", lambda cache=MemoryRecoCache(): cache)
+    monkeypatch.setattr(reco, "get_recommender_info", lambda frame=None: (backend["name"], None))
+    monkeypatch.setattr(reco, "get_recommender_model", lambda: "cosine")
+    monkeypatch.setattr(reco, "get_reco_aggregation", lambda: aggregation["name"])
+    return df, calls, backend, aggregation
+
+
+def test_fallback_rankings_are_not_served_once_the_model_is_available(ranking):
+    df, calls, backend, _ = ranking
+    reco.get_cached_recommendations(df, {"tt1"}, n=5)
+    reco.get_cached_recommendations(df, {"tt1"}, n=5)
+    assert len(calls) == 1
+
+    backend["name"] = "knn_cosine"
+    catalog_for(df).forget()  # new process: artifacts are looked up again
+    reco.get_cached_recommendations(df, {"tt1"}, n=5)
+    assert len(calls) == 2
+
+
+def test_recency_rankings_are_keyed_on_favorite_dates(ranking):
+    df, calls, _, aggregation = ranking
+    aggregation["name"] = "recency"
+    old = {"tt1": "2020-01-01", "tt2": "2024-01-01"}
+    new = {"tt1": "2024-01-01", "tt2": "2020-01-01"}
+    reco.get_cached_recommendations(df, {"tt1", "tt2"}, n=5, favorite_dates=old)
+    reco.get_cached_recommendations(df, {"tt1", "tt2"}, n=5, favorite_dates=new)
+    reco.get_cached_recommendations(df, {"tt1", "tt2"}, n=5, favorite_dates=dict(old))
+    assert [c["favorite_dates"] for c in calls] == [old, new]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import services.recommendation_service as reco
+
+
+def _keys(frame: pd.DataFrame) -> list[str]:
+    return frame["imdb_key"].tolist()
+
+
+def test_batch_matches_single_user_rankings(synthetic_models, monkeypatch):
+    df = synthetic_models.df
+    keys = df["imdb_key"].tolist()
+    favorites = {"a": {keys[0], keys[7], keys[21]}, "b": {keys[3]}, "c": set()}
+    dates = {
+        "a": {keys[0]: "2020-01-01", keys[7]: "2025-06-01", keys[21]: "2018-03-01"},
+        "b": {keys[3]: "2024-01-01"},
+    }
+
+    for aggregation in ("max", "sum", "rrf", "recency"):
+        monkeypatch.setattr(reco, "get_reco_aggregation", lambda agg=aggregation: agg)
+        batch = reco.get_recommendations_for_users(df, favorites, n=10, favorite_dates_by_user=dates)
+        for user, favs in favorites.items():
+            single = reco.get_recommendations_from_favorites(
+                df, favs, n=10, aggregation=aggregation, favorite_dates=dates.get(user)
+            )
+            assert _keys(batch[user]) == _keys(single), (aggregation, user)
+
+
+def test_recency_weights_change_the_batch_ranking(synthetic_models, monkeypatch):
+    df = synthetic_models.df
+    keys = df["imdb_key"].tolist()
+    favs = {keys[0], keys[30]}
+    monkeypatch.setattr(reco, "get_reco_aggregation", lambda: "recency")
+    recent_first = {"u": {keys[0]: "2025-01-01", keys[30]: "1990-01-01"}}
+    recent_last = {"u": {keys[0]: "1990-01-01", keys[30]: "2025-01-01"}}
+    a = reco.get_recommendations_for_users(df, {"u": favs}, n=5, favorite_dates_by_user=recent_first)["u"]
+    b = reco.get_recommendations_for_users(df, {"u": favs}, n=5, favorite_dates_by_user=recent_last)["u"]
+    assert _keys(a) != _keys(b)
+
+
+def test_franchise_limit_with_duplicated_index_labels():
+    titles = ["Alien", "Aliens", "Alien 3", "Alien Resurrection", "Heat", "Up", "Rocky", "Rocky II", "Rocky III"]
+    parts = [
+        pd.DataFrame({"imdb_key": [f"tt{i}" for i in range(start, start + 3)], "movie_title": titles[start:start + 3]})
+        for start in (0, 3, 6)
+    ]
+    full_df = pd.concat(parts)  # index 0, 1, 2, 0, 1, 2, ...
+    assert not full_df.index.is_unique
+
+    order = [8, 0, 1, 2, 4, 6, 7]
+    limited = reco._limit_by_franchise(full_df.iloc[order], n=10, max_per_franchise=2, full_df=full_df)
+    unique_df = full_df.reset_index(drop=True)
+    expected = reco._limit_by_franchise(unique_df.iloc[order], n=10, max_per_franchise=2, full_df=unique_df)
+    assert _keys(limited) == _keys(expected) == ["tt8", "tt0", "tt1", "tt2", "tt4", "tt6"]
+
+
+@pytest.mark.parametrize("scale", [1.0, 5.0], ids=["euclidean", "manhattan"])
+def test_large_distances_still_favor_shared_and_recent_neighbors(scale):
+    # Euclidean distances of the shipped models run ~3.7-5.4, manhattan ~14-28.
+    distances = np.array([[4.0, 4.5, 5.0], [4.0, 4.5, 5.0]]) * scale
+    indices = np.array([[10, 11, 12], [20, 21, 12]])
+
+    rows, scores = reco._aggregate_neighbor_scores(indices, distances, [0, 1], "sum")
+    assert (scores > 0).all()
+    assert rows[np.argmax(scores)] == 12
+
+    weights = np.array([1.0, 0.01])  # favorite 0 added recently, favorite 1 long ago
+    rows, scores = reco._aggregate_neighbor_scores(indices, distances, [0, 1], "recency", weights)
+    by_row = dict(zip(rows.tolist(), scores.tolist()))
+    assert min(by_row[10], by_row[11]) > max(by_row[20], by_row[21])
+
+
+@pytest.mark.parametrize("fitted_rows", [20, 19])
+def test_unstamped_pickle_must_match_the_catalog_rows(tmp_path, monkeypatch, fresh_memos, fitted_rows):
+    joblib = pytest.importorskip("joblib")
+    neighbors = pytest.importorskip("sklearn.neighbors")
+
+    rng = np.random.default_rng(1)
+    model = neighbors.NearestNeighbors(algorithm="brute", metric="cosine").fit(rng.random((fitted_rows, 5)))
+    joblib.dump(model, tmp_path / "KNN_cosine.pkl")
+    monkeypatch.setattr(reco, "_KNN_MODELS_DIR", tmp_path)
+    monkeypatch.setattr(reco, "get_recommender_model", lambda: "cosine")
+    df = pd.DataFrame({"imdb_key": [f"tt{i}" for i in range(20)], "movie_title": ["x"] * 20})
+
+    backend, reason = reco.get_recommender_info(df)
+    neighbors_found = reco._knn_neighbors(reco.catalog_for(df), [0, 1], 3)
+    if fitted_rows == len(df):
+        assert backend == "knn_cosine" and "non vérifiés" in reason
+        assert neighbors_found is not None
+    else:
+        assert backend == "fallback" and "non aligné" in reason
+        assert neighbors_found is None
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils.spelling import build_spell_index, edit_distance
+
+
+CATALOG_CSV = Path(__file__).resolve().parent.parent / "df_pret_bis.csv"
+
+
+def _index(titles: list[str], directors: list[str] | None = None):
+    directors = directors or [""] * len(titles)
+    df = pd.DataFrame({"movie_title_clean": titles, "director_name": directors})
+    return build_spell_index(df)
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "expected"),
+    [("potter", "potter", 0), ("poter", "potter", 1), ("wras", "wars", 1), ("matrx", "matrix", 1), ("abc", "xyz", 3)],
+)
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b, max_distance=2) == min(expected, 3)
+
+
+def test_known_and_short_words_are_kept():
+    index = _index(["Alien", "Aliens"])
+    assert index.correct_query("alien") == ("alien", 0)
+    assert index.correct_query("alen") == ("alien", 1)
+    assert index.correct_query("ali") == ("ali", 0)  # too short to correct
+    assert index.correct_query("zzzzzz") == ("zzzzzz", 0)
+
+
+def test_title_words_beat_frequent_names():
+    # "peter" is far more frequent, but only in names.
+    titles = ["Harry Potter and the Goblet of Fire", "Harry Potter and the Chamber of Secrets", "Up", "Heat"]
+    directors = ["Peter Jackson", "Peter Weir", "Peter Berg", "Peter Yates"]
+    index = _index(titles, directors)
+    assert index.correct("poter").word == "potter"
+    assert index.correct_query("harry poter") == ("harry potter", 1)
+
+
+def test_query_context_breaks_ties():
+    titles = ["Peter Pan", "Hook", "The Potter", "Harry and Tonto", "Harry Potter"]
+    index = _index(titles)
+    # "peter" and "potter" are both one edit away and in as many titles.
+    assert index.correct_query("poter pan") == ("peter pan", 1)
+    assert index.correct_query("harry poter") == ("harry potter", 1)
+
+
+def test_names_share_context_too():
+    index = _index(["Memento", "Hook"], ["Christopher Nolan", "Noam Murro"])
+    assert index.correct_query("christopher nolam") == ("christopher nolan", 1)
+
+
+def test_catalog_queries():
+    df = pd.read_csv(CATALOG_CSV)
+    index = build_spell_index(df)
+    for query, expected in [
+        ("harry poter", "harry potter"),
+        ("christopher nolam", "christopher nolan"),
+        ("star wras", "star wars"),
+        ("jurasic park", "jurassic park"),
+    ]:
+        assert index.correct_query(query)[0] == expected
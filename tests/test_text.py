@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.text import normalize_text, normalize_text_series
+
+
+CATALOG_CSV = Path(__file__).resolve().parent.parent / "df_pret_bis.csv"
+CATALOG_COLUMNS = ["movie_title", "director_name", "actor_1_name", "actor_2_name", "actor_3_name", "genres"]
+
+
+def _assert_same(values) -> None:
+    expected = [normalize_text(v) for v in values]
+    assert normalize_text_series(values).tolist() == expected
+
+
+@pytest.mark.parametrize("column", CATALOG_COLUMNS)
+def test_catalog_columns(column):
+    df = pd.read_csv(CATALOG_CSV, usecols=[column])
+    result = normalize_text_series(df[column])
+    assert result.index.equals(df.index)
+    assert result.tolist() == [normalize_text(v) for v in df[column]]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["Amélie", "Ève", "  Où est Charlie ?  ", "Ça tourne", "naïve", "Señor", "Ångström"],
+        ["Cœur", "Œdipe roi", "æther", "Æon Flux", "ﬁlm", "Straße"],
+        [None, np.nan, float("nan"), "", "   ", pd.NA, 0, 12.5],
+        ["２０１９", "①", "ℌello", "x²", "Ⅻ", "ＡＢＣ", " a b​"],
+        ["a\x00b", "a\x00c", "\x00", "a\ud800b", "a\udc00b", "\udfff", "😀 emoji", "é́"],
+        ["Spider-Man: Far From Home", "Spider Man far from home", "SPIDER—MAN", "spider_man"],
+        # Combining marks outside U+0300-036F (Hebrew point, kana, Devanagari, ...).
+        ["a\u05b0b", "ka\u3099ta", "a\u093cb", "x\u1ab0y", "q\u20d7r", "m\ufe20n", "o\U0001d165p"],
+    ],
+    ids=["accents", "ligatures", "missing", "compatibility", "nul-surrogates", "punctuation", "combining-blocks"],
+)
+def test_edge_cases(values):
+    _assert_same(values)
+
+
+def test_random_unicode():
+    rng = random.Random(0)
+    ranges = [(0x00, 0x7F), (0x80, 0x2FFF), (0xD800, 0xDFFF), (0x10000, 0x1FFFF)]
+    values = [
+        "".join(chr(rng.randint(*rng.choice(ranges))) for _ in range(rng.randint(0, 8)))
+        for _ in range(20_000)
+    ]
+    _assert_same(values)
+
+
+def test_inputs_and_index():
+    series = pd.Series(["Élan", None, "Élan"], index=[10, 20, 30])
+    result = normalize_text_series(series)
+    assert result.index.tolist() == [10, 20, 30]
+    assert result.tolist() == ["elan", "", "elan"]
+    assert normalize_text_series(np.array(["Œuf", "b"], dtype=object)).tolist() == [normalize_text("Œuf"), "b"]
+    assert normalize_text_series(v for v in ["A", "é"]).tolist() == ["a", "e"]
+    assert normalize_text_series(pd.Series([], dtype=object)).empty
@@ -2,9 +2,11 @@ import streamlit as st
 from utils.i18n import t, set_language, get_current_language
 
 from utils.user_repo import (
+    add_favorite,
     backend_name,
     create_user,
     get_user,
+    remove_favorite,
     save_favorites,
     update_profile as repo_update_profile,
     update_user_password,
@@ -324,7 +326,8 @@ def logout_button():
             if email:
                 try:
                     save_favorites(str(email), set(
-                        map(str, st.session_state.get("favorites", set()))))
+                        map(str, st.session_state.get("favorites", set()))),
+                        user_id=st.session_state.get("user_id"))
                 except Exception:
                     pass
 
@@ -358,8 +361,9 @@ def toggle_favorite(imdb_key: str) -> bool:
 
         if st.session_state.get("is_authenticated", False) and st.session_state.get("user_email"):
             try:
-                save_favorites(
-                    str(st.session_state["user_email"]), set(map(str, favorites)))
+                remove_favorite(
+                    str(st.session_state["user_email"]), str(imdb_key),
+                    user_id=st.session_state.get("user_id"))
             except Exception:
                 st.session_state["flash_message"] = "Retire (non sauvegarde MySQL)."
         return False
@@ -368,8 +372,9 @@ def toggle_favorite(imdb_key: str) -> bool:
     st.session_state["flash_message"] = "Ajoute aux favoris."
     if st.session_state.get("is_authenticated", False) and st.session_state.get("user_email"):
         try:
-            save_favorites(
-                str(st.session_state["user_email"]), set(map(str, favorites)))
+            add_favorite(
+                str(st.session_state["user_email"]), str(imdb_key),
+                user_id=st.session_state.get("user_id"))
         except Exception:
             st.session_state["flash_message"] = "Ajoute (non sauvegarde MySQL)."
     return True
@@ -432,7 +437,8 @@ def update_profile(
     st.session_state.cinema_last_12m = (user or {}).get("cinema_last_12m")
     try:
         save_favorites(next_email, set(
-            map(str, st.session_state.get("favorites", set()))))
+            map(str, st.session_state.get("favorites", set()))),
+            user_id=st.session_state.get("user_id"))
     except Exception:
         st.session_state["flash_message"] = "Profil mis a jour (favoris non sauvegardes MySQL)."
     return True, msg
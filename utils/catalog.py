@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import weakref
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def _frame_version(df: pd.DataFrame) -> str:
+    # `*_display` columns only vary with the UI language: every language view of
+    # the same catalog gets the same version (and therefore the same indexes).
+    cols = [c for c in df.columns if not str(c).endswith("_display")]
+    hashed = pd.util.hash_pandas_object(df[cols], index=True).to_numpy()
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update(",".join(map(str, cols)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _group_positions(values: pd.Series) -> dict[Any, np.ndarray]:
+    groups: dict[Any, np.ndarray] = {}
+    if values.empty:
+        return groups
+    codes, uniques = pd.factorize(values, sort=True)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(uniques) + 1))
+    for i, value in enumerate(uniques.tolist()):
+        groups[value] = order[bounds[i]: bounds[i + 1]].astype(np.int64)
+    return groups
+
+
+class MovieCatalog:
+    """
+    Row-position indexes over a movies frame, built once per catalog version.
+
+    Positions are `iloc` positions: they are valid for every language view of
+    the catalog returned by `load_movies` since views share the row order.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str | None = None):
+        self.version = version or _frame_version(df)
+        self.n_rows = int(len(df))
+
+        if "imdb_key" in df.columns:
+            raw_keys = df["imdb_key"].tolist()
+            self.keys = np.array(
+                ["" if pd.isna(k) else str(k).strip() for k in raw_keys], dtype=object
+            )
+        else:
+            self.keys = np.full(self.n_rows, "", dtype=object)
+
+        self.key_to_pos: dict[str, int] = {}
+        for pos, key in enumerate(self.keys.tolist()):
+            if key and key not in self.key_to_pos:
+                self.key_to_pos[key] = pos
+
+        if "genre_main" in df.columns:
+            self._genre_positions = _group_positions(df["genre_main"].dropna().astype(str))
+        else:
+            self._genre_positions = {}
+
+        if "decade" in df.columns:
+            decades = pd.to_numeric(df["decade"], errors="coerce")
+        elif "title_year" in df.columns:
+            decades = (pd.to_numeric(df["title_year"], errors="coerce") // 10) * 10
+        else:
+            decades = pd.Series(dtype=float)
+        self._decade_positions = {
+            int(k): v for k, v in _group_positions(decades.dropna()).items()
+        }
+
+        self._frame_ref = weakref.ref(df)
+        self._derived: dict[Any, Any] = {}
+
+    # -- key lookups -------------------------------------------------------
+
+    def position(self, imdb_key: Any) -> int | None:
+        if imdb_key is None:
+            return None
+        return self.key_to_pos.get(str(imdb_key).strip())
+
+    def positions(self, imdb_keys: Iterable[Any]) -> np.ndarray:
+        """Catalog-ordered positions of the known keys (unknown keys are skipped)."""
+        found = {self.key_to_pos.get(str(k).strip()) for k in imdb_keys if k is not None}
+        found.discard(None)
+        if not found:
+            return _EMPTY_POSITIONS
+        return np.fromiter(sorted(found), dtype=np.int64, count=len(found))
+
+    def take(self, df: pd.DataFrame, imdb_keys: Iterable[Any]) -> pd.DataFrame:
+        return df.iloc[self.positions(imdb_keys)]
+
+    # -- groups ------------------------------------------------------------
+
+    def genres(self) -> list[str]:
+        return list(self._genre_positions.keys())
+
+    def genre_positions(self, genre: Any) -> np.ndarray:
+        return self._genre_positions.get(str(genre), _EMPTY_POSITIONS)
+
+    def decades(self) -> list[int]:
+        return list(self._decade_positions.keys())
+
+    def decade_positions(self, decade: Any) -> np.ndarray:
+        try:
+            return self._decade_positions.get(int(decade), _EMPTY_POSITIONS)
+        except (TypeError, ValueError):
+            return _EMPTY_POSITIONS
+
+    def category_positions(self, category: str, *, min_votes: int = 5) -> np.ndarray:
+        from utils.movie_categories import get_categories
+
+        df = self.frame()
+        if df is None:
+            return _EMPTY_POSITIONS
+        return get_categories(df, min_votes=min_votes).positions(category)
+
+    # -- derived structures ------------------------------------------------
+
+    def frame(self) -> pd.DataFrame | None:
+        return self._frame_ref()
+
+    def derived(self, name: Any, builder: Callable[[], Any]) -> Any:
+        """Memoizes `builder()` on this catalog (search indexes, matrices, ...)."""
+        if name not in self._derived:
+            self._derived[name] = builder()
+        return self._derived[name]
+
+    def forget(self, prefix: Any = None) -> None:
+        """Drops memoized structures (all of them, or those whose name/first item is `prefix`)."""
+        if prefix is None:
+            self._derived.clear()
+            return
+        for name in list(self._derived):
+            head = name[0] if isinstance(name, tuple) and name else name
+            if head == prefix:
+                self._derived.pop(name, None)
+
+
+_CATALOGS_BY_FRAME: dict[int, tuple[weakref.ref, MovieCatalog]] = {}
+_CATALOGS_BY_VERSION: dict[str, MovieCatalog] = {}
+_MAX_CATALOG_VERSIONS = 4
+
+
+def _forget_frame(frame_id: int) -> None:
+    _CATALOGS_BY_FRAME.pop(frame_id, None)
+
+
+def catalog_for(df: pd.DataFrame, version: str | None = None) -> MovieCatalog:
+    """Returns the (memoized) `MovieCatalog` of a full movies frame."""
+    frame_id = id(df)
+    entry = _CATALOGS_BY_FRAME.get(frame_id)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    version = version or _frame_version(df)
+    catalog = _CATALOGS_BY_VERSION.get(version)
+    if catalog is None or catalog.n_rows != len(df):
+        catalog = MovieCatalog(df, version=version)
+        _CATALOGS_BY_VERSION[version] = catalog
+        while len(_CATALOGS_BY_VERSION) > _MAX_CATALOG_VERSIONS:
+            _CATALOGS_BY_VERSION.pop(next(iter(_CATALOGS_BY_VERSION)))
+    elif catalog.frame() is None:
+        catalog._frame_ref = weakref.ref(df)
+
+    ref = weakref.ref(df, lambda _ref, fid=frame_id: _forget_frame(fid))
+    _CATALOGS_BY_FRAME[frame_id] = (ref, catalog)
+    return catalog
+
+
+def iter_catalogs() -> list[MovieCatalog]:
+    return list(_CATALOGS_BY_VERSION.values())
+
+
+def clear_catalogs() -> None:
+    """Forgets every memoized catalog (and their derived structures)."""
+    for catalog in _CATALOGS_BY_VERSION.values():
+        catalog.forget()
+    _CATALOGS_BY_VERSION.clear()
+    _CATALOGS_BY_FRAME.clear()
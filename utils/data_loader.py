@@ -1,11 +1,22 @@
+import hashlib
+import os
+
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 
-from utils.text import normalize_text
+from utils.catalog import MovieCatalog, catalog_for, clear_catalogs
+from utils.text import normalize_text_series
 from utils.i18n import get_current_language
 
 
+_ROOT_DIR = Path(__file__).resolve().parent.parent
+_CATALOG_CACHE_DIR = _ROOT_DIR / "data" / "cache"
+
+# Bump when the derived columns computed in `_build_movies_frame` change.
+CATALOG_CACHE_VERSION = 2
+
+
 def _minmax_norm(series: pd.Series) -> pd.Series:
     series = pd.to_numeric(series, errors="coerce")
     min_value = series.min()
@@ -15,23 +26,49 @@ def _minmax_norm(series: pd.Series) -> pd.Series:
     return (series - min_value) / (max_value - min_value)
 
 
-@st.cache_data
-def load_movies(path: str | Path | None = None) -> pd.DataFrame:
-    csv_path = (
-        Path(path)
-        if path is not None
-        else (
-            (Path(__file__).resolve().parent.parent / "df_pret_bis_fr.csv")
-            if get_current_language() == "fr"
-            and (Path(__file__).resolve().parent.parent / "df_pret_bis_fr.csv").exists()
-            else (Path(__file__).resolve().parent.parent / "df_pret_bis.csv")
-        )
-    )
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _catalog_cache_path(csv_path: Path) -> Path:
+    digest = _file_sha256(csv_path)[:16]
+    return _CATALOG_CACHE_DIR / f"catalog_v{CATALOG_CACHE_VERSION}_{digest}.parquet"
+
+
+def _read_catalog_cache(cache_path: Path) -> pd.DataFrame | None:
+    if not cache_path.exists():
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception:
+        # Missing pyarrow or corrupted artifact: rebuild from the CSV.
+        return None
+
+
+def _write_catalog_cache(df: pd.DataFrame, cache_path: Path) -> None:
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # Read-only filesystem or no parquet engine: the CSV path still works.
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except Exception:
+            pass
+
+
+def _build_movies_frame(csv_path: Path) -> pd.DataFrame:
     df = pd.read_csv(csv_path)
 
     df["movie_title_clean"] = df["movie_title"].fillna("").astype(str).str.strip()
     df["title_lower"] = df["movie_title_clean"].str.lower()
-    df["title_search"] = df["movie_title_clean"].map(normalize_text)
+    df["title_search"] = normalize_text_series(df["movie_title_clean"])
 
     if "genre_main" in df.columns:
         df["genre_main_lower"] = df["genre_main"].fillna("").astype(str).str.lower()
@@ -40,29 +77,89 @@ def load_movies(path: str | Path | None = None) -> pd.DataFrame:
         if col in df.columns:
             df[f"{col}_norm"] = _minmax_norm(df[col])
 
-    # Display-only translated fields (do not break filtering/grouping on original columns)
-    if get_current_language() == "fr":
-        if "Plot_fr" in df.columns and "Plot" in df.columns:
-            df["Plot_display"] = df["Plot_fr"].fillna(df["Plot"])
-        if "genres_fr" in df.columns and "genres" in df.columns:
-            df["genres_display"] = df["genres_fr"].fillna(df["genres"])
-        if "genre_main_fr" in df.columns and "genre_main" in df.columns:
-            df["genre_main_display"] = df["genre_main_fr"].fillna(df["genre_main"])
-        if "language_fr" in df.columns and "language" in df.columns:
-            df["language_display"] = df["language_fr"].fillna(df["language"])
-        if "country_name_fr" in df.columns and "country_name" in df.columns:
-            df["country_display"] = df["country_name_fr"].fillna(df["country_name"])
-        elif "country_main" in df.columns:
-            df["country_display"] = df["country_main"]
-    else:
-        if "Plot" in df.columns:
-            df["Plot_display"] = df["Plot"]
-        if "genres" in df.columns:
-            df["genres_display"] = df["genres"]
-        if "genre_main" in df.columns:
-            df["genre_main_display"] = df["genre_main"]
-        if "language" in df.columns:
-            df["language_display"] = df["language"]
-        if "country_name" in df.columns:
-            df["country_display"] = df["country_name"]
     return df
+
+
+# (display column, French translation column, source column)
+_DISPLAY_COLUMNS = (
+    ("Plot_display", "Plot_fr", "Plot"),
+    ("genres_display", "genres_fr", "genres"),
+    ("genre_main_display", "genre_main_fr", "genre_main"),
+    ("language_display", "language_fr", "language"),
+    ("country_display", "country_name_fr", "country_name"),
+)
+
+
+def _resolve_catalog_path(path: str | Path | None) -> Path:
+    if path is not None:
+        return Path(path)
+    # The translated CSV is a superset of the base one, so it is used for every
+    # language; the display language only changes the `*_display` overlay.
+    fr_path = _ROOT_DIR / "df_pret_bis_fr.csv"
+    return fr_path if fr_path.exists() else (_ROOT_DIR / "df_pret_bis.csv")
+
+
+@st.cache_resource(show_spinner=False)
+def _load_base_movies(csv_path: str) -> pd.DataFrame:
+    """Language-independent catalog, parsed once per process."""
+    # Cold starts reuse a columnar snapshot (derived columns included) keyed on
+    # the CSV content instead of re-parsing the CSV.
+    try:
+        cache_path = _catalog_cache_path(Path(csv_path))
+    except OSError:
+        cache_path = None
+
+    if cache_path is not None:
+        cached = _read_catalog_cache(cache_path)
+        if cached is not None:
+            return cached
+
+    df = _build_movies_frame(Path(csv_path))
+    if cache_path is not None:
+        _write_catalog_cache(df, cache_path)
+    return df
+
+
+def _build_language_view(base: pd.DataFrame, language: str) -> pd.DataFrame:
+    # Shallow copy: every base column is shared, only the display columns are added.
+    view = base.copy(deep=False)
+
+    # Display-only translated fields (do not break filtering/grouping on original columns)
+    for display_col, translated_col, source_col in _DISPLAY_COLUMNS:
+        if source_col not in base.columns:
+            continue
+        if language == "fr" and translated_col in base.columns:
+            view[display_col] = base[translated_col].fillna(base[source_col])
+        elif language == "fr" and display_col == "country_display" and "country_main" in base.columns:
+            view[display_col] = base["country_main"]
+        else:
+            view[display_col] = base[source_col]
+    return view
+
+
+@st.cache_resource(show_spinner=False)
+def _load_language_view(csv_path: str, language: str) -> pd.DataFrame:
+    return _build_language_view(_load_base_movies(csv_path), language)
+
+
+def load_movies(path: str | Path | None = None) -> pd.DataFrame:
+    """
+    Returns the catalog with `*_display` columns for the current language.
+
+    The frame is shared by every session of the process: treat it as read-only
+    and `.copy()` before adding or modifying columns.
+    """
+    csv_path = _resolve_catalog_path(path)
+    return _load_language_view(str(csv_path), get_current_language())
+
+
+def load_catalog(path: str | Path | None = None) -> MovieCatalog:
+    """Key/genre/category/decade indexes of the frame returned by `load_movies`."""
+    return catalog_for(load_movies(path))
+
+
+def invalidate_catalog_caches() -> None:
+    """Hook to call when the dataset changes: drops frames, indexes and categories."""
+    _load_base_movies.clear()
+    _load_language_view.clear()
+    clear_catalogs()
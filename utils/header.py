@@ -9,10 +9,14 @@ import streamlit as st
 from PIL import Image
 
 from utils.i18n import t
+from utils.search import Suggestion, popular_suggestions, suggest_movies
 from utils.text import normalize_text
 
 
 SEARCH_RESULTS_PAGE = "pages/_Recherche.py"
+SEARCH_SUGGESTIONS_LIMIT = 10
+# Popular titles / people sent with the search box (the rest: Enter -> results).
+SEARCH_SUGGESTION_OPTIONS = 1500
 
 
 @st.cache_data(show_spinner=False)
@@ -33,8 +37,8 @@ def _get_brand_logo_data_uri() -> str | None:
         return None
 
 
-def _submit_global_search(source_page: str) -> None:
-    raw = str(st.session_state.get("wf_global_search_query", "")).strip()
+def _submit_global_search(source_page: str, query: str) -> None:
+    raw = str(query).strip()
     q = normalize_text(raw)
     if len(q) < 2:
         return
@@ -49,30 +53,73 @@ def _submit_global_search(source_page: str) -> None:
         st.rerun()
 
 
+def _open_suggestion(
+    df: pd.DataFrame, suggestion: Suggestion, source_page: str, target_page: str | None
+) -> None:
+    if suggestion.kind != "title":
+        _submit_global_search(source_page, query=suggestion.label)
+        return
+
+    imdb_key = df.iloc[suggestion.position].get("imdb_key")
+    if imdb_key is None or pd.isna(imdb_key):
+        return
+    st.session_state["selected_imdb_key"] = str(imdb_key)
+    st.query_params["id"] = str(imdb_key)
+    st.session_state["selected_source_page"] = source_page
+    if target_page:
+        st.switch_page(target_page)
+    else:
+        st.rerun()
+
+
+def _suggestion_options(df: pd.DataFrame) -> list[Suggestion]:
+    # The browser filters these while typing (no rerun per key): completions of
+    # the last query from the prefix index first, then the most popular entries.
+    options: list[Suggestion] = []
+    last_query = str(st.session_state.get("wf_search_query") or "").strip()
+    if last_query:
+        options.extend(suggest_movies(df, last_query, limit=SEARCH_SUGGESTIONS_LIMIT))
+    seen = set(options)
+    options.extend(s for s in popular_suggestions(df, SEARCH_SUGGESTION_OPTIONS) if s not in seen)
+    return options
+
+
+def _suggestion_label(option: Suggestion | str) -> str:
+    if isinstance(option, Suggestion):
+        return f"{'🎬' if option.kind == 'title' else '👤'} {option.label}"
+    return str(option)
+
+
+def _remember_search_pick() -> None:
+    # Only a picked suggestion or Enter (free text) changes the selectbox; the
+    # typed text is dropped on blur. The box is emptied for the next search.
+    st.session_state["wf_global_search_pending"] = st.session_state.get("wf_global_search_pick")
+    st.session_state["wf_global_search_pick"] = None
+
+
 def render_global_search(
     df: pd.DataFrame, source_page: str, target_page: str | None = "pages/_Film.py"
 ) -> None:
-    # NOTE: `df` and `target_page` kept for backward compatibility.
+    # `target_page`: where title suggestions open (None: rerun the current page).
     with st.container(key="wf_global_header"):
-        with st.form("global_search_form", border=False):
-            # Search only (no logo) to avoid layout issues across browsers.
-            # Centering the search bar with empty columns on sides
-            _, c1, c2, _ = st.columns(
-                [2, 5, 1, 2], vertical_alignment="center")
-            with c1:
-                st.text_input(
-                    t("search_placeholder"),
-                    key="wf_global_search_query",
-                    label_visibility="collapsed",
-                    placeholder=t("search_placeholder"),
-                )
-
-            with c2:
-                submitted = st.form_submit_button(
-                    t("search_submit"),
-                    use_container_width=True,
-                    type="secondary",
-                )
-
-            if submitted:
-                _submit_global_search(source_page)
+        # Search only (no logo) to avoid layout issues across browsers.
+        # Centering the search bar with empty columns on sides
+        _, c1, _ = st.columns([2, 6, 2], vertical_alignment="center")
+        with c1:
+            st.selectbox(
+                t("search_placeholder"),
+                options=[] if df.empty else _suggestion_options(df),
+                index=None,
+                format_func=_suggestion_label,
+                key="wf_global_search_pick",
+                label_visibility="collapsed",
+                placeholder=t("search_placeholder"),
+                accept_new_options=True,
+                on_change=_remember_search_pick,
+            )
+
+    picked = st.session_state.pop("wf_global_search_pending", None)
+    if isinstance(picked, Suggestion):
+        _open_suggestion(df, picked, source_page, target_page)
+    elif picked is not None:
+        _submit_global_search(source_page, query=picked)
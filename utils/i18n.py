@@ -21,10 +21,9 @@ TRANSLATIONS = {
         "profile_title": "Mon profil",
         "cinemas_title": "Informations",
         "admin_title": "Admin",
-        "search_submit": "Rechercher",
         "search_page_title": "Recherche",
         "search_results_for": "Résultats pour : {}",
-        "search_hint": "Tapez un nom de film puis appuyez sur Entrée ou Rechercher.",
+        "search_hint": "Tapez un nom de film, un réalisateur ou un acteur puis appuyez sur Entrée, ou choisissez une suggestion.",
         "back_button": "Retour",
         "admin_home_tab": "Accueil",
         "admin_filters_title": "Filtres utilisateurs",
@@ -49,8 +48,12 @@ TRANSLATIONS = {
         "admin_settings_tab": "Modèles de recommandation",
         "admin_reco_model_label": "Modèle de recommandation",
         "admin_reco_model_help": "Choisissez le modèle ML utilisé partout dans l'application.",
+        "admin_reco_aggregation_label": "Agrégation des voisins",
+        "admin_reco_aggregation_help": "Comment combiner les voisins de plusieurs favoris en un score.",
         "admin_settings_saved": "Réglages enregistrés.",
         "admin_reco_backend_status": "Moteur : {} — {}",
+        "admin_mysql_pool_status": "Pool MySQL : {} en cours, {} inactives (max {}), {} ouvertures, {} attentes.",
+        "admin_reco_ann_quality": "Index ANN : rappel@{} de {:.0f} % vs KNN cosine exact, {:.2f} ms par requête.",
         "search_placeholder": "Rechercher un film…",
         "search_no_result": "Aucun résultat.",
         "search_open": "Ouvrir",
@@ -161,10 +164,9 @@ TRANSLATIONS = {
         "profile_title": "My Profile",
         "cinemas_title": "Information",
         "admin_title": "Admin",
-        "search_submit": "Search",
         "search_page_title": "Search",
         "search_results_for": "Results for: {}",
-        "search_hint": "Type a movie name then press Enter or Search.",
+        "search_hint": "Type a movie, director or actor name then press Enter, or pick a suggestion.",
         "back_button": "Back",
         "admin_home_tab": "Home",
         "admin_filters_title": "User filters",
@@ -189,8 +191,12 @@ TRANSLATIONS = {
         "admin_settings_tab": "Recommendation models",
         "admin_reco_model_label": "Recommendation model",
         "admin_reco_model_help": "Choose the ML model used across the app.",
+        "admin_reco_aggregation_label": "Neighbour aggregation",
+        "admin_reco_aggregation_help": "How neighbours of several favorites are combined into one score.",
         "admin_settings_saved": "Settings saved.",
         "admin_reco_backend_status": "Engine: {} — {}",
+        "admin_mysql_pool_status": "MySQL pool: {} in use, {} idle (max {}), {} opened, {} waits.",
+        "admin_reco_ann_quality": "ANN index: recall@{} of {:.0f}% vs exact KNN cosine, {:.2f} ms per query.",
         "search_placeholder": "Search for a movie...",
         "search_no_result": "No results found.",
         "search_open": "Open",
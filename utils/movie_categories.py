@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 
+from utils.catalog import catalog_for, iter_catalogs
+
 
 _RATING_CANDIDATES = [
     "imdb_score",
@@ -29,6 +33,107 @@ def _pick_first_existing(cols: list[str], candidates: list[str]) -> str | None:
     return None
 
 
+CATEGORY_LABELS = ("Autre", "Navet", "Blockbuster", "Pépite", "Niche")
+_CATEGORY_CODES = {label: code for code, label in enumerate(CATEGORY_LABELS)}
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class MovieCategories:
+    """
+    Compact per-row categories of a catalog (aligned on row positions).
+
+    `codes` indexes `CATEGORY_LABELS` (int8); `vote_decile` is 1..10, or 0 when
+    it cannot be computed.
+    """
+
+    codes: np.ndarray
+    vote_decile: np.ndarray
+    rating_col: str | None
+    count_col: str | None
+
+    def positions(self, category: str) -> np.ndarray:
+        code = _CATEGORY_CODES.get(str(category))
+        if code is None:
+            return _EMPTY_POSITIONS
+        return np.flatnonzero(self.codes == code)
+
+    def category_series(self, positions: np.ndarray | None = None, index=None) -> pd.Series:
+        codes = self.codes if positions is None else self.codes[positions]
+        values = pd.Categorical.from_codes(codes, categories=list(CATEGORY_LABELS))
+        return pd.Series(values, index=index, name="category")
+
+    def vote_decile_series(self, positions: np.ndarray | None = None, index=None) -> pd.Series:
+        deciles = self.vote_decile if positions is None else self.vote_decile[positions]
+        values = np.where(deciles > 0, deciles, np.nan).astype(float)
+        return pd.Series(values, index=index, name="vote_decile")
+
+    def take(self, df: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+        """Rows at `positions` with their `vote_decile` and `category` columns."""
+        positions = np.asarray(positions, dtype=np.int64)
+        out = df.iloc[positions].copy()
+        out["vote_decile"] = self.vote_decile_series(positions, index=out.index)
+        out["category"] = self.category_series(positions, index=out.index)
+        return out
+
+
+def compute_categories(df: pd.DataFrame, *, min_votes: int = 5) -> MovieCategories:
+    """
+    Category rules (see `categorize_movies`) computed without copying the frame.
+    """
+    n_rows = 0 if df is None else int(len(df))
+    codes = np.zeros(n_rows, dtype=np.int8)
+    deciles = np.zeros(n_rows, dtype=np.int8)
+    if df is None or df.empty:
+        return MovieCategories(codes, deciles, None, None)
+
+    rating_col = _pick_first_existing(list(df.columns), _RATING_CANDIDATES)
+    count_col = _pick_first_existing(list(df.columns), _COUNT_CANDIDATES)
+    if rating_col is None or count_col is None:
+        return MovieCategories(codes, deciles, rating_col, count_col)
+
+    rating = pd.to_numeric(df[rating_col], errors="coerce").to_numpy(dtype=float)
+    count = pd.to_numeric(df[count_col], errors="coerce").to_numpy(dtype=float)
+
+    eligible = ~np.isnan(rating) & ~np.isnan(count) & (count >= int(min_votes))
+    if not eligible.any():
+        return MovieCategories(codes, deciles, rating_col, count_col)
+
+    # qcut can return fewer than 10 bins when duplicates are present.
+    bins = pd.qcut(count[eligible], q=10, labels=False, duplicates="drop")
+    deciles[eligible] = np.asarray(bins, dtype=np.int8) + 1
+
+    # Same precedence as the original rules: later assignments win.
+    decile = deciles.astype(np.int16)
+    codes[eligible & (rating < 4)] = _CATEGORY_CODES["Navet"]
+    codes[eligible & (rating > 8) & np.isin(decile, (9, 10))] = _CATEGORY_CODES["Blockbuster"]
+    codes[eligible & (rating > 8) & (decile >= 3) & (decile <= 7)] = _CATEGORY_CODES["Pépite"]
+    codes[eligible & (rating > 7) & np.isin(decile, (1, 2))] = _CATEGORY_CODES["Niche"]
+    return MovieCategories(codes, deciles, rating_col, count_col)
+
+
+def get_categories(df: pd.DataFrame, *, min_votes: int = 5) -> MovieCategories:
+    """
+    `compute_categories` memoized per catalog version and `min_votes`.
+
+    Use `invalidate_categories` (or `utils.data_loader.invalidate_catalog_caches`
+    when the dataset changes) to force a recompute.
+    """
+    min_votes = int(min_votes)
+    return catalog_for(df).derived(
+        ("categories", min_votes),
+        lambda: compute_categories(df, min_votes=min_votes),
+    )
+
+
+def invalidate_categories(df: pd.DataFrame | None = None) -> None:
+    if df is None:
+        for catalog in iter_catalogs():
+            catalog.forget("categories")
+        return
+    catalog_for(df).forget("categories")
+
+
 def categorize_movies(
     df: pd.DataFrame,
     *,
@@ -46,6 +151,8 @@ def categorize_movies(
       - Niche: rating > 7 and vote_decile in (1, 2)
 
     Returns (df_with_categories, rating_col, count_col).
+
+    Copies the whole frame: pages should prefer `get_categories`.
     """
     if df is None or df.empty:
         out = (df if df is not None else pd.DataFrame()).copy()
@@ -53,37 +160,15 @@ def categorize_movies(
         out["category"] = "Autre"
         return out, None, None
 
-    rating_col = _pick_first_existing(list(df.columns), _RATING_CANDIDATES)
-    count_col = _pick_first_existing(list(df.columns), _COUNT_CANDIDATES)
+    categories = compute_categories(df, min_votes=min_votes)
+    rating_col, count_col = categories.rating_col, categories.count_col
 
     out = df.copy()
-    out["vote_decile"] = np.nan
-    out["category"] = "Autre"
-
-    if rating_col is None or count_col is None:
-        return out, rating_col, count_col
-
-    out[rating_col] = pd.to_numeric(out[rating_col], errors="coerce")
-    out[count_col] = pd.to_numeric(out[count_col], errors="coerce")
-
-    eligible = out[rating_col].notna() & out[count_col].notna() & (out[count_col] >= int(min_votes))
-    if not eligible.any():
-        return out, rating_col, count_col
-
-    work = out.loc[eligible, [rating_col, count_col]].copy()
-    # qcut can return fewer than 10 bins when duplicates are present.
-    work["vote_decile"] = pd.qcut(work[count_col], q=10, labels=False, duplicates="drop").astype(float) + 1
-    work["category"] = "Autre"
-    work.loc[work[rating_col] < 4, "category"] = "Navet"
-    work.loc[(work[rating_col] > 8) & (work["vote_decile"].isin([9, 10])), "category"] = "Blockbuster"
-    work.loc[
-        (work[rating_col] > 8) & (work["vote_decile"].between(3, 7)),
-        "category",
-    ] = "Pépite"
-    work.loc[(work[rating_col] > 7) & (work["vote_decile"].isin([1, 2])), "category"] = "Niche"
-
-    out.loc[work.index, "vote_decile"] = work["vote_decile"]
-    out.loc[work.index, "category"] = work["category"]
+    if rating_col is not None and count_col is not None:
+        out[rating_col] = pd.to_numeric(out[rating_col], errors="coerce")
+        out[count_col] = pd.to_numeric(out[count_col], errors="coerce")
+    out["vote_decile"] = categories.vote_decile_series(index=out.index)
+    out["category"] = np.asarray(CATEGORY_LABELS, dtype=object)[categories.codes]
 
     return out, rating_col, count_col
 
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+# Serializes migrations across processes/servers (MySQL named lock).
+_MIGRATION_LOCK_NAME = "wildflix_schema_migrations"
+_MIGRATION_LOCK_TIMEOUT = 30
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    # Returns False when the step could not complete (e.g. missing ALTER
+    # privilege): it is then not recorded and retried by the next process.
+    apply: Callable[[Any], bool | None]
+
+
+def _create_users_and_favorites(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+          id INT AUTO_INCREMENT PRIMARY KEY,
+          email VARCHAR(255) NOT NULL UNIQUE,
+          pseudo VARCHAR(64) NOT NULL,
+          role VARCHAR(16) NOT NULL DEFAULT 'user',
+          salt VARCHAR(64) NOT NULL,
+          password_hash VARCHAR(128) NOT NULL,
+          date_of_birth DATE NULL,
+          gender VARCHAR(16) NULL,
+          in_creuse TINYINT(1) NULL,
+          cinema_last_12m TINYINT(1) NULL,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS favorites (
+          user_id INT NOT NULL,
+          imdb_key VARCHAR(32) NOT NULL,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (user_id, imdb_key),
+          CONSTRAINT fk_fav_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+
+
+def _add_profile_columns(cur) -> bool:
+    # Databases created before the optional profile fields.
+    complete = True
+    for col_name, col_def in (
+        ("date_of_birth", "DATE NULL"),
+        ("gender", "VARCHAR(16) NULL"),
+        ("in_creuse", "TINYINT(1) NULL"),
+        ("cinema_last_12m", "TINYINT(1) NULL"),
+    ):
+        try:
+            cur.execute("SHOW COLUMNS FROM users LIKE %s", (col_name,))
+            if cur.fetchone() is None:
+                cur.execute(f"ALTER TABLE users ADD COLUMN `{col_name}` {col_def}")
+        except Exception:
+            # Missing permissions or unsupported DDL; keep app running.
+            complete = False
+    return complete
+
+
+def _create_reco_cache(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reco_cache (
+          cache_key CHAR(40) NOT NULL PRIMARY KEY,
+          payload MEDIUMTEXT NOT NULL,
+          last_used TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+          KEY idx_reco_cache_last_used (last_used)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+
+
+# Append-only: never edit an applied migration, add a new version instead.
+# Every step is idempotent so databases created from `sql/mysql_schema.sql`
+# (or by older versions of the app) converge to the same schema.
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "users + favorites", _create_users_and_favorites),
+    Migration(2, "colonnes de profil optionnelles", _add_profile_columns),
+    Migration(3, "cache des recommandations", _create_reco_cache),
+)
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def _ensure_version_table(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+          version INT NOT NULL PRIMARY KEY,
+          description VARCHAR(255) NOT NULL,
+          applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+
+
+def pending_migrations(conn) -> list[Migration]:
+    """Migrations not recorded in `schema_version` yet."""
+    with conn.cursor() as cur:
+        _ensure_version_table(cur)
+        cur.execute("SELECT version FROM schema_version")
+        done = {int(row["version"]) for row in (cur.fetchall() or [])}
+    conn.commit()
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def migrate(conn) -> list[int]:
+    """Applies the pending migrations in order; returns the versions applied."""
+    applied: list[int] = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT GET_LOCK(%s, %s) AS locked", (_MIGRATION_LOCK_NAME, _MIGRATION_LOCK_TIMEOUT))
+        if not (cur.fetchone() or {}).get("locked"):
+            raise RuntimeError("Migration MySQL deja en cours (verrou non obtenu).")
+        try:
+            _ensure_version_table(cur)
+            cur.execute("SELECT version FROM schema_version")
+            done = {int(row["version"]) for row in (cur.fetchall() or [])}
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+                if migration.apply(cur) is False:
+                    continue
+                cur.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s,%s)",
+                    (migration.version, migration.description),
+                )
+                conn.commit()
+                applied.append(migration.version)
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (_MIGRATION_LOCK_NAME,))
+            conn.commit()
+    return applied
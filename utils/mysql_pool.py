@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+
+POOL_MAX_SIZE = 8
+POOL_ACQUIRE_TIMEOUT = 10.0
+POOL_IDLE_TIMEOUT = 300.0
+POOL_MAX_LIFETIME = 3600.0
+# Idle connections older than this are pinged before being handed out.
+POOL_HEALTH_CHECK_AFTER = 30.0
+
+
+@dataclass
+class _Pooled:
+    conn: Any
+    created_at: float
+    last_used: float
+
+
+@dataclass
+class PoolStats:
+    creates: int = 0
+    closes: int = 0
+    acquires: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+    health_check_failures: int = 0
+    timeouts: int = 0
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    `connect()` opens a new connection (injectable: tests can pass any factory
+    returning objects with `close()`, `rollback()` and optionally `ping()`).
+    At most `max_size` connections exist at once; callers wait up to
+    `acquire_timeout` seconds for one to be released. Idle connections are
+    closed after `idle_timeout`, every connection after `max_lifetime`, and
+    one idle for more than `health_check_after` is pinged first (a dead one
+    is replaced by a fresh connection).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = POOL_MAX_SIZE,
+        *,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        max_lifetime: float = POOL_MAX_LIFETIME,
+        health_check_after: float = POOL_HEALTH_CHECK_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._connect = connect
+        self.max_size = max(1, int(max_size))
+        self.acquire_timeout = float(acquire_timeout)
+        self.idle_timeout = float(idle_timeout)
+        self.max_lifetime = float(max_lifetime)
+        self.health_check_after = float(health_check_after)
+        self._clock = clock
+
+        self._idle: deque[_Pooled] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = PoolStats()
+
+    # -- connection lifecycle ----------------------------------------------
+
+    def _close_quietly(self, item: _Pooled) -> None:
+        try:
+            item.conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, item: _Pooled, now: float) -> bool:
+        return (now - item.created_at) >= self.max_lifetime or (now - item.last_used) >= self.idle_timeout
+
+    def _healthy(self, item: _Pooled, now: float) -> bool:
+        if (now - item.last_used) < self.health_check_after or not hasattr(item.conn, "ping"):
+            return True
+        try:
+            item.conn.ping(reconnect=False)
+            return True
+        except TypeError:
+            try:
+                item.conn.ping()
+                return True
+            except Exception:
+                return False
+        except Exception:
+            return False
+
+    def _drop_slot(self) -> None:
+        """Forgets a connection that is about to be closed (lock held by caller)."""
+        self._size -= 1
+        self._stats.closes += 1
+        self._cond.notify()
+
+    def _take_idle_or_slot(self, deadline: float) -> _Pooled | None:
+        """An idle connection (counted in use), or None once a new slot is reserved."""
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool MySQL ferme.")
+                if self._idle:
+                    self._in_use += 1
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None
+
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self._stats.timeouts += 1
+                    raise RuntimeError(
+                        f"Pool MySQL sature ({self.max_size} connexions occupees depuis {self.acquire_timeout:g}s)."
+                    )
+                if not waited:
+                    waited = True
+                    self._stats.waits += 1
+                started = self._clock()
+                self._cond.wait(remaining)
+                self._stats.wait_seconds += self._clock() - started
+
+    def acquire(self) -> _Pooled:
+        deadline = self._clock() + self.acquire_timeout
+        while True:
+            item = self._take_idle_or_slot(deadline)
+            if item is None:
+                break
+            # Expiry and health checks run outside the lock (ping is a round-trip).
+            now = self._clock()
+            if not self._expired(item, now):
+                if self._healthy(item, now):
+                    with self._cond:
+                        self._stats.acquires += 1
+                    return item
+                with self._cond:
+                    self._stats.health_check_failures += 1
+            with self._cond:
+                self._in_use -= 1
+                self._drop_slot()
+            self._close_quietly(item)
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._cond.notify()
+            raise
+        now = self._clock()
+        with self._cond:
+            self._stats.creates += 1
+            self._stats.acquires += 1
+        return _Pooled(conn=conn, created_at=now, last_used=now)
+
+    def release(self, item: _Pooled, *, broken: bool = False) -> None:
+        now = self._clock()
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed or (now - item.created_at) >= self.max_lifetime:
+                self._drop_slot()
+                close = True
+            else:
+                item.last_used = now
+                self._idle.append(item)
+                self._cond.notify()
+                close = False
+        if close:
+            self._close_quietly(item)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrows a connection; it is rolled back (or dropped) if the block raises."""
+        item = self.acquire()
+        broken = False
+        try:
+            yield item.conn
+        except BaseException:
+            try:
+                item.conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.release(item, broken=broken)
+
+    # -- maintenance / metrics ---------------------------------------------
+
+    def prune(self) -> int:
+        """Closes expired idle connections; returns how many were closed."""
+        now = self._clock()
+        with self._cond:
+            expired = [item for item in self._idle if self._expired(item, now)]
+            for item in expired:
+                self._idle.remove(item)
+                self._drop_slot()
+        for item in expired:
+            self._close_quietly(item)
+        return len(expired)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            for _ in idle:
+                self._drop_slot()
+            self._cond.notify_all()
+        for item in idle:
+            self._close_quietly(item)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "creates": self._stats.creates,
+                "closes": self._stats.closes,
+                "acquires": self._stats.acquires,
+                "waits": self._stats.waits,
+                "wait_ms": round(self._stats.wait_seconds * 1000.0, 1),
+                "timeouts": self._stats.timeouts,
+                "health_check_failures": self._stats.health_check_failures,
+            }
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import os
+import threading
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, Callable
 
 import streamlit as st
 from streamlit.errors import StreamlitSecretNotFoundError
 
+from utils.mysql_migrations import migrate
+from utils.mysql_pool import (
+    POOL_IDLE_TIMEOUT,
+    POOL_MAX_LIFETIME,
+    POOL_MAX_SIZE,
+    ConnectionPool,
+)
+
 try:
     import pymysql
     from pymysql.cursors import DictCursor
@@ -54,126 +63,240 @@ def is_mysql_ready() -> bool:
     return is_mysql_enabled() and (pymysql is not None)
 
 
-@contextmanager
-def mysql_conn():
+def _connect_factory(cfg: dict[str, Any]) -> Callable[[], Any]:
+    def connect():
+        return pymysql.connect(
+            host=cfg["host"],
+            port=int(cfg["port"]),
+            user=cfg["user"],
+            password=cfg["password"],
+            database=cfg["database"],
+            charset="utf8mb4",
+            cursorclass=DictCursor,
+            autocommit=False,
+        )
+
+    return connect
+
+
+_POOL_LOCK = threading.Lock()
+_POOL: ConnectionPool | None = None
+_POOL_KEY: tuple | None = None
+
+_SCHEMA_LOCK = threading.Lock()
+# Latch: set once the migrations ran on the current pool's database.
+_SCHEMA_READY = False
+
+
+def set_mysql_pool(pool: ConnectionPool | None) -> None:
+    """Installs a pool (e.g. over a local MySQL/MariaDB stand-in); None rebuilds it from the config."""
+    global _POOL, _POOL_KEY, _SCHEMA_READY
+    with _POOL_LOCK:
+        previous = _POOL
+        _POOL = pool
+        _POOL_KEY = ("injected",) if pool is not None else None
+        _SCHEMA_READY = False
+    if previous is not None and previous is not pool:
+        previous.close()
+
+
+def get_mysql_pool() -> ConnectionPool:
+    """Process-wide pool of the configured server (rebuilt if the config changes)."""
+    global _POOL, _POOL_KEY, _SCHEMA_READY
+    injected = _POOL
+    if injected is not None and _POOL_KEY == ("injected",):
+        return injected
+
     cfg = get_mysql_config()
     if not cfg:
         raise RuntimeError("MySQL non configure (st.secrets['mysql'] ou variables d'environnement).")
     if pymysql is None:
         raise RuntimeError("pymysql n'est pas installe (ajoutez-le a requirements.txt).")
 
-    conn = pymysql.connect(
-        host=cfg["host"],
-        port=int(cfg["port"]),
-        user=cfg["user"],
-        password=cfg["password"],
-        database=cfg["database"],
-        charset="utf8mb4",
-        cursorclass=DictCursor,
-        autocommit=False,
-    )
-    try:
+    key = (cfg["host"], cfg["port"], cfg["user"], cfg["password"], cfg["database"])
+    with _POOL_LOCK:
+        if _POOL is not None and _POOL_KEY in (key, ("injected",)):
+            return _POOL
+        previous = _POOL
+        _POOL = ConnectionPool(
+            _connect_factory(cfg),
+            max_size=int(cfg.get("pool_size") or os.getenv("MYSQL_POOL_SIZE") or POOL_MAX_SIZE),
+            idle_timeout=float(cfg.get("pool_idle_timeout") or POOL_IDLE_TIMEOUT),
+            max_lifetime=float(cfg.get("pool_max_lifetime") or POOL_MAX_LIFETIME),
+        )
+        _POOL_KEY = key
+        _SCHEMA_READY = False
+    if previous is not None:
+        previous.close()
+    return _POOL
+
+
+def mysql_pool_stats() -> dict[str, Any] | None:
+    """Metrics of the current pool (in use, idle, creates, waits, ...), None before first use."""
+    pool = _POOL
+    return pool.stats() if pool is not None else None
+
+
+@contextmanager
+def mysql_conn():
+    """Borrows a pooled connection (rolled back and returned to the pool afterwards on error)."""
+    with get_mysql_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def ensure_schema() -> None:
-    if not is_mysql_ready():
+    """
+    Migrates the database once per process (see `utils/mysql_migrations.py`).
+
+    After the first success this is a flag check: request-path queries run no
+    DDL. `python scripts/migrate_mysql_schema.py` applies the same migrations.
+    """
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    if not is_mysql_ready() and _POOL_KEY != ("injected",):
         return
 
-    try:
-        with mysql_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS users (
-                      id INT AUTO_INCREMENT PRIMARY KEY,
-                      email VARCHAR(255) NOT NULL UNIQUE,
-                      pseudo VARCHAR(64) NOT NULL,
-                      role VARCHAR(16) NOT NULL DEFAULT 'user',
-                      salt VARCHAR(64) NOT NULL,
-                      password_hash VARCHAR(128) NOT NULL,
-                      date_of_birth DATE NULL,
-                      gender VARCHAR(16) NULL,
-                      in_creuse TINYINT(1) NULL,
-                      cinema_last_12m TINYINT(1) NULL,
-                      created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-                    """
-                )
+    with _SCHEMA_LOCK:
+        if _SCHEMA_READY:
+            return
+        try:
+            with mysql_conn() as conn:
+                migrate(conn)
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError(
+                "Impossible de se connecter a MySQL. Verifiez `sql/mysql_schema.sql`, "
+                "puis `.streamlit/secrets.toml` (section [mysql]) et que le serveur MySQL est demarre."
+            ) from exc
+        _SCHEMA_READY = True
 
-                # Backward-compatible schema upgrade (no-op if columns already exist)
-                for col_name, col_def in (
-                    ("date_of_birth", "DATE NULL"),
-                    ("gender", "VARCHAR(16) NULL"),
-                    ("in_creuse", "TINYINT(1) NULL"),
-                    ("cinema_last_12m", "TINYINT(1) NULL"),
-                ):
-                    try:
-                        cur.execute("SHOW COLUMNS FROM users LIKE %s", (col_name,))
-                        exists = cur.fetchone() is not None
-                        if not exists:
-                            cur.execute(
-                                f"ALTER TABLE users ADD COLUMN `{col_name}` {col_def}"
-                            )
-                    except Exception:
-                        # Missing permissions or unsupported DDL; keep app running.
-                        pass
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS favorites (
-                      user_id INT NOT NULL,
-                      imdb_key VARCHAR(32) NOT NULL,
-                      created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                      PRIMARY KEY (user_id, imdb_key),
-                      CONSTRAINT fk_fav_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-                    """
-                )
-            conn.commit()
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError(
-            "Impossible de se connecter a MySQL. Verifiez `sql/mysql_schema.sql`, "
-            "puis `.streamlit/secrets.toml` (section [mysql]) et que le serveur MySQL est demarre."
-        ) from exc
+
+# Client errors meaning the connection itself is gone (server restart,
+# wait_timeout, network): "server has gone away", "lost connection", ...
+_CONNECTION_LOST_CODES = {2006, 2013, 2055}
+
+
+def _is_connection_lost(exc: BaseException) -> bool:
+    if pymysql is None:
+        return False
+    if isinstance(exc, pymysql.err.InterfaceError):
+        return True
+    return (
+        isinstance(exc, pymysql.err.OperationalError)
+        and bool(exc.args)
+        and exc.args[0] in _CONNECTION_LOST_CODES
+    )
+
+
+def _read(fetch: Callable[[Any], Any]) -> Any:
+    """
+    Runs `fetch(cursor)` on a pooled connection and returns its result.
+
+    Only for reads: if the connection turns out to be dead, the pool drops it
+    and the read is retried once on another connection. Writes are not
+    retried (the first attempt may have been applied).
+    """
+    for attempt in (1, 2):
+        try:
+            with mysql_conn() as conn:
+                with conn.cursor() as cur:
+                    result = fetch(cur)
+                conn.commit()
+            return result
+        except Exception as exc:
+            if attempt == 2 or not _is_connection_lost(exc):
+                raise
 
 
 def get_user_by_email(email: str) -> dict[str, Any] | None:
     ensure_schema()
-    with mysql_conn() as conn:
-        with conn.cursor() as cur:
-            try:
-                cur.execute(
-                    """
-                    SELECT id,email,pseudo,role,salt,password_hash,
-                           date_of_birth,gender,in_creuse,cinema_last_12m
-                    FROM users
-                    WHERE email=%s
-                    LIMIT 1
-                    """,
-                    (email,),
-                )
-            except Exception:
-                cur.execute(
-                    "SELECT id,email,pseudo,role,salt,password_hash FROM users WHERE email=%s LIMIT 1",
-                    (email,),
-                )
-            row = cur.fetchone()
-        conn.commit()
-    return row
+
+    def fetch(cur):
+        try:
+            cur.execute(
+                """
+                SELECT id,email,pseudo,role,salt,password_hash,
+                       date_of_birth,gender,in_creuse,cinema_last_12m
+                FROM users
+                WHERE email=%s
+                LIMIT 1
+                """,
+                (email,),
+            )
+        except Exception as exc:
+            if _is_connection_lost(exc):
+                raise
+            cur.execute(
+                "SELECT id,email,pseudo,role,salt,password_hash FROM users WHERE email=%s LIMIT 1",
+                (email,),
+            )
+        return cur.fetchone()
+
+    return _read(fetch)
 
 
 def get_favorites(user_id: int) -> set[str]:
     ensure_schema()
-    with mysql_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT imdb_key FROM favorites WHERE user_id=%s", (int(user_id),))
-            rows = cur.fetchall() or []
-        conn.commit()
+
+    def fetch(cur):
+        cur.execute("SELECT imdb_key FROM favorites WHERE user_id=%s", (int(user_id),))
+        return cur.fetchall() or []
+
+    rows = _read(fetch)
     return {str(r["imdb_key"]) for r in rows if r.get("imdb_key")}
 
 
+def get_favorite_dates(user_id: int) -> dict[str, Any]:
+    ensure_schema()
+
+    def fetch(cur):
+        cur.execute(
+            "SELECT imdb_key, created_at FROM favorites WHERE user_id=%s", (int(user_id),)
+        )
+        return cur.fetchall() or []
+
+    rows = _read(fetch)
+    return {str(r["imdb_key"]): r.get("created_at") for r in rows if r.get("imdb_key")}
+
+
+def get_user_with_favorites(email: str) -> tuple[dict[str, Any] | None, set[str]]:
+    """User row + favorite keys in one query (LEFT JOIN: one row per favorite)."""
+    ensure_schema()
+
+    def fetch(cur):
+        try:
+            cur.execute(
+                """
+                SELECT u.id,u.email,u.pseudo,u.role,u.salt,u.password_hash,
+                       u.date_of_birth,u.gender,u.in_creuse,u.cinema_last_12m,
+                       f.imdb_key
+                FROM users u
+                LEFT JOIN favorites f ON f.user_id = u.id
+                WHERE u.email=%s
+                """,
+                (email,),
+            )
+        except Exception as exc:
+            if _is_connection_lost(exc):
+                raise
+            cur.execute(
+                """
+                SELECT u.id,u.email,u.pseudo,u.role,u.salt,u.password_hash,f.imdb_key
+                FROM users u
+                LEFT JOIN favorites f ON f.user_id = u.id
+                WHERE u.email=%s
+                """,
+                (email,),
+            )
+        return cur.fetchall() or []
+
+    rows = _read(fetch)
+    if not rows:
+        return None, set()
+    user = {k: v for k, v in rows[0].items() if k != "imdb_key"}
+    return user, {str(r["imdb_key"]) for r in rows if r.get("imdb_key")}
+
+
 def create_user(
     email: str,
     pseudo: str,
@@ -304,14 +427,45 @@ def update_optional_fields(
 
 
 def set_favorites(user_id: int, favorites: set[str]) -> None:
+    """Makes the stored favorites equal to `favorites`, touching only the rows that differ."""
     ensure_schema()
+    wanted = set(map(str, favorites))
     with mysql_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("DELETE FROM favorites WHERE user_id=%s", (int(user_id),))
-            if favorites:
-                values = [(int(user_id), str(k)) for k in sorted(set(map(str, favorites)))]
+            cur.execute("SELECT imdb_key FROM favorites WHERE user_id=%s FOR UPDATE", (int(user_id),))
+            stored = {str(r["imdb_key"]) for r in (cur.fetchall() or []) if r.get("imdb_key")}
+            removed = sorted(stored - wanted)
+            added = sorted(wanted - stored)
+            if removed:
                 cur.executemany(
-                    "INSERT INTO favorites (user_id, imdb_key) VALUES (%s,%s)",
-                    values,
+                    "DELETE FROM favorites WHERE user_id=%s AND imdb_key=%s",
+                    [(int(user_id), k) for k in removed],
                 )
+            if added:
+                cur.executemany(
+                    "INSERT IGNORE INTO favorites (user_id, imdb_key) VALUES (%s,%s)",
+                    [(int(user_id), k) for k in added],
+                )
+        conn.commit()
+
+
+def add_favorite(user_id: int, imdb_key: str) -> None:
+    ensure_schema()
+    with mysql_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT IGNORE INTO favorites (user_id, imdb_key) VALUES (%s,%s)",
+                (int(user_id), str(imdb_key)),
+            )
+        conn.commit()
+
+
+def remove_favorite(user_id: int, imdb_key: str) -> None:
+    ensure_schema()
+    with mysql_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM favorites WHERE user_id=%s AND imdb_key=%s",
+                (int(user_id), str(imdb_key)),
+            )
         conn.commit()
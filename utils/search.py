@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 
+import numpy as np
 import pandas as pd
 
+from utils.catalog import catalog_for
+from utils.search_index import (
+    Suggestion,
+    get_field_index,
+    get_suggestion_index,
+    get_title_index,
+)
+from utils.spelling import get_spell_index
 from utils.text import normalize_text
 
 
+# Titles fuzzy-scored per query at most (best trigram overlap first).
+SEARCH_MAX_CANDIDATES = 1000
+
+# Score cost of each typo correction applied to the query.
+_TYPO_PENALTY = 0.05
+
+# Ranked results kept by the process-wide search cache.
+SEARCH_CACHE_SIZE = 512
+
+
 @dataclass(frozen=True)
 class SearchResult:
     df: pd.DataFrame
@@ -19,14 +40,21 @@ def _compact(text: str) -> str:
     return (text or "").replace(" ", "")
 
 
-def _score_title(query_norm: str, title_norm: str) -> float:
+def _score_title(query_norm: str, title_norm: str, edit_distance: int = 0) -> float:
+    """
+    Similarity between a query and a title (both normalized), in [0, 1].
+
+    `edit_distance` is the number of typo corrections applied to the query
+    (see `utils.spelling`): each one costs `_TYPO_PENALTY`.
+    """
     q = _compact(query_norm)
     t = _compact(title_norm)
     if not q or not t:
         return 0.0
 
+    penalty = _TYPO_PENALTY * edit_distance
     if q in t:
-        return 1.0
+        return 1.0 - penalty
 
     tokens = query_norm.split()
     if tokens:
@@ -41,41 +69,182 @@ def _score_title(query_norm: str, title_norm: str) -> float:
     ratio = sm.ratio()
 
     # Heuristic mix: works well for partial titles + small typos.
-    return max(0.55 * token_score + 0.45 * partial, 0.35 * ratio + 0.65 * partial)
+    return max(0.55 * token_score + 0.45 * partial, 0.35 * ratio + 0.65 * partial) - penalty
 
 
-def search_movies(df: pd.DataFrame, query: str, limit: int = 50) -> SearchResult:
-    raw = "" if query is None else str(query).strip()
-    q_norm = normalize_text(raw)
-    if len(q_norm) < 2 or df.empty:
-        return SearchResult(df=df.iloc[0:0].copy(), query=raw, query_norm=q_norm)
+def _max_by_position(positions: np.ndarray, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(positions, kind="stable")
+    positions, scores = positions[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+    return positions[starts], np.maximum.reduceat(scores, starts)
 
-    title_col = "title_search" if "title_search" in df.columns else "movie_title_clean"
-    titles = df[title_col].fillna("").astype(str)
 
+def _rank_matches(
+    df: pd.DataFrame, q_norm: str, limit: int, max_candidates: int | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """`(positions, scores)` of the `limit` best matches, best first."""
+    index = get_title_index(df)
+    fields = get_field_index(df)
     q_compact = _compact(q_norm)
     if len(q_compact) <= 3:
         # Very short queries: avoid overly fuzzy results.
-        title_compact = titles.str.replace(" ", "", regex=False)
-        mask = title_compact.str.contains(q_compact, na=False, regex=False)
-        out = df[mask].copy()
-        if out.empty:
-            return SearchResult(df=out, query=raw, query_norm=q_norm)
-        out["wf_search_score"] = 1.0
+        positions = index.containing(q_compact).astype(np.int64)
+        scores = np.ones(len(positions), dtype=float)
+        variants = [(q_norm, 0)]
     else:
-        scores = titles.map(lambda title: _score_title(q_norm, normalize_text(title)))
-        out = df[scores >= 0.42].copy()
-        if out.empty:
-            # Fallback: keep best candidates even below threshold.
-            out = df.copy()
-        out["wf_search_score"] = scores.loc[out.index].astype(float)
-
-    sort_cols: list[str] = ["wf_search_score"]
+        # Query as typed + typo-corrected query (scored with its edit distance).
+        variants = [(q_norm, 0)]
+        corrected, distance = get_spell_index(df).correct_query(q_norm)
+        if distance:
+            variants.append((corrected, distance))
+
+        positions = np.unique(np.concatenate([
+            index.shortlist(_compact(variant), max_candidates=max_candidates)
+            for variant, _ in variants
+        ]))
+        titles = index.titles
+        scores = np.fromiter(
+            (
+                max(_score_title(variant, titles[pos], distance) for variant, distance in variants)
+                for pos in positions.tolist()
+            ),
+            dtype=float,
+            count=len(positions),
+        )
+
+    # People / keyword matches ("nolan", "dicaprio"): best of title and fields.
+    for variant, distance in variants:
+        field_positions, field_scores = fields.scores(variant)
+        if field_positions.size:
+            positions, scores = _max_by_position(
+                np.concatenate([positions, field_positions]),
+                np.concatenate([scores, field_scores - _TYPO_PENALTY * distance]),
+            )
+
+    if len(q_compact) > 3:
+        keep = scores >= 0.42
+        if keep.any():
+            positions, scores = positions[keep], scores[keep]
+        # Otherwise: keep the best candidates even below threshold.
+
+    if positions.size == 0:
+        return positions, scores
+
+    ranked = pd.DataFrame({"wf_search_score": scores})
     for col in ("score_global", "popularity", "num_voted_users"):
-        if col in out.columns:
-            sort_cols.append(col)
+        if col in df.columns:
+            ranked[col] = df[col].to_numpy()[positions]
+    order = ranked.sort_values(
+        list(ranked.columns), ascending=[False] * len(ranked.columns), kind="stable"
+    ).index.to_numpy()[: int(limit)]
+    return positions[order], scores[order]
+
+
+class _SearchCache:
+    """Process-wide LRU of ranked `(positions, scores)` per query and catalog version."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[np.ndarray, np.ndarray] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: tuple[np.ndarray, np.ndarray]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_SEARCH_CACHE = _SearchCache(SEARCH_CACHE_SIZE)
+
+
+def search_cache_info() -> dict[str, int]:
+    """Hit / miss counters and size of the search results cache."""
+    return _SEARCH_CACHE.info()
+
+
+def clear_search_cache() -> None:
+    _SEARCH_CACHE.clear()
+
+
+def search_movies(
+    df: pd.DataFrame,
+    query: str,
+    limit: int = 50,
+    *,
+    max_candidates: int | None = SEARCH_MAX_CANDIDATES,
+) -> SearchResult:
+    """
+    Title / people / keyword search over the catalog frame `df`.
+
+    Candidates come from the trigram index of the catalog (built once per
+    catalog version); only those are fuzzy-scored. Director, actors, writers
+    and plot keywords are matched through the field postings of the catalog
+    and merged with the title score (best of both). `max_candidates` limits the
+    scoring to the titles sharing the most trigrams with the query (`None`:
+    score every title sharing at least one trigram).
+
+    Ranked positions are cached per `(query_norm, limit, catalog version)`:
+    repeated searches only gather the rows.
+    """
+    raw = "" if query is None else str(query).strip()
+    q_norm = normalize_text(raw)
+    if len(q_norm) < 2 or df.empty:
+        return SearchResult(df=df.iloc[0:0].copy(), query=raw, query_norm=q_norm)
+
+    key = (q_norm, int(limit), catalog_for(df).version, max_candidates)
+    entry = _SEARCH_CACHE.get(key)
+    if entry is None:
+        entry = _rank_matches(df, q_norm, int(limit), max_candidates)
+        _SEARCH_CACHE.put(key, entry)
+    positions, scores = entry
 
-    out = out.sort_values(sort_cols, ascending=[False] * len(sort_cols))
-    out = out.reset_index(drop=True).head(int(limit))
+    if positions.size == 0:
+        return SearchResult(df=df.iloc[0:0].copy(), query=raw, query_norm=q_norm)
+    out = df.iloc[positions].reset_index(drop=True)
+    out["wf_search_score"] = scores
     return SearchResult(df=out, query=raw, query_norm=q_norm)
 
+
+def suggest_movies(df: pd.DataFrame, prefix: str, limit: int = 10) -> list[Suggestion]:
+    """Type-ahead completions (titles and people), most popular first."""
+    if df.empty:
+        return []
+    return get_suggestion_index(df).suggest(normalize_text(prefix), limit=limit)
+
+
+def popular_suggestions(df: pd.DataFrame, limit: int) -> list[Suggestion]:
+    """The `limit` most popular titles and people (memoized per catalog version)."""
+    if df.empty:
+        return []
+    return catalog_for(df).derived(
+        ("search_popular", int(limit)), lambda: get_suggestion_index(df).popular(int(limit))
+    )
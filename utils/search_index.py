@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils.catalog import catalog_for
+from utils.text import normalize_text, normalize_text_series
+
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def _compact(text: str) -> str:
+    return (text or "").replace(" ", "")
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i: i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class TitleTrigramIndex:
+    """
+    Character-trigram inverted index over normalized titles (spaces removed).
+
+    `titles[i]` is the normalized title of row `i`; `postings[g]` holds the
+    sorted row positions whose compact title contains the trigram `g`.
+    """
+
+    titles: list[str]
+    compact_titles: pd.Series
+    postings: dict[str, np.ndarray]
+
+    def containing(self, fragment: str) -> np.ndarray:
+        """Row positions whose compact title contains `fragment` (sorted)."""
+        if len(fragment) == 3:
+            return self.postings.get(fragment, _EMPTY_POSITIONS)
+        mask = self.compact_titles.str.contains(fragment, na=False, regex=False).to_numpy()
+        return np.flatnonzero(mask)
+
+    def shortlist(self, query_compact: str, max_candidates: int | None = None) -> np.ndarray:
+        """
+        Rows sharing at least one trigram with the query, best overlap first.
+
+        With `max_candidates`, only the top-N rows by shared trigrams are kept,
+        so the cost of the fuzzy scoring stage does not grow with the catalog.
+        """
+        lists = [self.postings[g] for g in _trigrams(query_compact) if g in self.postings]
+        if not lists:
+            return _EMPTY_POSITIONS
+        rows, counts = np.unique(np.concatenate(lists), return_counts=True)
+        if max_candidates is not None and rows.size > int(max_candidates):
+            top = np.argpartition(-counts, int(max_candidates) - 1)[: int(max_candidates)]
+            rows, counts = rows[top], counts[top]
+        order = np.lexsort((rows, -counts))
+        return rows[order].astype(np.int64)
+
+
+def _title_norms(df: pd.DataFrame) -> list[str]:
+    if "title_search" in df.columns:
+        return df["title_search"].fillna("").astype(str).tolist()
+    if "movie_title_clean" in df.columns:
+        return normalize_text_series(df["movie_title_clean"].fillna("")).tolist()
+    if "movie_title" in df.columns:
+        return normalize_text_series(df["movie_title"].fillna("")).tolist()
+    return [""] * len(df)
+
+
+def build_title_index(df: pd.DataFrame) -> TitleTrigramIndex:
+    titles = _title_norms(df)
+    postings_lists: dict[str, list[int]] = {}
+    for pos, title in enumerate(titles):
+        for gram in _trigrams(_compact(title)):
+            postings_lists.setdefault(gram, []).append(pos)
+
+    return TitleTrigramIndex(
+        titles=titles,
+        compact_titles=pd.Series([_compact(t) for t in titles], dtype=object),
+        postings={g: np.asarray(p, dtype=np.int32) for g, p in postings_lists.items()},
+    )
+
+
+def get_title_index(df: pd.DataFrame) -> TitleTrigramIndex:
+    """`build_title_index` memoized per catalog version."""
+    return catalog_for(df).derived("title_trigrams", lambda: build_title_index(df))
+
+
+# Per-field weight of a full match (every query token found in the field).
+SEARCH_FIELD_WEIGHTS: dict[str, float] = {
+    "director_name": 0.9,
+    "actor_1_name": 0.85,
+    "actor_2_name": 0.8,
+    "actor_3_name": 0.75,
+    "Writer": 0.7,
+    "plot_keywords_final": 0.6,
+}
+
+# Separators of multi-valued fields (several writers, keyword lists).
+_FIELD_SEPARATORS: dict[str, str] = {
+    "Writer": ",",
+    "plot_keywords_final": "|",
+}
+
+
+@dataclass(frozen=True)
+class FieldIndex:
+    """
+    Token postings over people / keyword columns.
+
+    `postings[token]` is a `(rows, field_ids)` pair of int32 arrays: one entry
+    per (row, field) whose normalized value contains `token`.
+    """
+
+    fields: tuple[str, ...]
+    weights: np.ndarray
+    postings: dict[str, tuple[np.ndarray, np.ndarray]]
+
+    def scores(self, query_norm: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        `(positions, scores)` of the rows matching the query in any field.
+
+        A field scores `weight * matched_tokens / query_tokens`; rows keep their
+        best field. Fields matching less than half of the query are ignored.
+        """
+        tokens = sorted(set(query_norm.split()))
+        hits = [self.postings[tok] for tok in tokens if tok in self.postings]
+        if not hits:
+            return _EMPTY_POSITIONS, np.empty(0, dtype=float)
+
+        n_fields = len(self.fields)
+        keys = np.concatenate(
+            [rows.astype(np.int64) * n_fields + field_ids for rows, field_ids in hits]
+        )
+        pairs, counts = np.unique(keys, return_counts=True)
+        coverage = counts / len(tokens)
+        keep = coverage >= 0.5
+        pairs, coverage = pairs[keep], coverage[keep]
+        if pairs.size == 0:
+            return _EMPTY_POSITIONS, np.empty(0, dtype=float)
+
+        rows = pairs // n_fields
+        field_scores = self.weights[pairs % n_fields] * coverage
+        # `pairs` is sorted, so every row is a contiguous run.
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        return rows[starts], np.maximum.reduceat(field_scores, starts)
+
+
+def _field_values(value: object, separator: str | None) -> list[str]:
+    if value is None or pd.isna(value):
+        return []
+    text = str(value)
+    parts = text.split(separator) if separator else [text]
+    return [p for p in (part.strip() for part in parts) if p]
+
+
+def build_field_index(df: pd.DataFrame, weights: dict[str, float] | None = None) -> FieldIndex:
+    weights = SEARCH_FIELD_WEIGHTS if weights is None else weights
+    fields = tuple(f for f in weights if f in df.columns)
+
+    cache: dict[str, tuple[str, ...]] = {}
+    postings_lists: dict[str, tuple[list[int], list[int]]] = {}
+    for field_id, field in enumerate(fields):
+        separator = _FIELD_SEPARATORS.get(field)
+        for pos, value in enumerate(df[field].tolist()):
+            row_tokens: set[str] = set()
+            for part in _field_values(value, separator):
+                tokens = cache.get(part)
+                if tokens is None:
+                    tokens = tuple(normalize_text(part).split())
+                    cache[part] = tokens
+                row_tokens.update(tokens)
+            for tok in row_tokens:
+                rows, field_ids = postings_lists.setdefault(tok, ([], []))
+                rows.append(pos)
+                field_ids.append(field_id)
+
+    return FieldIndex(
+        fields=fields,
+        weights=np.asarray([float(weights[f]) for f in fields], dtype=float),
+        postings={
+            tok: (np.asarray(rows, dtype=np.int32), np.asarray(field_ids, dtype=np.int32))
+            for tok, (rows, field_ids) in postings_lists.items()
+        },
+    )
+
+
+def get_field_index(df: pd.DataFrame) -> FieldIndex:
+    """`build_field_index` (default weights) memoized per catalog version."""
+    return catalog_for(df).derived("search_fields", lambda: build_field_index(df))
+
+
+# People columns offered as completions (besides titles).
+_SUGGESTION_PEOPLE_COLUMNS = ("director_name", "actor_1_name", "actor_2_name", "actor_3_name")
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    label: str
+    kind: str  # "title" | "person"
+    position: int  # row position for titles, -1 for people
+
+
+@dataclass(frozen=True)
+class SuggestionIndex:
+    """
+    Sorted prefix keys (bisect) over normalized titles and people names.
+
+    Every title / name is indexed from each of its words ("dark knight" finds
+    "The Dark Knight"); `keys[i]` points to entry `entry_ids[i]` with a ranking
+    weight `weights[i]` (popularity, halved when the key starts mid-text).
+    """
+
+    keys: list[str]
+    entry_ids: np.ndarray
+    weights: np.ndarray
+    labels: list[str]
+    kinds: list[str]
+    positions: np.ndarray
+
+    def suggest(self, prefix_norm: str, limit: int = 10) -> list[Suggestion]:
+        if not prefix_norm or limit <= 0:
+            return []
+        lo = bisect_left(self.keys, prefix_norm)
+        hi = bisect_left(self.keys, prefix_norm + "\uffff", lo)
+        if hi <= lo:
+            return []
+
+        weights = self.weights[lo:hi]
+        # An entry can match through several of its words: over-fetch, then dedupe.
+        top = min(hi - lo, 4 * int(limit))
+        best = np.argpartition(-weights, top - 1)[:top] if top < hi - lo else np.arange(hi - lo)
+        best = best[np.lexsort((self.entry_ids[lo:hi][best], -weights[best]))]
+
+        out: list[Suggestion] = []
+        seen: set[int] = set()
+        for entry_id in self.entry_ids[lo:hi][best].tolist():
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            out.append(
+                Suggestion(
+                    label=self.labels[entry_id],
+                    kind=self.kinds[entry_id],
+                    position=int(self.positions[entry_id]),
+                )
+            )
+            if len(out) >= limit:
+                break
+        return out
+
+    def popular(self, limit: int) -> list[Suggestion]:
+        """The `limit` most popular entries (their full-text key weight)."""
+        if limit <= 0 or not self.labels:
+            return []
+        best = np.zeros(len(self.labels), dtype=float)
+        np.maximum.at(best, self.entry_ids, self.weights)
+        order = np.argsort(-best, kind="stable")[: int(limit)]
+        return [
+            Suggestion(label=self.labels[i], kind=self.kinds[i], position=int(self.positions[i]))
+            for i in order.tolist()
+        ]
+
+
+def _popularity(df: pd.DataFrame) -> np.ndarray:
+    for col in ("popularity", "num_voted_users"):
+        if col in df.columns:
+            return pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    return np.zeros(len(df), dtype=float)
+
+
+def _word_suffixes(text_norm: str) -> list[str]:
+    words = text_norm.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def build_suggestion_index(df: pd.DataFrame) -> SuggestionIndex:
+    popularity = _popularity(df)
+    label_col = "movie_title_clean" if "movie_title_clean" in df.columns else "movie_title"
+    labels = (
+        df[label_col].fillna("").astype(str).str.strip().tolist()
+        if label_col in df.columns
+        else [""] * len(df)
+    )
+
+    # (label, kind, position, popularity, normalized text)
+    entries: list[tuple[str, str, int, float, str]] = []
+    for pos, (label, title_norm) in enumerate(zip(labels, _title_norms(df))):
+        if title_norm:
+            entries.append((label, "title", pos, float(popularity[pos]), title_norm))
+
+    # People rank like their most popular film.
+    people: dict[str, float] = {}
+    for col in _SUGGESTION_PEOPLE_COLUMNS:
+        if col not in df.columns:
+            continue
+        for pos, name in enumerate(df[col].tolist()):
+            if name is None or pd.isna(name) or not str(name).strip():
+                continue
+            name = str(name).strip()
+            people[name] = max(people.get(name, 0.0), float(popularity[pos]))
+    names = list(people)
+    for name, name_norm in zip(names, normalize_text_series(names).tolist()):
+        score = people[name]
+        if name_norm:
+            entries.append((name, "person", -1, score, name_norm))
+
+    triples = sorted(
+        (key, entry_id, entry[3] if i == 0 else 0.5 * entry[3])
+        for entry_id, entry in enumerate(entries)
+        for i, key in enumerate(_word_suffixes(entry[4]))
+    )
+    return SuggestionIndex(
+        keys=[key for key, _, _ in triples],
+        entry_ids=np.asarray([entry_id for _, entry_id, _ in triples], dtype=np.int32),
+        weights=np.asarray([weight for _, _, weight in triples], dtype=float),
+        labels=[e[0] for e in entries],
+        kinds=[e[1] for e in entries],
+        positions=np.asarray([e[2] for e in entries], dtype=np.int64),
+    )
+
+
+def get_suggestion_index(df: pd.DataFrame) -> SuggestionIndex:
+    """`build_suggestion_index` memoized per catalog version."""
+    return catalog_for(df).derived("search_suggestions", lambda: build_suggestion_index(df))
@@ -7,10 +7,16 @@ from typing import Any
 
 SETTINGS_PATH = Path(__file__).resolve().parent.parent / "data" / "settings.json"
 
-VALID_RECO_MODELS = {"cosine", "euclidean", "manhattan"}
+VALID_RECO_MODELS = {"cosine", "euclidean", "manhattan", "ann"}
+# Models backed by a pickled sklearn `ml/KNN_<model>.pkl` ("ann" is an offline index).
+KNN_RECO_MODELS = {"cosine", "euclidean", "manhattan"}
+VALID_RECO_CACHE_BACKENDS = {"memory", "sqlite", "mysql"}
+VALID_RECO_AGGREGATIONS = {"max", "sum", "mean", "rrf", "recency"}
 
 DEFAULT_SETTINGS: dict[str, Any] = {
     "recommender_model": "cosine",
+    "reco_cache_backend": "memory",
+    "reco_aggregation": "max",
 }
 
 
@@ -58,3 +64,21 @@ def set_recommender_model(model: str) -> None:
     settings["recommender_model"] = model
     save_settings(settings)
 
+
+def get_reco_cache_backend() -> str:
+    backend = str(load_settings().get("reco_cache_backend", "memory")).strip().lower()
+    return backend if backend in VALID_RECO_CACHE_BACKENDS else "memory"
+
+
+def get_reco_aggregation() -> str:
+    aggregation = str(load_settings().get("reco_aggregation", "max")).strip().lower()
+    return aggregation if aggregation in VALID_RECO_AGGREGATIONS else "max"
+
+
+def set_reco_aggregation(aggregation: str) -> None:
+    aggregation = str(aggregation).strip().lower()
+    if aggregation not in VALID_RECO_AGGREGATIONS:
+        aggregation = "max"
+    settings = load_settings()
+    settings["reco_aggregation"] = aggregation
+    save_settings(settings)
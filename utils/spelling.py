@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import pandas as pd
+
+from utils.catalog import catalog_for
+from utils.text import normalize_text_series
+
+
+# Only the first letters of a word are expanded into deletes (SymSpell's
+# "prefix length"): keeps the index small, candidates are verified in full.
+_PREFIX_LENGTH = 7
+_MAX_EDIT_DISTANCE = 2
+# Shorter words are too ambiguous to be corrected.
+_MIN_WORD_LENGTH = 4
+
+_PEOPLE_COLUMNS = ("director_name", "actor_1_name", "actor_2_name", "actor_3_name")
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment) between `a` and `b`.
+
+    Returns `max_distance + 1` as soon as the distance is known to exceed it.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    prev_prev: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    out = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def _max_distance_for(word: str) -> int:
+    return 1 if len(word) <= 5 else _MAX_EDIT_DISTANCE
+
+
+@dataclass(frozen=True)
+class Correction:
+    word: str
+    distance: int
+
+
+@dataclass(frozen=True)
+class SpellIndex:
+    """
+    Symmetric-delete index (SymSpell) over the words of titles and people names.
+
+    `deletes[d]` lists the vocabulary words whose prefix gives `d` after up to
+    `_MAX_EDIT_DISTANCE` deletions; `counts[w]` is the frequency of word `w`
+    (titles + names), `title_counts[w]` its frequency in titles and
+    `documents[w]` the titles / names (ids) containing it.
+    """
+
+    counts: dict[str, int]
+    deletes: dict[str, tuple[str, ...]]
+    title_counts: dict[str, int]
+    documents: dict[str, frozenset[int]]
+
+    def correct(self, word: str, context: Iterable[str] = ()) -> Correction:
+        """
+        Closest known word: smallest distance, then the candidate sharing most
+        titles / names with the `context` words (the rest of the query), then
+        the most frequent in titles, then overall (names only break that tie).
+        """
+        if word in self.counts or len(word) < _MIN_WORD_LENGTH or not word.isalpha():
+            return Correction(word=word, distance=0)
+
+        context_docs: set[int] = set()
+        for other in context:
+            context_docs.update(self.documents.get(other, ()))
+
+        max_distance = _max_distance_for(word)
+        best: Correction | None = None
+        best_rank: tuple = ()
+        seen: set[str] = set()
+        for variant in _deletes(word[:_PREFIX_LENGTH], max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                shared = len(self.documents.get(candidate, frozenset()) & context_docs) if context_docs else 0
+                rank = (
+                    distance,
+                    -shared,
+                    -self.title_counts.get(candidate, 0),
+                    -self.counts[candidate],
+                    candidate,
+                )
+                if best is None or rank < best_rank:
+                    best, best_rank = Correction(word=candidate, distance=distance), rank
+        return best or Correction(word=word, distance=0)
+
+    def correct_query(self, query_norm: str) -> tuple[str, int]:
+        """Corrected query and the summed edit distance of its corrections."""
+        query_words = query_norm.split()
+        known = [word in self.counts for word in query_words]
+        words: list[str] = []
+        total = 0
+        for i, word in enumerate(query_words):
+            context = [w for j, w in enumerate(query_words) if j != i and known[j]]
+            correction = self.correct(word, context)
+            words.append(correction.word)
+            total += correction.distance
+        return " ".join(words), total
+
+
+def _vocabulary(df: pd.DataFrame) -> tuple[dict[str, int], dict[str, int], dict[str, frozenset[int]]]:
+    """(word counts over titles and names, over titles only, title / name ids of each word)."""
+    counts: dict[str, int] = {}
+    if "title_search" in df.columns:
+        titles = df["title_search"].fillna("").astype(str).tolist()
+    elif "movie_title_clean" in df.columns:
+        titles = normalize_text_series(df["movie_title_clean"].fillna("")).tolist()
+    elif "movie_title" in df.columns:
+        titles = normalize_text_series(df["movie_title"].fillna("")).tolist()
+    else:
+        titles = []
+    documents: dict[str, set[int]] = {}
+    for doc, title in enumerate(titles):
+        for word in title.split():
+            counts[word] = counts.get(word, 0) + 1
+            documents.setdefault(word, set()).add(doc)
+    title_counts = dict(counts)
+
+    names: set[str] = set()
+    for col in _PEOPLE_COLUMNS:
+        if col in df.columns:
+            names.update(str(v) for v in df[col].dropna().tolist())
+    for doc, name_norm in enumerate(normalize_text_series(sorted(names)).tolist(), start=len(titles)):
+        for word in name_norm.split():
+            counts[word] = counts.get(word, 0) + 1
+            documents.setdefault(word, set()).add(doc)
+    return counts, title_counts, {word: frozenset(docs) for word, docs in documents.items()}
+
+
+def build_spell_index(df: pd.DataFrame) -> SpellIndex:
+    counts, title_counts, documents = _vocabulary(df)
+    deletes: dict[str, list[str]] = {}
+    for word in counts:
+        if len(word) < _MIN_WORD_LENGTH - _MAX_EDIT_DISTANCE or not word.isalpha():
+            continue
+        for variant in _deletes(word[:_PREFIX_LENGTH], _MAX_EDIT_DISTANCE):
+            deletes.setdefault(variant, []).append(word)
+    return SpellIndex(
+        counts=counts,
+        deletes={variant: tuple(words) for variant, words in deletes.items()},
+        title_counts=title_counts,
+        documents=documents,
+    )
+
+
+def get_spell_index(df: pd.DataFrame) -> SpellIndex:
+    """`build_spell_index` memoized per catalog version."""
+    return catalog_for(df).derived("spelling", lambda: build_spell_index(df))
@@ -1,6 +1,9 @@
 import re
 import unicodedata
 
+import numpy as np
+import pandas as pd
+
 
 def normalize_text(value: str | None) -> str:
     text = "" if value is None else str(value)
@@ -12,6 +15,44 @@ def normalize_text(value: str | None) -> str:
     return text
 
 
+def normalize_text_series(values) -> pd.Series:
+    """
+    Column-level `normalize_text`: same output, computed once per distinct
+    value with pandas `.str` operations.
+
+    Accepts a Series (its index is kept), an array or any iterable.
+    """
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values if isinstance(values, np.ndarray) else list(values), dtype=object)
+    if values.empty:
+        return pd.Series([], index=values.index, dtype=object)
+
+    # Same str() conversion as `normalize_text` (None -> "", NaN -> "nan").
+    texts = ["" if v is None else str(v) for v in values.tolist()]
+    # Distinct values via a dict, not `pd.factorize`: pandas hashes object
+    # strings as C strings, which merges values differing after a NUL or
+    # around lone surrogates.
+    positions: dict[str, int] = {}
+    codes = np.fromiter(
+        (positions.setdefault(text, len(positions)) for text in texts), dtype=np.intp, count=len(texts)
+    )
+    raw = pd.Series(list(positions), dtype=object)
+    decomposed = raw.str.strip().str.lower().str.normalize("NFKD")
+    # str.translate table dropping the combining marks (accents after NFKD)
+    # that actually occur: scanning the whole Unicode range costs ~90 ms.
+    marks = {
+        ord(ch): None
+        for ch in set("".join(decomposed.tolist()))
+        if not ch.isascii() and unicodedata.combining(ch)
+    }
+    normalized = (
+        decomposed.str.translate(marks)
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+    return pd.Series(normalized.to_numpy()[codes], index=values.index, dtype=object)
+
+
 def slugify(value: str) -> str:
     import re
     value = (value or "").strip().lower()
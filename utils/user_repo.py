@@ -1,25 +1,50 @@
 from __future__ import annotations
 
-from typing import Any
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 from utils.mysql_store import (
+    add_favorite as mysql_add_favorite,
     create_user as mysql_create_user,
-    get_favorites as mysql_get_favorites,
+    get_favorite_dates as mysql_get_favorite_dates,
     get_user_by_email as mysql_get_user_by_email,
+    get_user_with_favorites as mysql_get_user_with_favorites,
     ensure_schema as mysql_ensure_schema,
     is_mysql_ready,
+    remove_favorite as mysql_remove_favorite,
     set_favorites as mysql_set_favorites,
     update_email as mysql_update_email,
     update_optional_fields as mysql_update_optional_fields,
     update_password as mysql_update_password,
     update_pseudo as mysql_update_pseudo,
 )
-from utils.user_store import load_users, save_users, set_password, verify_password
+from utils.user_store import (
+    add_favorite as local_add_favorite,
+    create_user as local_create_user,
+    get_favorite_dates as local_get_favorite_dates,
+    get_user as local_get_user,
+    remove_favorite as local_remove_favorite,
+    set_favorites as local_set_favorites,
+    set_password,
+    update_user as local_update_user,
+    verify_password,
+)
 
 
 _MYSQL_AVAILABLE: bool | None = None
 _UNSET = object()
 
+# Per-process cache of `get_user` results (login, token auto-login, profile
+# page). Writers below invalidate it; other processes see changes after the TTL.
+USER_CACHE_TTL = 30.0
+_USER_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+_USER_CACHE_LOCK = threading.Lock()
+# Bumped by every invalidation: a fetch that overlapped a write is not cached.
+_USER_CACHE_GENERATION = 0
+
 
 def _is_mysql_available() -> bool:
     global _MYSQL_AVAILABLE
@@ -43,16 +68,57 @@ def backend_name() -> str:
     return "mysql" if _is_mysql_available() else "local"
 
 
+def invalidate_user_cache(*emails: str) -> None:
+    """Drops the cached users for `emails` (all of them when called without argument)."""
+    global _USER_CACHE_GENERATION
+    with _USER_CACHE_LOCK:
+        _USER_CACHE_GENERATION += 1
+        if not emails:
+            _USER_CACHE.clear()
+            return
+        for email in emails:
+            _USER_CACHE.pop(str(email).strip().lower(), None)
+
+
+@contextmanager
+def _invalidating(*emails: str) -> Iterator[None]:
+    """Invalidates `emails` once the write in the block is done (even if it fails)."""
+    try:
+        yield
+    finally:
+        invalidate_user_cache(*emails)
+
+
+def _copy_user(user: dict[str, Any]) -> dict[str, Any]:
+    return {**user, "favorites": list(user.get("favorites", []))}
+
+
 def get_user(email: str) -> dict[str, Any] | None:
     email = str(email).strip().lower()
     if not email:
         return None
 
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        cached = _USER_CACHE.get(email)
+        generation = _USER_CACHE_GENERATION
+    if cached is not None and cached[0] > now:
+        return _copy_user(cached[1])
+
+    user = _fetch_user(email)
+    # Misses are not cached: a freshly created account must be visible at once.
+    if user is not None:
+        with _USER_CACHE_LOCK:
+            if generation == _USER_CACHE_GENERATION:
+                _USER_CACHE[email] = (now + USER_CACHE_TTL, _copy_user(user))
+    return user
+
+
+def _fetch_user(email: str) -> dict[str, Any] | None:
     if backend_name() == "mysql":
-        user = mysql_get_user_by_email(email)
+        user, favorites = mysql_get_user_with_favorites(email)
         if not user:
             return None
-        favorites = mysql_get_favorites(int(user["id"]))
         date_of_birth_raw = user.get("date_of_birth")
         if date_of_birth_raw is None:
             date_of_birth = None
@@ -85,12 +151,11 @@ def get_user(email: str) -> dict[str, Any] | None:
             "cinema_last_12m": cinema_last_12m,
         }
 
-    users = load_users()
-    u = users.get(email)
+    u = local_get_user(email)
     if not u:
         return None
     return {
-        "id": None,
+        "id": u.get("id"),
         "email": email,
         "pseudo": u.get("pseudo") or email.split("@")[0],
         "role": u.get("role") or "user",
@@ -128,58 +193,103 @@ def create_user(
     if len(password) < 4:
         return False, "Mot de passe trop court."
 
-    if backend_name() == "mysql":
-        user_tmp = {}
-        set_password(user_tmp, password)
-        return mysql_create_user(
-            email=email,
-            pseudo=pseudo,
-            role=role,
-            salt=str(user_tmp["salt"]),
-            password_hash=str(user_tmp["password_hash"]),
-            date_of_birth=date_of_birth,
-            gender=gender,
-            in_creuse=in_creuse,
-            cinema_last_12m=cinema_last_12m,
-        )
-
-    users = load_users()
-    if email in users:
-        return False, "Cet email est deja utilise."
-
-    user = {
-        "role": role,
-        "pseudo": pseudo,
-        "favorites": [],
-        "date_of_birth": date_of_birth,
-        "gender": gender,
-        "in_creuse": in_creuse,
-        "cinema_last_12m": cinema_last_12m,
-    }
-    set_password(user, password)
-    users[email] = user
-    save_users(users)
-    return True, "Compte cree."
+    with _invalidating(email):
+        if backend_name() == "mysql":
+            user_tmp = {}
+            set_password(user_tmp, password)
+            return mysql_create_user(
+                email=email,
+                pseudo=pseudo,
+                role=role,
+                salt=str(user_tmp["salt"]),
+                password_hash=str(user_tmp["password_hash"]),
+                date_of_birth=date_of_birth,
+                gender=gender,
+                in_creuse=in_creuse,
+                cinema_last_12m=cinema_last_12m,
+            )
+
+        user = {
+            "role": role,
+            "pseudo": pseudo,
+            "date_of_birth": date_of_birth,
+            "gender": gender,
+            "in_creuse": in_creuse,
+            "cinema_last_12m": cinema_last_12m,
+        }
+        set_password(user, password)
+        if not local_create_user(email, user):
+            return False, "Cet email est deja utilise."
+        return True, "Compte cree."
 
 
-def save_favorites(email: str, favorites: set[str]) -> None:
+def _mysql_user_id(email: str, user_id: int | None) -> int | None:
+    """`user_id` as known by the session, else looked up (through the user cache)."""
+    if user_id is not None:
+        return int(user_id)
+    user = get_user(email)
+    return None if not user or user.get("id") is None else int(user["id"])
+
+
+def save_favorites(email: str, favorites: set[str], user_id: int | None = None) -> None:
+    """Replaces the whole favorite set (only the differing rows are written)."""
     email = str(email).strip().lower()
     if not email:
         return
 
-    if backend_name() == "mysql":
-        user = mysql_get_user_by_email(email)
-        if not user:
+    with _invalidating(email):
+        if backend_name() == "mysql":
+            user_id = _mysql_user_id(email, user_id)
+            if user_id is None:
+                return
+            mysql_set_favorites(user_id, set(map(str, favorites)))
             return
-        mysql_set_favorites(int(user["id"]), set(map(str, favorites)))
+
+        local_set_favorites(email, set(map(str, favorites)))
+
+
+def add_favorite(email: str, imdb_key: str, user_id: int | None = None) -> None:
+    """Persists one added favorite (`user_id` from the session saves the user lookup)."""
+    email = str(email).strip().lower()
+    if not email:
         return
 
-    users = load_users()
-    u = users.get(email)
-    if not u:
+    with _invalidating(email):
+        if backend_name() == "mysql":
+            user_id = _mysql_user_id(email, user_id)
+            if user_id is not None:
+                mysql_add_favorite(user_id, str(imdb_key))
+            return
+        local_add_favorite(email, str(imdb_key))
+
+
+def remove_favorite(email: str, imdb_key: str, user_id: int | None = None) -> None:
+    """Persists one removed favorite (`user_id` from the session saves the user lookup)."""
+    email = str(email).strip().lower()
+    if not email:
         return
-    u["favorites"] = sorted(set(map(str, favorites)))
-    save_users(users)
+
+    with _invalidating(email):
+        if backend_name() == "mysql":
+            user_id = _mysql_user_id(email, user_id)
+            if user_id is not None:
+                mysql_remove_favorite(user_id, str(imdb_key))
+            return
+        local_remove_favorite(email, str(imdb_key))
+
+
+def get_favorite_dates(email: str, user_id: int | None = None) -> dict[str, Any]:
+    """imdb_key -> date the favorite was added (`user_id` from the session saves the user lookup)."""
+    email = str(email).strip().lower()
+    if not email:
+        return {}
+    if backend_name() != "mysql":
+        return local_get_favorite_dates(email)
+
+    user_id = _mysql_user_id(email, user_id)
+    if user_id is None:
+        return {}
+    return mysql_get_favorite_dates(user_id)
 
 
 def update_profile(
@@ -202,66 +312,65 @@ def update_profile(
             return False, "Email invalide.", current_email
         next_email = cleaned
 
-    if backend_name() == "mysql":
-        user = mysql_get_user_by_email(current_email)
-        if not user:
-            return False, "Utilisateur introuvable.", current_email
-
-        user_id = int(user["id"])
+    with _invalidating(current_email, next_email):
+        if backend_name() == "mysql":
+            user = mysql_get_user_by_email(current_email)
+            if not user:
+                return False, "Utilisateur introuvable.", current_email
+
+            user_id = int(user["id"])
+            if next_email != current_email:
+                ok, msg = mysql_update_email(user_id, next_email)
+                if not ok:
+                    return False, msg, current_email
+
+            if new_pseudo is not None:
+                pseudo = str(new_pseudo).strip()
+                if pseudo:
+                    mysql_update_pseudo(user_id, pseudo)
+
+            extra_updates: dict[str, Any] = {}
+            if date_of_birth is not _UNSET:
+                extra_updates["date_of_birth"] = date_of_birth
+            if gender is not _UNSET:
+                extra_updates["gender"] = gender
+            if in_creuse is not _UNSET:
+                extra_updates["in_creuse"] = in_creuse
+            if cinema_last_12m is not _UNSET:
+                extra_updates["cinema_last_12m"] = cinema_last_12m
+
+            if extra_updates:
+                ok, msg = mysql_update_optional_fields(user_id, **extra_updates)
+                if not ok:
+                    return False, msg, next_email
+
+            return True, "Profil mis a jour.", next_email
+
+        fields: dict[str, Any] = {}
         if next_email != current_email:
-            ok, msg = mysql_update_email(user_id, next_email)
-            if not ok:
-                return False, msg, current_email
+            fields["email"] = next_email
 
         if new_pseudo is not None:
             pseudo = str(new_pseudo).strip()
             if pseudo:
-                mysql_update_pseudo(user_id, pseudo)
+                fields["pseudo"] = pseudo
 
-        extra_updates: dict[str, Any] = {}
         if date_of_birth is not _UNSET:
-            extra_updates["date_of_birth"] = date_of_birth
+            fields["date_of_birth"] = date_of_birth
         if gender is not _UNSET:
-            extra_updates["gender"] = gender
+            fields["gender"] = gender
         if in_creuse is not _UNSET:
-            extra_updates["in_creuse"] = in_creuse
+            fields["in_creuse"] = in_creuse
         if cinema_last_12m is not _UNSET:
-            extra_updates["cinema_last_12m"] = cinema_last_12m
+            fields["cinema_last_12m"] = cinema_last_12m
 
-        if extra_updates:
-            ok, msg = mysql_update_optional_fields(user_id, **extra_updates)
-            if not ok:
-                return False, msg, next_email
-
-        return True, "Profil mis a jour.", next_email
-
-    users = load_users()
-    user = users.get(current_email)
-    if user is None:
-        return False, "Utilisateur introuvable.", current_email
-
-    if next_email != current_email:
-        if next_email in users:
+        try:
+            found = local_update_user(current_email, fields)
+        except sqlite3.IntegrityError:
             return False, "Cet email est deja utilise.", current_email
-        users[next_email] = user
-        del users[current_email]
-
-    if new_pseudo is not None:
-        pseudo = str(new_pseudo).strip()
-        if pseudo:
-            user["pseudo"] = pseudo
-
-    if date_of_birth is not _UNSET:
-        user["date_of_birth"] = date_of_birth
-    if gender is not _UNSET:
-        user["gender"] = gender
-    if in_creuse is not _UNSET:
-        user["in_creuse"] = in_creuse
-    if cinema_last_12m is not _UNSET:
-        user["cinema_last_12m"] = cinema_last_12m
-
-    save_users(users)
-    return True, "Profil mis a jour.", next_email
+        if not found:
+            return False, "Utilisateur introuvable.", current_email
+        return True, "Profil mis a jour.", next_email
 
 
 def update_user_password(email: str, new_password: str) -> tuple[bool, str]:
@@ -270,18 +379,17 @@ def update_user_password(email: str, new_password: str) -> tuple[bool, str]:
     if len(new_password) < 4:
         return False, "Mot de passe trop court."
 
-    if backend_name() == "mysql":
-        user = mysql_get_user_by_email(email)
-        if not user:
-            return False, "Utilisateur introuvable."
+    with _invalidating(email):
+        if backend_name() == "mysql":
+            user = mysql_get_user_by_email(email)
+            if not user:
+                return False, "Utilisateur introuvable."
+            tmp = {}
+            set_password(tmp, new_password)
+            return mysql_update_password(int(user["id"]), str(tmp["salt"]), str(tmp["password_hash"]))
+
         tmp = {}
         set_password(tmp, new_password)
-        return mysql_update_password(int(user["id"]), str(tmp["salt"]), str(tmp["password_hash"]))
-
-    users = load_users()
-    u = users.get(email)
-    if u is None:
-        return False, "Utilisateur introuvable."
-    set_password(u, new_password)
-    save_users(users)
-    return True, "Mot de passe mis a jour."
+        if not local_update_user(email, {"salt": tmp["salt"], "password_hash": tmp["password_hash"]}):
+            return False, "Utilisateur introuvable."
+        return True, "Mot de passe mis a jour."
@@ -1,12 +1,20 @@
+from __future__ import annotations
+
 import base64
 import hashlib
 import json
 import os
 import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DB_PATH = DATA_DIR / "users.sqlite"
+# Legacy whole-file store: imported into `DB_PATH` when the database is created.
 USERS_PATH = DATA_DIR / "users.json"
 
 
@@ -39,38 +47,327 @@ def _hash_password(password: str, salt_b64: str | None = None) -> tuple[str, str
     return salt_b64, digest_b64
 
 
-def _ensure_user_store():
-    if USERS_PATH.exists():
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      email TEXT NOT NULL UNIQUE,
+      pseudo TEXT NOT NULL,
+      role TEXT NOT NULL DEFAULT 'user',
+      salt TEXT NOT NULL,
+      password_hash TEXT NOT NULL,
+      date_of_birth TEXT NULL,
+      gender TEXT NULL,
+      in_creuse INTEGER NULL,
+      cinema_last_12m INTEGER NULL,
+      created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS favorites (
+      user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      imdb_key TEXT NOT NULL,
+      created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (user_id, imdb_key)
+    )
+    """,
+    # One-shot markers (e.g. `users.json` already imported).
+    "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+_USER_COLUMNS = (
+    "pseudo",
+    "role",
+    "salt",
+    "password_hash",
+    "date_of_birth",
+    "gender",
+    "in_creuse",
+    "cinema_last_12m",
+)
+_BOOL_COLUMNS = ("in_creuse", "cinema_last_12m")
+
+_INIT_LOCK = threading.Lock()
+_INITIALIZED: set[Path] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    # Autocommit mode: transactions are opened explicitly by `_transaction`.
+    conn = sqlite3.connect(DB_PATH, timeout=10.0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+@contextmanager
+def _transaction(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Connection inside one transaction (BEGIN IMMEDIATE for writes: one writer at a time)."""
+    _ensure_user_store()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _ensure_user_store() -> None:
+    """Creates `users.sqlite` once per process; a new store imports `users.json` (or the seeds)."""
+    if DB_PATH in _INITIALIZED:
         return
+    with _INIT_LOCK:
+        if DB_PATH in _INITIALIZED:
+            return
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            initialized = conn.execute("SELECT 1 FROM store_meta WHERE key='initialized'").fetchone()
+            if initialized is None:
+                if USERS_PATH.exists():
+                    _import_json(conn, json.loads(USERS_PATH.read_text(encoding="utf-8")))
+                else:
+                    _seed_users(conn)
+                conn.execute("INSERT INTO store_meta (key, value) VALUES ('initialized', CURRENT_TIMESTAMP)")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        _INITIALIZED.add(DB_PATH)
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    users: dict[str, dict] = {}
+def _seed_users(conn: sqlite3.Connection) -> None:
     for email, info in SEED_USERS.items():
         salt_b64, digest_b64 = _hash_password(str(info["password"]))
-        users[str(email).strip().lower()] = {
-            "role": info.get("role", "user"),
-            "pseudo": info.get("pseudo", str(email).split("@")[0]),
-            "salt": salt_b64,
-            "password_hash": digest_b64,
-            "favorites": [],
-            "date_of_birth": None,
-            "gender": None,
-            "in_creuse": None,
-            "cinema_last_12m": None,
-        }
+        _insert_user(
+            conn,
+            str(email).strip().lower(),
+            {
+                "role": info.get("role", "user"),
+                "pseudo": info.get("pseudo", str(email).split("@")[0]),
+                "salt": salt_b64,
+                "password_hash": digest_b64,
+            },
+        )
+
+
+def _to_db(column: str, value: Any) -> Any:
+    if column in _BOOL_COLUMNS and value is not None:
+        return int(bool(value))
+    return value
+
+
+def _insert_user(conn: sqlite3.Connection, email: str, user: dict) -> int:
+    cur = conn.execute(
+        f"INSERT INTO users (email, {', '.join(_USER_COLUMNS)}) VALUES (?{', ?' * len(_USER_COLUMNS)})",
+        (
+            email,
+            str(user.get("pseudo") or email.split("@")[0]),
+            str(user.get("role") or "user"),
+            str(user.get("salt") or ""),
+            str(user.get("password_hash") or ""),
+            *(_to_db(col, user.get(col)) for col in _USER_COLUMNS[4:]),
+        ),
+    )
+    return int(cur.lastrowid)
+
+
+def _user_id(conn: sqlite3.Connection, email: str) -> int | None:
+    row = conn.execute("SELECT id FROM users WHERE email=?", (str(email).strip().lower(),)).fetchone()
+    return None if row is None else int(row["id"])
+
+
+def _user_dict(row: sqlite3.Row, favorites: list[str]) -> dict:
+    user = {col: row[col] for col in _USER_COLUMNS}
+    for col in _BOOL_COLUMNS:
+        if user[col] is not None:
+            user[col] = bool(user[col])
+    user["id"] = int(row["id"])
+    user["favorites"] = favorites
+    return user
+
+
+def _sync_favorites(conn: sqlite3.Connection, user_id: int, favorites: Iterable[str]) -> None:
+    wanted = {str(k) for k in favorites}
+    stored = {r["imdb_key"] for r in conn.execute("SELECT imdb_key FROM favorites WHERE user_id=?", (user_id,))}
+    conn.executemany(
+        "DELETE FROM favorites WHERE user_id=? AND imdb_key=?",
+        [(user_id, k) for k in sorted(stored - wanted)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO favorites (user_id, imdb_key) VALUES (?,?)",
+        [(user_id, k) for k in sorted(wanted - stored)],
+    )
+
+
+def _import_json(conn: sqlite3.Connection, users: dict[str, dict], replace: bool = False) -> tuple[int, int]:
+    imported_users = 0
+    imported_favs = 0
+    for email, info in users.items():
+        email = str(email).strip().lower()
+        info = dict(info or {})
+        user_id = _user_id(conn, email)
+        if user_id is not None and not replace:
+            continue
+        if user_id is None:
+            user_id = _insert_user(conn, email, info)
+        else:
+            _update_columns(conn, user_id, {col: info.get(col) for col in _USER_COLUMNS if col in info})
+        favorites = {str(k).strip() for k in (info.get("favorites") or []) if str(k).strip()}
+        _sync_favorites(conn, user_id, favorites)
+        imported_users += 1
+        imported_favs += len(favorites)
+    return imported_users, imported_favs
+
+
+def import_users_json(path: Path = USERS_PATH, replace: bool = False) -> tuple[int, int]:
+    """
+    Copies the accounts of a legacy `users.json` into the SQLite store.
 
-    USERS_PATH.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
+    Existing emails are kept as they are unless `replace` is set. Returns the
+    number of (users, favorites) written. A new store does this by itself.
+    """
+    users = json.loads(Path(path).read_text(encoding="utf-8"))
+    with _transaction(write=True) as conn:
+        return _import_json(conn, users, replace=replace)
+
+
+def _update_columns(conn: sqlite3.Connection, user_id: int, fields: dict[str, Any]) -> None:
+    columns = [col for col in fields if col in _USER_COLUMNS or col == "email"]
+    if not columns:
+        return
+    conn.execute(
+        f"UPDATE users SET {', '.join(f'{col}=?' for col in columns)} WHERE id=?",
+        (*(_to_db(col, fields[col]) for col in columns), user_id),
+    )
+
+
+# -- per-row access (used by utils/user_repo.py) ------------------------------
+
+
+def get_user(email: str) -> dict | None:
+    """One account (with its `favorites` list and SQLite `id`), None if unknown."""
+    with _transaction() as conn:
+        row = conn.execute(
+            f"SELECT id, {', '.join(_USER_COLUMNS)} FROM users WHERE email=?",
+            (str(email).strip().lower(),),
+        ).fetchone()
+        if row is None:
+            return None
+        favorites = [
+            r["imdb_key"]
+            for r in conn.execute("SELECT imdb_key FROM favorites WHERE user_id=? ORDER BY imdb_key", (row["id"],))
+        ]
+    return _user_dict(row, favorites)
+
+
+def create_user(email: str, user: dict) -> bool:
+    """Inserts an account; False if the email is already used."""
+    try:
+        with _transaction(write=True) as conn:
+            _insert_user(conn, str(email).strip().lower(), user)
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def update_user(email: str, fields: dict[str, Any]) -> bool:
+    """
+    Updates some columns of an account (`email` included); False if unknown.
+
+    Raises `sqlite3.IntegrityError` when the new email is already used.
+    """
+    with _transaction(write=True) as conn:
+        user_id = _user_id(conn, email)
+        if user_id is None:
+            return False
+        _update_columns(conn, user_id, fields)
+    return True
+
+
+def set_favorites(email: str, favorites: Iterable[str]) -> bool:
+    """Replaces the favorite set of an account (only the differing rows are written)."""
+    with _transaction(write=True) as conn:
+        user_id = _user_id(conn, email)
+        if user_id is None:
+            return False
+        _sync_favorites(conn, user_id, favorites)
+    return True
+
+
+def add_favorite(email: str, imdb_key: str) -> bool:
+    """Adds one favorite to the local store; False if the user does not exist."""
+    with _transaction(write=True) as conn:
+        user_id = _user_id(conn, email)
+        if user_id is None:
+            return False
+        conn.execute(
+            "INSERT OR IGNORE INTO favorites (user_id, imdb_key) VALUES (?,?)", (user_id, str(imdb_key))
+        )
+    return True
+
+
+def remove_favorite(email: str, imdb_key: str) -> bool:
+    """Removes one favorite from the local store; False if the user does not exist."""
+    with _transaction(write=True) as conn:
+        user_id = _user_id(conn, email)
+        if user_id is None:
+            return False
+        conn.execute("DELETE FROM favorites WHERE user_id=? AND imdb_key=?", (user_id, str(imdb_key)))
+    return True
+
+
+def get_favorite_dates(email: str) -> dict[str, str]:
+    """imdb_key -> UTC timestamp the favorite was added."""
+    with _transaction() as conn:
+        rows = conn.execute(
+            """
+            SELECT f.imdb_key, f.created_at
+            FROM favorites f JOIN users u ON u.id = f.user_id
+            WHERE u.email=?
+            """,
+            (str(email).strip().lower(),),
+        ).fetchall()
+    return {r["imdb_key"]: r["created_at"] for r in rows}
+
+
+# -- whole-store access (scripts, admin analytics) ----------------------------
 
 
 def load_users() -> dict[str, dict]:
-    _ensure_user_store()
-    return json.loads(USERS_PATH.read_text(encoding="utf-8"))
+    """Every account as `{email: user}` (the former `users.json` layout)."""
+    with _transaction() as conn:
+        favorites: dict[int, list[str]] = {}
+        for r in conn.execute("SELECT user_id, imdb_key FROM favorites ORDER BY user_id, imdb_key"):
+            favorites.setdefault(int(r["user_id"]), []).append(r["imdb_key"])
+        rows = conn.execute(f"SELECT id, email, {', '.join(_USER_COLUMNS)} FROM users ORDER BY id").fetchall()
+    return {row["email"]: _user_dict(row, favorites.get(int(row["id"]), [])) for row in rows}
 
 
 def save_users(users: dict[str, dict]) -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    USERS_PATH.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
+    """
+    Makes the store match `users` (the `load_users` layout), in one transaction.
+
+    Kept for scripts written against the JSON file; prefer the per-row
+    functions above, which do not rewrite every account.
+    """
+    with _transaction(write=True) as conn:
+        emails = {str(email).strip().lower() for email in users}
+        for r in conn.execute("SELECT email FROM users").fetchall():
+            if r["email"] not in emails:
+                conn.execute("DELETE FROM users WHERE email=?", (r["email"],))
+        _import_json(conn, users, replace=True)
 
 
 def verify_password(user: dict, password: str) -> bool: